@@ -10,14 +10,21 @@
 """
 
 import os
-from pathlib import Path
+import queue
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Pattern
 from uuid import uuid4 as uuid
 
 from esgprep._exceptions import NoFileFound
 from esgprep._utils import match
+from esgprep._utils.path import ScannedPath
 from esgprep._utils.print import Print
 
+# Backreferences prevent regular expressions from being combined.
+BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=")
+
 
 class Collector(object):
     """
@@ -25,11 +32,15 @@ class Collector(object):
 
     """
 
-    def __init__(self, sources):
+    def __init__(self, sources, walk_threads=0, sorted_walk=False):
         # Get input sources.
         self.sources = sources
         assert isinstance(self.sources, list)
 
+        # Set directory walk configuration.
+        self.walk_threads = walk_threads
+        self.sorted_walk = sorted_walk
+
         # Instantiate filename filter.
         self.FileFilter = FilterCollection()
 
@@ -42,29 +53,161 @@ class Collector(object):
             # Iterate on input sources.
             for source in self.sources:
                 # Walk through each source.
-                for root, _, filenames in os.walk(source, followlinks=True):
+                for root, _, entries in self.walk(source):
                     # Source path can include hidden directories:
                     # So apply path filters on downstream tree only.
                     if self.PathFilter(root.split(str(source))[1]):
-                        # Iterate on discovered sorted filenames.
-                        for filename in sorted(filenames):
-                            # Rebuild file full path aas pathlib.Path object.
-                            path = Path(root, filename)
-
+                        # Iterate on discovered sorted file entries.
+                        for entry in sorted(entries, key=by_name):
                             # Apply file filter on filename.
-                            if path.is_file() and self.FileFilter(filename):
-                                # Yield file full path.
-                                yield path
+                            if self.FileFilter(entry.name) and entry.is_file():
+                                # Yield file full path with its stat result.
+                                yield ScannedPath.from_entry(entry)
 
         except StopIteration:
             raise NoFileFound(self.sources)
 
+    def walk(self, source):
+        """
+        Walks through a source with the collector configuration.
+
+        """
+        return walk(str(source), threads=self.walk_threads, ordered=self.sorted_walk)
+
+
+def scan(top):
+    """
+    Lists a directory into the list of subdirectory names and the list of "os.DirEntry"
+    of the other entries. The entry types come from the directory listing, so that no extra
+    stat is needed. Returns None if the directory cannot be listed.
+
+    """
+    dirs, entries = list(), list()
+    try:
+        with os.scandir(top) as listing:
+            for entry in listing:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    dirs.append(entry.name)
+                else:
+                    entries.append(entry)
+    except OSError:
+        return None
+    return dirs, entries
+
+
+def walk(top, threads=0, ordered=False):
+    """
+    Walks a directory tree top-down following symlinks, as "os.walk" does.
+    Yields the directory path, the list of subdirectory names (that can be modified in
+    place to prune the walk) and the list of "os.DirEntry" of the other entries.
+
+    With threads, directories are listed concurrently by a threads pool. The subdirectories
+    of a directory are submitted once it has been yielded (i.e., after pruning). Directories
+    are yielded as soon as listed, or in a deterministic order (i.e., top-down with sorted
+    subdirectories) if ordered.
+
+    """
+    if not threads:
+        yield from serial_walk(top, ordered)
+        return
+    executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="walk")
+    try:
+        if ordered:
+            yield from ordered_walk(executor, top, executor.submit(scan, top))
+        else:
+            yield from unordered_walk(executor, top)
+    finally:
+        # Do not wait for pending listings if the walk is interrupted.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def serial_walk(top, ordered=False):
+    """
+    Walks a directory tree in the current thread.
+
+    """
+    listing = scan(top)
+    if listing is None:
+        return
+    dirs, entries = listing
+    if ordered:
+        dirs.sort()
+    yield top, dirs, entries
+
+    # Walk through remaining subdirectories.
+    for name in dirs:
+        yield from serial_walk(os.path.join(top, name), ordered)
+
+
+def ordered_walk(executor, top, listing):
+    """
+    Walks a directory tree in a deterministic order.
+    The subdirectories are listed in advance while the previous ones are walked through.
+
+    """
+    listing = listing.result()
+    if listing is None:
+        return
+    dirs, entries = listing
+    dirs.sort()
+    yield top, dirs, entries
+
+    # Submit remaining subdirectories at once.
+    paths = [os.path.join(top, name) for name in dirs]
+    listings = [executor.submit(scan, path) for path in paths]
+    for path, listing in zip(paths, listings):
+        yield from ordered_walk(executor, path, listing)
+
+
+def unordered_walk(executor, top):
+    """
+    Walks a directory tree in the order directories are listed.
+    Idle threads pick up the next pending directory from the shared queue of the pool.
+
+    """
+    results = queue.SimpleQueue()
+
+    def task(path):
+        listing = None
+        try:
+            listing = scan(path)
+        finally:
+            results.put((path, listing))
+
+    executor.submit(task, top)
+    pending = 1
+    while pending:
+        root, listing = results.get()
+        pending -= 1
+        if listing is None:
+            continue
+        dirs, entries = listing
+        yield root, dirs, entries
+
+        # Submit remaining subdirectories.
+        for name in dirs:
+            executor.submit(task, os.path.join(root, name))
+            pending += 1
+
+
+def by_name(entry):
+    """
+    Sorting key of directory entries.
+
+    """
+    return entry.name
+
 
 class FilterCollection(object):
     """
     Evaluates a string against a dictionary of several regular expressions.
     The dictionary includes 2-tuples with the regular expression as a string and a boolean
     indicating to match (i.e., include) or non-match (i.e., exclude) the corresponding expression.
+    The filters are compiled into a single matcher on first evaluation.
 
     """
 
@@ -74,6 +217,9 @@ class FilterCollection(object):
         # Instantiate filters dictionary.
         self.filters = dict()
 
+        # Instantiate compiled matcher.
+        self.matcher = None
+
     def add(self, name=None, regex="*", inclusive=True):
         # Add new filter.
         if not name:
@@ -82,21 +228,76 @@ class FilterCollection(object):
         assert isinstance(inclusive, bool)
         self.filters[name] = (regex, inclusive)
 
+        # Reset compiled matcher.
+        self.matcher = None
+
     def __call__(self, string):
-        Print.debug(
-            f"FilterCollection.__call__: Evaluating string='{string}' against {len(self.filters)} filters"
+        # Compile filters.
+        if self.matcher is None:
+            self.matcher = compile_filters(tuple(self.filters.values()))
+        result = self.matcher(string)
+
+        # Detail each filter in debug mode only.
+        if Print.DEBUG:
+            for name, (regex, inclusive) in self.filters.items():
+                Print.debug(
+                    "FilterCollection: Filter '{}' (regex='{}', inclusive={}) -> {}",
+                    name,
+                    regex,
+                    inclusive,
+                    match(regex, string, inclusive=inclusive),
+                )
+            Print.debug("FilterCollection: Final result for '{}': {}", string, result)
+
+        return result
+
+
+@lru_cache(maxsize=128)
+def compile_filters(filters):
+    """
+    Compiles 2-tuples of regular expression and inclusive boolean into a single matcher.
+    Inclusive expressions are combined as lookaheads and exclusive expressions as one
+    negative lookahead alternation, each one preceded by "[\\s\\S]*?" to keep the
+    "re.search" semantic. Expressions that cannot be safely combined (e.g., with flags
+    or backreferences) fall back to one precompiled expression per filter.
+
+    """
+    # Get expressions as strings.
+    patterns = list()
+    for regex, inclusive in filters:
+        if isinstance(regex, Pattern):
+            if regex.flags != re.UNICODE:
+                patterns = None
+                break
+            regex = regex.pattern
+        if BACKREFERENCE.search(regex):
+            patterns = None
+            break
+        patterns.append((regex, inclusive))
+
+    # Combine expressions into a single one.
+    if patterns is not None:
+        combined = "".join(
+            r"(?=[\s\S]*?(?:{}))".format(regex)
+            for regex, inclusive in patterns
+            if inclusive
         )
-        results = []
-        for name, (regex, inclusive) in self.filters.items():
-            result = match(regex, string, inclusive=inclusive)
-            results.append(result)
-            Print.debug(
-                f"FilterCollection: Filter '{name}' (regex='{regex}', inclusive={inclusive}) -> {result}"
+        excluded = [regex for regex, inclusive in patterns if not inclusive]
+        if excluded:
+            combined += r"(?![\s\S]*?(?:{}))".format(
+                "|".join("(?:{})".format(regex) for regex in excluded)
             )
+        try:
+            matcher = re.compile(combined).match
+            return lambda string: matcher(string) is not None
+        except re.error:
+            pass
 
-        final_result = all(results)
-        Print.debug(f"FilterCollection: Final result for '{string}': {final_result}")
-        return final_result
+    # Fall back to one precompiled expression per filter.
+    searches = [(re.compile(regex).search, inclusive) for regex, inclusive in filters]
+    return lambda string: all(
+        (search(string) is not None) == inclusive for search, inclusive in searches
+    )
 
 
-__all__ = ["Collector", "FilterCollection"]
+__all__ = ["Collector", "FilterCollection", "walk"]
@@ -9,17 +9,14 @@
 
 """
 
-import os
-
-from esgprep._collectors import Collector
+from esgprep._collectors import Collector, by_name
 from esgprep._exceptions import NoFileFound
 from esgprep._utils.path import (
-    get_drs,
     get_project,
-    get_version_index,
     get_versions,
-    is_latest_symlink,
     with_latest_target,
+    ParsedPath,
+    ScannedPath,
 )
 from esgprep._utils.print import Print
 from pathlib import Path
@@ -40,74 +37,106 @@ class DRSPathCollector(Collector):
         # Initialize dataset path switch.
         self.dataset_parent = False
 
+        # Initialize latest version per dataset path.
+        self.latest_versions = dict()
+
+    def latest_version(self, dataset_path):
+        """
+        Returns the latest existing version name of the dataset, or None if not found.
+
+        """
+        if dataset_path not in self.latest_versions:
+            versions = get_versions(dataset_path)
+            Print.debug(
+                "DRSPathCollector: get_versions({}) returned: {}",
+                dataset_path,
+                versions,
+            )
+            if versions:
+                self.latest_versions[dataset_path] = versions[-1].name
+            else:
+                Print.debug(
+                    "DRSPathCollector: No versions found for dataset path {}",
+                    dataset_path,
+                )
+                self.latest_versions[dataset_path] = None
+        return self.latest_versions[dataset_path]
+
+    def is_selected(self, string, latest=None):
+        """
+        Returns True if the string satisfies the PathFilter and, if any,
+        the latest version of its dataset.
+
+        """
+        if latest is not None and "/{}".format(latest) not in string:
+            return False
+        return self.PathFilter(string)
+
     def __iter__(self):
         # StopIteration error means no files found in all input sources.
         try:
             Print.debug(
-                f"DRSPathCollector: Starting iteration over sources: {self.sources}"
+                "DRSPathCollector: Starting iteration over sources: {}", self.sources
             )
 
             # Iterate on input sources.
             for source in self.sources:
-                Print.debug(f"DRSPathCollector: Processing source: {source}")
+                Print.debug("DRSPathCollector: Processing source: {}", source)
                 # Walk through each source.
-                for root, dirs, filenames in os.walk(str(source), followlinks=True):
+                for root, dirs, entries in self.walk(source):
                     Print.debug(
-                        f"DRSPathCollector: Walking root={root}, dirs={dirs}, filenames={filenames}"
+                        "DRSPathCollector: Walking root={}, dirs={}, entries={}",
+                        root,
+                        dirs,
+                        entries,
                     )
-                    # Instantiate path object.
-                    path = Path(root)
+                    # Parse path once.
+                    parsed = ParsedPath(Path(root))
+                    path = parsed.path
 
                     # Get project from path.
-                    project = get_project(path)
-                    Print.debug(f"DRSPathCollector: path={path}, project={project}")
+                    if Print.DEBUG:
+                        project = get_project(path)
+                        Print.debug(
+                            "DRSPathCollector: path={}, project={}", path, project
+                        )
+
                     # Get version index using the smart algorithm from path utils.
-                    try:
-                        idx = get_version_index(path)
-                        Print.debug(f"DRSPathCollector: version_index={idx}")
-                    except ValueError as e:
+                    idx = parsed.version_index
+                    if idx is None:
                         # If no version found in path, skip this path
                         Print.debug(
-                            f"DRSPathCollector: No version found in path {path}: {e}, skipping"
+                            "DRSPathCollector: No version found in path {}: {}, skipping",
+                            path,
+                            parsed.error,
                         )
                         continue
+                    Print.debug("DRSPathCollector: version_index={}", idx)
 
-                    # When DRS version depth/level is reached, it takes priority.
-                    if len(get_drs(path).parts) == idx:  # on en est à la version
-                        # Apply default behavior.
-                        if self.default:
-                            #  Pick up the latest existing versions for the corresponding dataset.
-                            # We need to get versions from the parent directory (dataset level), not the current version directory
-                            dataset_path = path.parent
-                            versions = get_versions(dataset_path)
-                            Print.debug(
-                                f"DRSPathCollector: get_versions({dataset_path}) returned: {versions}"
-                            )
-                            if versions:
-                                latest_version = versions[-1]
-                                Print.debug(
-                                    f"DRSPathCollector: latest_version={latest_version}, latest_version.name={latest_version.name}"
-                                )
-                                # Add version filter with latest version.
-                                self.PathFilter.add(
-                                    name="version_filter",
-                                    regex="/{}".format(latest_version.name),
-                                )
-                            else:
-                                Print.debug(
-                                    f"DRSPathCollector: No versions found for dataset path {dataset_path}"
-                                )
+                    # Pick up the latest existing version of the corresponding dataset.
+                    # The latest version is kept per dataset as the walk can
+                    # interleave directories from different datasets.
+                    latest = None
+                    if self.default:
+                        latest = self.latest_version(parsed.drs)
 
+                    # When DRS version depth/level is reached, it takes priority.
+                    if len(parsed.drs_parts) == idx:  # on en est à la version
                         # Remove undesired subdirectories to prune os.walk.
-                        original_dirs = dirs.copy()
-                        dirs[:] = [d for d in dirs if self.PathFilter("/{}".format(d))]
+                        filtered_dirs = [
+                            d for d in dirs if self.is_selected("/{}".format(d), latest)
+                        ]
                         Print.debug(
-                            f"DRSPathCollector: PathFilter applied - original_dirs={original_dirs}, filtered_dirs={dirs}"
+                            "DRSPathCollector: PathFilter applied - original_dirs={}, filtered_dirs={}",
+                            dirs,
+                            filtered_dirs,
                         )
+                        dirs[:] = filtered_dirs
 
-                        if self.dataset_parent and self.PathFilter(root):
+                        if self.dataset_parent and self.is_selected(root, latest):
                             Print.debug(
-                                f"DRSPathCollector: dataset_parent mode, processing root={root}"
+                                "DRSPathCollector: dataset_parent mode, processing root={}",
+                                root,
                             )
 
                             # Iterate of sub-directories.
@@ -115,49 +144,64 @@ class DRSPathCollector(Collector):
                                 # Yield the version directory.
                                 yield Path(root, dir)
 
-                    elif len(get_drs(path).parts) > idx and self.dataset_parent:
+                    elif len(parsed.drs_parts) > idx and self.dataset_parent:
                         # yield the version directory
-                        yield dataset_path(path)  # Lolo change to Path(...) or not
+                        yield Path(*parsed.parts[: idx + 1])
 
                     # Iterate on discovered sorted filenames.
+                    Print.debug("DRSPathCollector: Processing {} entries", len(entries))
+                    if not entries:
+                        continue
+
+                    # Ensure that root path satisfies PathFilter.
+                    path_filter_result = self.is_selected(root, latest)
                     Print.debug(
-                        f"DRSPathCollector: Processing {len(filenames)} filenames: {filenames}"
+                        "DRSPathCollector: PathFilter({}) = {}",
+                        root,
+                        path_filter_result,
                     )
-                    for filename in sorted(filenames):
-                        # Ensure that root path satisfies PathFilter.
-                        path_filter_result = self.PathFilter(root)
+                    if not path_filter_result:
+                        continue
+
+                    for entry in sorted(entries, key=by_name):
                         Print.debug(
-                            f"DRSPathCollector: PathFilter({root}) = {path_filter_result}"
+                            "DRSPathCollector: Processing file path: {}", entry.path
                         )
-                        if path_filter_result:
-                            # Instantiate DRSPath object.
-                            path = Path(root, filename)
+
+                        # Dereference "latest" symlink version.
+                        if entry.is_symlink() and "latest" in entry.path:
+                            path = with_latest_target(Path(entry.path))
                             Print.debug(
-                                f"DRSPathCollector: Processing file path: {path}"
+                                "DRSPathCollector: Dereferenced latest symlink {} -> {}",
+                                entry.path,
+                                path,
                             )
-
-                            # Dereference "latest" symlink version.
-                            if is_latest_symlink(path):
-                                original_path = path
-                                path = with_latest_target(path)
-                                Print.debug(
-                                    f"DRSPathCollector: Dereferenced latest symlink {original_path} -> {path}"
-                                )
-
-                            # Apply file filters on filename.
-                            is_file = path.is_file()
-                            file_filter_result = self.FileFilter(path.name)
+                        else:
+                            path = entry
+
+                        # Apply file filters on filename, then reuse the directory entry
+                        # type & stat result.
+                        file_filter_result = self.FileFilter(path.name)
+                        is_file = file_filter_result and path.is_file()
+                        if is_file and path is entry:
+                            path = ScannedPath.from_entry(entry)
+                        Print.debug(
+                            "DRSPathCollector: is_file={}, FileFilter({})={}",
+                            is_file,
+                            path.name,
+                            file_filter_result,
+                        )
+                        if is_file and file_filter_result:
+                            # Yield DRSPath object.
+                            Print.debug("DRSPathCollector: YIELDING file: {}", path)
+                            yield path
+                        else:
                             Print.debug(
-                                f"DRSPathCollector: is_file={is_file}, FileFilter({path.name})={file_filter_result}"
+                                "DRSPathCollector: SKIPPING file: {} (is_file={}, file_filter={})",
+                                path,
+                                is_file,
+                                file_filter_result,
                             )
-                            if is_file and file_filter_result:
-                                # Yield DRSPath object.
-                                Print.debug(f"DRSPathCollector: YIELDING file: {path}")
-                                yield path
-                            else:
-                                Print.debug(
-                                    f"DRSPathCollector: SKIPPING file: {path} (is_file={is_file}, file_filter={file_filter_result})"
-                                )
 
         except StopIteration:
             raise NoFileFound(self.sources)
@@ -23,7 +23,12 @@ class BaseContext(object):
         self.args = args
 
         # Instantiate print manager.
-        Print.init(log=args.log, debug=args.debug, cmd=args.prog)
+        Print.init(
+            log=args.log,
+            debug=args.debug,
+            cmd=args.prog,
+            log_format=getattr(args, "log_format", "text"),
+        )
 
         # Enable/disable colors.
         if "color" in args and args.color:
@@ -44,6 +49,9 @@ class BaseContext(object):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        # Write buffered log messages.
+        Print.close()
+
         # Print log.
         Print.log()
 
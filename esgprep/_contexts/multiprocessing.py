@@ -9,95 +9,41 @@
 
 """
 
+import queue
 import signal
-from ctypes import c_wchar_p
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 from hashlib import algorithms_available as checksum_types
 from importlib import import_module
-from multiprocessing import Lock, Pool
-from multiprocessing.managers import BaseProxy, SyncManager
+from multiprocessing import cpu_count, get_context
 from multiprocessing.sharedctypes import Value
 
 import esgvoc.api as ev
 
 from esgprep._contexts import BaseContext
 from esgprep._exceptions import InvalidChecksumType, MissingCVdata
-from esgprep._handlers.drs_tree import DRSTree
+from esgprep._utils.cache import AttributesCache, add_counts, pop_counts
+from esgprep._utils.checksum import (
+    ChecksumCache,
+    ChecksumJob,
+    ChecksumXattrs,
+    get_manifests_state,
+    is_multihash_algo,
+    set_manifests_state,
+)
+from esgprep._utils.path import get_drs_generator, get_projects
 from esgprep._utils.print import COLORS, Print
+from esgprep.constants import (
+    FORKSERVER_PRELOAD,
+    FRAMES,
+    IN_FLIGHT_CHUNKS,
+    PROGRESS_REFRESH_INTERVAL,
+)
 import os
 
 
-class Manager(SyncManager):
-    pass
-
-
-class DRSTreeProxy(BaseProxy):
-    _exposed_ = (
-        "get_display_lengths",
-        "add_path",
-        "append_path",
-        "create_leaf",
-        "has_path",
-        "get_path",
-        "get_path_value",
-        "check_uniqueness",
-        "list",
-        "rmdir",
-        "todo",
-        "tree",
-        "upgrade",
-        "get_serializable_data",
-        "restore_from_data",
-    )
-
-    def get_display_lengths(self):
-        return self._callmethod("get_display_lengths")
-
-    def add_path(self, key, value):
-        return self._callmethod("add_path", (key, value))
-
-    def append_path(self, key, what, value):
-        return self._callmethod("append_path", (key, what, value))
-
-    def create_leaf(self, nodes, label, src, mode, force=False):
-        return self._callmethod("create_leaf", (nodes, label, src, mode, force))
-
-    def has_path(self, key):
-        return self._callmethod("has_path", (key,))
-
-    def get_path(self, key):
-        return self._callmethod("get_path", (key,))
-
-    def get_path_value(self, key, field):
-        return self._callmethod("get_path_value", (key, field))
-
-    def check_uniqueness(self):
-        return self._callmethod("check_uniqueness")
-
-    def list(self, **kwargs):
-        return self._callmethod("list", (), kwargs)
-
-    def rmdir(self):
-        return self._callmethod("rmdir")
-
-    def todo(self, **kwargs):
-        return self._callmethod("todo", (), kwargs)
-
-    def tree(self, **kwargs):
-        return self._callmethod("tree", (), kwargs)
-
-    def upgrade(self, **kwargs):
-        return self._callmethod("upgrade", (), kwargs)
-
-    def get_serializable_data(self):
-        return self._callmethod("get_serializable_data")
-
-    def restore_from_data(self, data):
-        return self._callmethod("restore_from_data", (data,))
-
-
-Manager.register("DRSTree", DRSTree, DRSTreeProxy)
-
-
 class MultiprocessingContext(BaseContext):
     """
     Base class for multiprocessing context manager.
@@ -136,12 +82,38 @@ class MultiprocessingContext(BaseContext):
 
         # Checksums file takes priority on checksumming behavior setting.
         if self.checksums_from:
-            self.no_checksum = True
-            Print.warning('"--checksums-from" ignores "--no-checksum".')
+            if self.no_checksum:
+                Print.warning('"--checksums-from" ignores "--no-checksum".')
+            self.no_checksum = False
+
+        # Set checksum read block size.
+        self.read_block_size = self.set("read_block_size")
+
+        # Set checksum cache directory (disabled by default).
+        self.checksum_cache_dir = self.set("checksum_cache")
+
+        # Set netCDF attributes cache directory (disabled by default).
+        self.attrs_cache_dir = self.set("attrs_cache")
+
+        # Enable checksums in file extended attributes.
+        self.checksum_xattrs = ChecksumXattrs() if self.set("checksum_xattrs") else None
 
         # Set multiprocessing configuration. Processes number is caped by cpu_count().
         self.processes = self.set("max_processes")
 
+        # Start child processes from a forkserver with preloaded modules.
+        self.forkserver = self.set("forkserver")
+
+        # Set number of sources sent to a child process at once.
+        self.chunksize = self.set("chunksize")
+
+        # Set directory walk configuration.
+        self.walk_threads = self.set("walk_threads")
+        self.sorted_walk = self.set("sorted_walk")
+
+        # Set checksum threads number. No threads means checksums are computed by the child processes.
+        self.checksum_threads = self.set("checksum_threads")
+
         # Sequential processing disables multiprocessing pool usage.
         self.use_pool = self.processes != 1
 
@@ -151,31 +123,26 @@ class MultiprocessingContext(BaseContext):
         # Instantiate success counter.
         self.success = 0
 
-        # Instantiate multiprocessing manager & set progress counter.
-        if self.use_pool:
-            # Multiprocessing manager starts within a multiprocessing pool only.
-            self.manager = Manager()
-            self.manager.start()
+        # Instantiate progress, error counters & spinner message length.
+        # They are only updated by the main process from the results stream.
+        self.progress = Value("i", 0)
+        self.errors = Value("i", 0)
+        self.msg_length = Value("i", 0)
 
-            # Instantiate print buffer.
-            Print.BUFFER = self.manager.Value(c_wchar_p, "")
+        # Instantiate print buffer.
+        # Failures & skipped sources are buffered by the main process only.
+        Print.BUFFER = queue.SimpleQueue()
 
-            # Instantiate progress counter.
-            self.progress = self.manager.Value("i", 0)
+        # Instantiate persistent checksum cache.
+        # Hits & misses of the child processes are added up from the results stream.
+        self.checksum_cache = None
+        if self.checksum_cache_dir:
+            self.checksum_cache = ChecksumCache(self.checksum_cache_dir)
 
-            # Instantiate error counter.
-            self.errors = self.manager.Value("i", 0)
-
-            # Instantiate spinner message length.
-            self.msg_length = self.manager.Value("i", 0)
-
-            # Instantiate stdout lock.
-            self.lock = self.manager.Lock()
-        else:
-            self.errors = Value("i", 0)
-            self.progress = Value("i", 0)
-            self.msg_length = Value("i", 0)
-            self.lock = Lock()
+        # Instantiate persistent netCDF attributes cache.
+        self.attrs_cache = None
+        if self.attrs_cache_dir:
+            self.attrs_cache = AttributesCache(self.attrs_cache_dir)
 
         # Discover a specified DRS version number.
         self.version = self.set("version")
@@ -233,31 +200,37 @@ class MultiprocessingContext(BaseContext):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        # Save error count before shutting down manager (needed for access after context exit)
+        # Get error count.
         error_count = self.errors.value
 
         # Build summary message.
         msg = f"Number of success(es): {self.success}\n"
         msg += f"Number of error(s): {error_count}"
 
+        # Add checksum cache statistics.
+        if self.checksum_cache:
+            msg += f"\nChecksum cache: {self.checksum_cache.hits} hit(s), "
+            msg += f"{self.checksum_cache.misses} miss(es)"
+
+        # Add netCDF attributes cache statistics.
+        if self.attrs_cache:
+            msg += f"\nAttributes cache: {self.attrs_cache.hits} hit(s), "
+            msg += f"{self.attrs_cache.misses} miss(es)"
+
         # No errors occurred.
         if not error_count:
-            msg = COLORS.SUCCESS(msg)
+            color = COLORS.SUCCESS
 
         # All files skipped.
         elif self.nbsources == error_count:
-            msg = COLORS.FAIL(msg)
+            color = COLORS.FAIL
 
         # Partial success with at least one error.
         else:
-            msg = COLORS.WARNING(msg)
+            color = COLORS.WARNING
 
         # Print summary.
-        Print.summary(msg)
-
-        # Properly shutdown the multiprocessing manager to avoid resource leaks
-        if self.use_pool and hasattr(self, "manager"):
-            self.manager.shutdown()
+        Print.summary(msg, color)
 
         # Store final error count as a regular attribute for post-context access
         self.final_error_count = error_count
@@ -267,6 +240,7 @@ class MultiprocessingContext(BaseContext):
     def get_checksum_type(self):
         """
         Returns the checksum type to use.
+        Several checksum types are returned as a list.
 
         """
         # Disabled checksumming returns None.
@@ -279,69 +253,345 @@ class MultiprocessingContext(BaseContext):
             if hasattr(self, "checksum_type_arg") and self.checksum_type_arg
             else "sha256"
         )
+        if isinstance(checksum_type, str):
+            checksum_type = [checksum_type]
 
         # Get checksum type from configuration.
         # if 'checksum' in self.cfg.defaults():
         #    checksum_type = self.cfg.defaults()['checksum'].split('|')[1].strip().lower()
 
         # Verify checksum type is valid.
-        # Import multihash support here to avoid circular imports
-        try:
-            from esgprep._utils.checksum import is_multihash_algo
-
-            if checksum_type not in checksum_types and not is_multihash_algo(
-                checksum_type
+        for checksum_type_ in checksum_type:
+            if checksum_type_ not in checksum_types and not is_multihash_algo(
+                checksum_type_
             ):
-                raise InvalidChecksumType(checksum_type)
-        except ImportError:
-            # Fallback to original validation if multihash not available
-            if checksum_type not in checksum_types:
-                raise InvalidChecksumType(checksum_type)
+                raise InvalidChecksumType(checksum_type_)
+
+        # Single checksum type is returned as is.
+        if len(checksum_type) == 1:
+            return checksum_type[0]
+
+        return list(checksum_type)
+
+
+def initializer(project=None, print_state=None, manifests=None):
+    """
+    Child process initializer.
+    Warms up the expensive imports, the CV databases and the project DRS generator once
+    per child process instead of on the first processed file.
+
+    """
+    # Restore printing settings of the main process.
+    if print_state:
+        Print.set_state(print_state)
+
+    # Restore checksums manifest indexes of the main process.
+    if manifests:
+        set_manifests_state(manifests)
+
+    # Write buffered log messages if the pool is terminated.
+    signal.signal(signal.SIGTERM, terminate)
+
+    # Forget the cache hits & misses inherited from the main process.
+    pop_counts()
+
+    try:
+        # Load netCDF library.
+        import_module("netCDF4")
+
+        # Open CV databases & load project codes.
+        ev.get_all_data_descriptors_in_universe()
+        get_projects()
+
+        # Instantiate project DRS generator.
+        if project:
+            get_drs_generator(project)
+
+    except Exception as e:
+        # Errors are raised again when processing files.
+        Print.debug(f"Child process warm-up failed: {e}")
+
+
+def terminate(signum, frame):
+    """
+    SIGTERM handler of the child processes.
+    Writes the buffered log messages before exiting.
+
+    """
+    Print.close()
+    os._exit(1)
+
 
-        return checksum_type
+class Failure(object):
+    """
+    Result of a source that failed to be processed.
+    Carries the formatted exception traceback, printed and counted as an error by the
+    main process. A failure evaluates to False as any skipped source.
+
+    """
+
+    __slots__ = ("source", "msg")
+
+    def __init__(self, source):
+        # Format exception traceback.
+        self.source = str(source)
+        self.msg = traceback.format_exc().rstrip("\n")
+
+    def __bool__(self):
+        return False
+
+
+class Skipped(object):
+    """
+    Result of a source deliberately skipped by a child process.
+    Carries the source printed by the main process, without counting an error.
+
+    """
+
+    __slots__ = ("source",)
+
+    def __init__(self, source):
+        self.source = str(source)
+
+    def __bool__(self):
+        return False
+
+
+class IndexedWorker(object):
+    """
+    Worker wrapper returning each result with the index of its source,
+    so that results can be ordered back when processed out of order.
+    The cache hits & misses counted meanwhile are returned too.
+
+    """
+
+    def __init__(self, worker):
+        self.worker = worker
+
+    def __call__(self, task):
+        i, source = task
+        start = time.perf_counter()
+        result = self.worker(source)
+
+        # Log processing time of the source.
+        if isinstance(result, Failure):
+            status = "error"
+        elif result:
+            status = "success"
+        else:
+            status = "skipped"
+        Print.timing(source, time.perf_counter() - start, status)
+
+        # Write log messages of the source, so that the logfile keeps the processing
+        # order and a terminated child process loses nothing.
+        Print.close()
+        return i, result, pop_counts()
 
 
 class Runner(object):
-    def __init__(self, processes):
+    def __init__(
+        self,
+        processes,
+        checksum_threads=None,
+        project=None,
+        forkserver=False,
+        chunksize=None,
+    ):
+        # Set number of sources sent to a child process at once.
+        self.chunksize = chunksize or 1
+
+        # Bound the number of sources dispatched and not yet processed, including the
+        # sources waiting for their deferred checksums.
+        in_flight = (processes or cpu_count()) * self.chunksize
+        self.window = (in_flight + (checksum_threads or 0)) * IN_FLIGHT_CHUNKS
+
+        # Last dispatched source & last spinner redraw time.
+        self.current = None
+        self.redrawn = 0
+
         # Initialize the pool.
         self.pool = None
 
         if processes != 1:
-            self.pool = Pool(processes=processes)
+            if forkserver:
+                # Child processes are started from a server with preloaded modules.
+                mp = get_context("forkserver")
+                mp.set_forkserver_preload(FORKSERVER_PRELOAD)
+                initargs = (project, Print.get_state(), get_manifests_state())
+            else:
+                mp = get_context()
+                initargs = (project,)
+            self.pool = mp.Pool(
+                processes=processes, initializer=initializer, initargs=initargs
+            )
+
+        # Initialize the checksum threads pool.
+        self.checksum_pool = None
+
+        if checksum_threads:
+            self.checksum_pool = ThreadPoolExecutor(max_workers=checksum_threads)
 
     def _handle_sigterm(self, signum, frame):
         # Properly kill the pool in case of SIGTERM.
         if self.pool:
             self.pool.terminate()
 
+        # Cancel pending checksums.
+        if self.checksum_pool:
+            self.checksum_pool.shutdown(wait=False, cancel_futures=True)
+
+        # Write buffered log messages.
+        Print.close()
+
         os._exit(1)
 
-    def run(self, sources, ctx):
+    def dispatch(self, sources, window=None):
+        """
+        Yields the sources as long as the in-flight window is not full.
+        The pool task handler thread (or the main process in sequential mode) waits
+        here while child processes or checksum threads are busy.
+
+        """
+        for source in sources:
+            if window:
+                window.acquire()
+            self.current = source[1]
+            yield source
+
+    def collect(self, ctx, result):
+        """
+        Counts and prints a failure, prints a skipped source, returns the result
+        otherwise.
+
+        """
+        if isinstance(result, Failure):
+            ctx.errors.value += 1
+            Print.skip(result.source, result.msg, buffer=True)
+            return None
+        if isinstance(result, Skipped):
+            Print.skip(result.source, buffer=True)
+            return None
+        return result
+
+    def redraw(self, ctx, desc, force=False):
+        """
+        Redraws the progress spinner at a fixed rate.
+
+        """
+        now = time.monotonic()
+        if not force and now - self.redrawn < PROGRESS_REFRESH_INTERVAL:
+            return
+        self.redrawn = now
+
+        # Clear previous print.
+        msg = f"\r{' ' * ctx.msg_length.value}"
+        Print.progress(msg)
+
+        # Print progress bar.
+        frame = FRAMES[ctx.progress.value % len(FRAMES)]
+        msg = f"\r{COLORS.OKBLUE(desc)} {frame} {self.current}"
+        Print.progress(msg)
+
+        # Set new message length.
+        ctx.msg_length.value = len(msg)
+
+    def run(self, sources, ctx, ordered=False, consume=None):
+        """
+        Streams the sources to the child processes and returns the list of results.
+        Each result is passed to the consume function, if any, as soon as returned,
+        and its return value is kept instead, so that the main process does not hold
+        the results until the end. Results are consumed in the sources order only if
+        required.
+
+        """
         # Instantiate signal handler.
         sig_handler = signal.signal(signal.SIGTERM, self._handle_sigterm)
 
         # Import the appropriate worker.
         process = getattr(import_module(f"esgprep.{ctx.prog[3:]}.{ctx.cmd}"), "Process")
 
-        # Convert sources to list for debugging
-        sources_list = list(sources)
-        Print.debug(f"Runner: Processing {len(sources_list)} sources")
-        for i, source in enumerate(sources_list):
-            Print.debug(f"Runner: Source {i}: {source}")
+        # Instantiate the worker.
+        worker = process(ctx)
+
+        # Get the spinner description.
+        desc = import_module(f"esgprep.{ctx.prog[3:]}.constants").SPINNER_DESC
+
+        # Number the sources to restore their order.
+        tasks = enumerate(sources)
+
+        # Bound the sources walked & not yet processed.
+        window = threading.Semaphore(self.window)
 
         # Instantiate pool of processes.
         if self.pool:
             # Instantiate pool iterator.
-            processes = self.pool.imap(process(ctx), sources_list)
+            processes = self.pool.imap_unordered(
+                IndexedWorker(worker),
+                self.dispatch(tasks, window),
+                chunksize=self.chunksize,
+            )
 
         # Sequential processing use basic map function.
         else:
             # Instantiate processes iterator.
-            processes = map(process(ctx), sources_list)
+            processes = map(IndexedWorker(worker), self.dispatch(tasks, window))
+
+        # Results consumed in the sources order & results waiting for their turn.
+        results = list()
+        waiting = dict()
+        position = 0
+
+        # Completed deferred checksums.
+        done = queue.SimpleQueue()
+        pending = 0
+
+        def emit(i, result):
+            nonlocal position
+            result = self.collect(ctx, result)
+            if not ordered:
+                results.append(consume(result) if consume else result)
+                return
+            waiting[i] = result
+            while position in waiting:
+                result = waiting.pop(position)
+                results.append(consume(result) if consume else result)
+                position += 1
+
+        def complete(i, job):
+            # Source slot is released once its deferred checksums are done.
+            done.put((i, job.result()))
+            window.release()
+
+        # Run processes & consume the results.
+        # Progress and errors are accounted from the results stream.
+        # Deferred checksums are submitted to the checksum threads as soon as returned
+        # and their results are collected as soon as completed.
+        for i, result, counts in processes:
+            ctx.progress.value += 1
+            add_counts(counts)
+            if isinstance(result, ChecksumJob):
+                job = self.checksum_pool.submit(worker.resolve, result)
+                job.add_done_callback(lambda job, i=i: complete(i, job))
+                pending += 1
+            else:
+                window.release()
+                emit(i, result)
+            while not done.empty():
+                emit(*done.get())
+                pending -= 1
+            self.redraw(ctx, desc)
 
-        # Run processes & get the list of results.
-        results = [x for x in processes]
-        Print.debug(f"Runner: Got {len(results)} results: {results}")
+        # Get results of remaining deferred checksums.
+        while pending:
+            emit(*done.get())
+            pending -= 1
+            self.redraw(ctx, desc)
+
+        # Draw final progress.
+        if self.current is not None:
+            self.redraw(ctx, desc, force=True)
+
+        Print.debug(f"Runner: Got {len(results)} results")
 
         # Terminate pool in case of SIGTERM signal.
         signal.signal(signal.SIGTERM, sig_handler)
@@ -351,4 +601,8 @@ class Runner(object):
             self.pool.close()
             self.pool.join()
 
+        # Close the checksum threads pool.
+        if self.checksum_pool:
+            self.checksum_pool.shutdown()
+
         return results
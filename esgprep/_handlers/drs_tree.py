@@ -10,8 +10,11 @@
 """
 
 import getpass
+import stat
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from pathlib import Path
-from shutil import Error
 from tempfile import NamedTemporaryFile
 
 from esgprep._exceptions.io import (
@@ -21,76 +24,162 @@ from esgprep._exceptions.io import (
     WriteAccessDenied,
 )
 from hurry.filesize import size
-from treelib import Tree
-from treelib.tree import DuplicatedNodeIdError
 
 from esgprep import _STDOUT
 from esgprep._exceptions import DuplicatedDataset
-from esgprep._handlers.constants import LINK_SEPARATOR, UNIX_COMMAND, UNIX_COMMAND_LABEL
+from esgprep._handlers.constants import UNIX_COMMAND, UNIX_COMMAND_LABEL
+from esgprep._utils.print import Print
 import os
 
 
-class DRSLeaf(object):
+class DRSNode(object):
+    """
+    Class handling a DRS tree node, i.e., a path component.
+    Path components are interned and the children are mapped by path component, so
+    that the memory scales with the number of unique path components.
+
+    """
+
+    __slots__ = ("name", "parent", "children")
+
+    def __init__(self, name, parent=None):
+        # Path component.
+        self.name = sys.intern(name)
+
+        # Parent node.
+        self.parent = parent
+
+        # Children nodes by path component, instantiated with the first child.
+        self.children = None
+
+    @property
+    def tag(self):
+        """
+        Returns the node label.
+
+        """
+        return self.name
+
+    @property
+    def parts(self):
+        """
+        Returns the path components from the DRS tree root.
+
+        """
+        parts = list()
+        node = self
+        while node.parent is not None:
+            parts.append(node.name)
+            node = node.parent
+        return tuple(reversed(parts))
+
+    @property
+    def identifier(self):
+        """
+        Returns the node path.
+
+        """
+        return os.path.join(*self.parts)
+
+    def is_leaf(self):
+        return not self.children
+
+    def is_root(self):
+        return self.parent is not None and self.parent.parent is None
+
+
+class DRSLeaf(DRSNode):
     """
     Class handling DRS tree leaf actions.
 
     """
 
-    def __init__(self, dst, mode, src=None):
+    __slots__ = ("src", "mode", "label")
+
+    def __init__(self, name, parent, mode, src=None, label=None):
+        super(DRSLeaf, self).__init__(name, parent)
+
         # Source data path.
         self.src = src
 
-        # Destination data path.
-        self.dst = dst
-
         # Migration mode.
         self.mode = mode
 
-    def upgrade(self, quiet=False, todo_only=True):
+        # Node label, only recorded if different from the path component.
+        self.label = label if label != name else None
+
+    @property
+    def tag(self):
+        return self.label or self.name
+
+    @property
+    def dst(self):
+        """
+        Returns the destination data path.
+
+        """
+        return self.identifier
+
+    def check(self):
+        """
+        Checks the destination state before upgrade.
+        Returns whether the destination directory has to be made and whether an
+        existing destination symbolic link has to be unlinked.
+
+        """
+        dst = self.dst
+        try:
+            st = os.lstat(dst)
+        except OSError:
+            return True, False
+
+        # Broken symbolic link.
+        mkdir = stat.S_ISLNK(st.st_mode) and not os.path.exists(dst)
+        return mkdir, self.mode == "symlink"
+
+    def commands(self, mkdir, unlink):
         """
-        Upgrade the DRS tree.
+        Returns the command-lines of the leaf upgrade.
 
         """
         # BE CAREFUL: Avoid any changes in the print statements here
         # Someone could use display outputs for parsing and further processing.
         # Any change of the line outputs can break this for users.
-
-        # --commands-file writes print statements ONLY in the submitted file
+        dst = self.dst
+        lines = list()
 
         # Make directory for destination path if not exist.
-        if not Path(self.dst).exists():
-            # Print mkdir command for both todo and actual execution
-            line = f"{'mkdir -p'} {os.path.dirname(self.dst)}"
-            print_cmd(line, quiet, todo_only)
-
-            if not todo_only:
-                try:
-                    os.makedirs(os.path.dirname(self.dst), exist_ok=True)
-                except FileExistsError:
-                    pass  # Directory already exists, expected case
-                except OSError as e:
-                    from esgprep._utils.print import Print
-
-                    Print.warning(f"Failed to create directory: {e}")
+        if mkdir:
+            lines.append(f"{'mkdir -p'} {os.path.dirname(dst)}")
 
         # Unlink symbolic link if already exists.
-        if self.mode == "symlink" and os.path.lexists(self.dst):
-            line = f"{'rm -f'} {self.dst}"
-            print_cmd(line, quiet, todo_only)
-            if not todo_only:
-                os.remove(self.dst)
+        if unlink:
+            lines.append(f"{'rm -f'} {dst}")
 
         # Make upgrade depending on the migration mode.
         line = UNIX_COMMAND_LABEL[self.mode]
         if self.src:
             line += " " + str(self.src)
-        line += " " + str(self.dst)
-        print_cmd(line, quiet, todo_only)
-        if not todo_only:
-            if self.src:
-                UNIX_COMMAND[self.mode](self.src, self.dst)
-            else:
-                UNIX_COMMAND[self.mode](self.dst)
+        line += " " + str(dst)
+        lines.append(line)
+        return lines
+
+    def apply(self, unlink):
+        """
+        Upgrades the DRS leaf, the destination directory being made.
+
+        """
+        dst = self.dst
+
+        # Unlink symbolic link if already exists.
+        if unlink:
+            os.remove(dst)
+
+        # Make upgrade depending on the migration mode.
+        if self.src:
+            UNIX_COMMAND[self.mode](self.src, dst)
+        else:
+            UNIX_COMMAND[self.mode](dst)
 
     def has_permissions(self, root):
         """
@@ -152,7 +241,42 @@ class DRSLeaf(object):
                         os.remove(dst)
 
 
-class DRSTree(Tree):
+class DRSPlan(object):
+    """
+    Class recording the DRS tree changes planned by a child process for one file.
+    The plan is returned to the main process, which merges it into the DRS tree.
+
+    """
+
+    __slots__ = ("leaves", "duplicates", "records")
+
+    def __init__(self):
+        # Leaves to create as (nodes, label, src, mode, force) tuples.
+        self.leaves = list()
+
+        # Duplicated files to remove.
+        self.duplicates = list()
+
+        # Dataset records as (key, record, infos) tuples.
+        self.records = list()
+
+    def create_leaf(self, nodes, label, src, mode, force=False):
+        """
+        Plans the creation of all nodes from DRS root to a DRS leaf.
+
+        """
+        self.leaves.append((tuple(nodes), label, src, mode, force))
+
+    def add_record(self, key, record, infos):
+        """
+        Plans a file record of a dataset.
+        The dataset infos are only used if the dataset has not been recorded yet.
+
+        """
+        self.records.append((key, record, infos))
+
+
+class DRSTree(object):
     """
     Class handling DRS tree leaf actions.
 
@@ -161,8 +285,12 @@ class DRSTree(Tree):
     def __init__(
         self, root=None, mode=None, outfile=None
     ):  # Lolo Change version=Node en 2eme argument remove
-        # Retrieve original class init
-        Tree.__init__(self)
+        # Tree root node, parent of the first path components.
+        self.root = DRSNode("")
+
+        # Leaves in creation order.
+        self._leaves = dict()
+
         # Dataset and files record.
         self.paths = dict()
 
@@ -201,9 +329,26 @@ class DRSTree(Tree):
             return self.paths[key].get(field)
         return None
 
+    def merge(self, plan: DRSPlan) -> None:
+        """
+        Merges the DRS tree changes planned by a child process.
+
+        """
+        for leaf in plan.leaves:
+            self.create_leaf(*leaf)
+        self.duplicates.extend(plan.duplicates)
+        for key, record, infos in plan.records:
+            if key in self.paths:
+                self.paths[key]["files"].append(record)
+            else:
+                self.paths[key] = {"files": [record], **infos}
+
     def get_serializable_data(self) -> dict:
         """Extract serializable data from DRSTree for caching."""
         return {
+            "leaves": [
+                (leaf.parts, leaf.tag, leaf.src, leaf.mode) for leaf in self.leaves()
+            ],
             "paths": self.paths,
             "drs_root": self.drs_root,
             "drs_mode": self.drs_mode,
@@ -215,6 +360,10 @@ class DRSTree(Tree):
 
     def restore_from_data(self, data: dict) -> None:
         """Restore DRSTree state from serializable data."""
+        self.root = DRSNode("")
+        self._leaves = dict()
+        for leaf in data.get("leaves", []):
+            self.create_leaf(*leaf)
         self.paths = data.get("paths", {})
         self.drs_root = data.get("drs_root")
         self.drs_mode = data.get("drs_mode")
@@ -236,63 +385,115 @@ class DRSTree(Tree):
     def create_leaf(self, nodes, label, src, mode, force=False):
         """
         Creates all nodes from DRS root to a DRS leaf.
+        An existing node is kept, unless the DRS leaf creation is forced.
 
         """
-        # Iterate over DRS levels..
-        for i in range(len(nodes)):
-            # Node id = node "path"
-            node_id = os.path.join(*nodes[: i + 1])
-
-            # Escape in case of duplicated node.
-            try:
-                # Create first DRS node.
-                if i == 0:
-                    self.create_node(tag=nodes[i], identifier=node_id)
-
-                # Create DRS leaf nodes.
-                elif i == len(nodes) - 1:
-                    # Force DRS node removal if exists.
-                    if self.contains(node_id) and force:
-                        self.remove_node(node_id)
-
-                    # Get parent node id.
-                    parent_node_id = os.path.join(*nodes[:i])
-
-                    # Create DRS node embedding DRSLeaf object.
-                    self.create_node(
-                        tag=label,
-                        identifier=node_id,
-                        parent=parent_node_id,
-                        data=DRSLeaf(
-                            src=src, dst=node_id.split(LINK_SEPARATOR)[0], mode=mode
-                        ),
-                    )
-
-                # Create DRS nodes between DRS root and DRS leaf.
-                else:
-                    parent_node_id = os.path.join(*nodes[:i])
-                    self.create_node(
-                        tag=nodes[i], identifier=node_id, parent=parent_node_id
-                    )
+        # Get or create DRS nodes between DRS root and DRS leaf.
+        parent = self.root
+        for name in nodes[:-1]:
+            if parent.children is None:
+                parent.children = dict()
+            node = parent.children.get(name)
+            if node is None:
+                node = DRSNode(name, parent)
+                parent.children[node.name] = node
+            parent = node
+
+        # Escape in case of duplicated node.
+        if parent.children is None:
+            parent.children = dict()
+        node = parent.children.get(nodes[-1])
+        if node is not None:
+            if not force:
+                return
+
+            # Force DRS node removal if exists.
+            self.remove_node(node)
+
+        # Create DRS leaf node.
+        leaf = DRSLeaf(nodes[-1], parent, mode, src=src, label=label)
+        parent.children[leaf.name] = leaf
+        self._leaves[leaf] = None
+
+    def remove_node(self, node):
+        """
+        Removes a node and its subtree.
+
+        """
+        del node.parent.children[node.name]
+        for _, child in self.walk(node):
+            self._leaves.pop(child, None)
+
+    def get_node(self, nodes):
+        """
+        Returns the node from its path components or None.
+
+        """
+        node = self.root
+        for name in nodes:
+            node = (node.children or dict()).get(name)
+            if node is None:
+                return None
+        return node
+
+    def walk(self, node=None, topdown=True):
+        """
+        Yields the (path, node) of the whole DRS tree or of a subtree.
+        Parents are yielded before their children, unless walking bottom-up.
+        Paths are joined once per node along the walk.
+
+        """
+        if node is None:
+            for child in self.children():
+                yield from self._walk(child.name, child, topdown)
+        else:
+            yield from self._walk(node.identifier, node, topdown)
 
-            # Pass duplicated node error to recursively generated the tree
-            except DuplicatedNodeIdError:
-                pass
+    def _walk(self, path, node, topdown):
+        if topdown:
+            yield path, node
+        for child in self.children(node):
+            yield from self._walk(os.path.join(path, child.name), child, topdown)
+        if not topdown:
+            yield path, node
+
+    def children(self, node=None):
+        """
+        Returns the children nodes of a node or the DRS tree roots.
+
+        """
+        node = node or self.root
+        return (node.children or dict()).values()
+
+    def all_nodes(self):
+        """
+        Yields all the nodes of the DRS tree, parents before children.
+
+        """
+        for _, node in self.walk():
+            yield node
+
+    def size(self):
+        """
+        Returns the number of nodes.
+
+        """
+        return sum(1 for _ in self.walk())
 
     def leaves(self, root=None):
         """
         Yield leaves of the whole DRS tree of a subtree.
-        Overwrites basic tree.leaves() method that generates a list.
+        Leaves of the whole DRS tree are yielded in creation order.
 
         """
         if root is None:
-            for node in self._nodes.values():
+            for node in self._leaves:
                 if node.is_leaf():
                     yield node
         else:
-            for node in self.expand_tree(root):
-                if self[node].is_leaf():
-                    yield self[node]
+            for _, node in self.walk(root):
+                if node.is_leaf():
+                    yield node
 
     def check_uniqueness(self):
         """
@@ -335,10 +536,8 @@ class DRSTree(Tree):
         Remove empty version directory and its empty parents.
 
         """
-        all_tree_nodes = self.all_nodes()
-        for node in all_tree_nodes[::-1]:
+        for str_path, node in self.walk(topdown=False):
             if not node.is_root():
-                str_path = node.identifier
                 if Path(str_path).is_dir():
                     if len(os.listdir(str(str_path))) == 0:
                         print("remove empty dir ", str_path)
@@ -413,87 +612,90 @@ class DRSTree(Tree):
             # Show root path on single line for better readability
             print(self.drs_root)
 
-            # Create a new tree with only the DRS structure (relative to root)
-            from treelib import Tree
-
-            display_tree = Tree()
+            # Build the display tree with only the DRS structure (relative to root)
+            # as {parent relative path: {relative path: tag}}.
+            display_tree = dict()
 
             # Find all nodes that are under the DRS root
             drs_nodes = []
-            for node in self.all_nodes():
-                if node.identifier.startswith(self.drs_root):
+            for identifier, node in self.walk():
+                if identifier.startswith(self.drs_root):
                     # Get relative path from DRS root
-                    if node.identifier == self.drs_root:
+                    if identifier == self.drs_root:
                         continue  # Skip the root itself
-                    rel_path = os.path.relpath(node.identifier, self.drs_root)
+                    rel_path = os.path.relpath(identifier, self.drs_root)
                     if rel_path and rel_path != ".":
                         drs_nodes.append((rel_path, node))
 
             # Build the display tree with relative paths
-            for rel_path, original_node in sorted(drs_nodes):
+            for rel_path, original_node in sorted(drs_nodes, key=itemgetter(0)):
                 path_parts = rel_path.split(os.sep)
 
                 # Create all parent nodes if they don't exist
                 for i in range(len(path_parts)):
                     current_rel_path = os.sep.join(path_parts[: i + 1])
+                    parent_path = None if i == 0 else os.sep.join(path_parts[:i])
+                    siblings = display_tree.setdefault(parent_path, dict())
 
-                    if not display_tree.contains(current_rel_path):
-                        parent_path = None if i == 0 else os.sep.join(path_parts[:i])
-
+                    if current_rel_path not in siblings:
                         # Use the actual directory/file name as tag
                         tag = path_parts[i]
 
-                        # For leaf nodes with data, indicate it's a link to source
+                        # For leaf nodes, indicate it's a link to source
                         if (
                             i == len(path_parts) - 1
-                            and original_node.data
-                            and hasattr(original_node.data, "src")
-                            and original_node.data.src
-                            and hasattr(original_node.data, "mode")
+                            and isinstance(original_node, DRSLeaf)
+                            and original_node.src
                         ):
-                            if original_node.data.mode == "symlink":
-                                tag = f"{tag} -> {os.path.basename(str(original_node.data.src))}"
-                            elif original_node.data.mode == "move":
-                                tag = f"{tag} (moved from {os.path.basename(str(original_node.data.src))})"
-                            elif original_node.data.mode == "copy":
-                                tag = f"{tag} (copied from {os.path.basename(str(original_node.data.src))})"
-
-                        try:
-                            display_tree.create_node(
-                                tag=tag, identifier=current_rel_path, parent=parent_path
-                            )
-                        except Error:
-                            # Node might already exist
-                            pass
+                            src = os.path.basename(str(original_node.src))
+                            if original_node.mode == "symlink":
+                                tag = f"{tag} -> {src}"
+                            elif original_node.mode == "move":
+                                tag = f"{tag} (moved from {src})"
+                            elif original_node.mode == "copy":
+                                tag = f"{tag} (copied from {src})"
+
+                        siblings[current_rel_path] = tag
+
             # Show the display tree if it has content
-            if display_tree.size() > 0:
-                display_tree.show()
+            if display_tree:
+                show(display_tree)
             else:
                 print("└── (no DRS structure to display)")
         else:
             # No root specified or empty tree, use original display
-            self.show()
+            display_tree = dict()
+            for identifier, node in self.walk():
+                parent = node.parent
+                parent_path = os.path.dirname(identifier) if parent.parent else None
+                display_tree.setdefault(parent_path, dict())[identifier] = node.tag
+            show(display_tree)
 
         # Footer.
         print("".center(self.d_lengths[-1], "="))
 
-    def todo(self, **kwargs):
+    def todo(self, threads=0, **kwargs):
         """
         Prints command-lines to do as in a "dry-run" mode.
 
         """
-        self.upgrade(todo_only=True)
+        self.upgrade(todo_only=True, threads=threads)
 
-    def upgrade(self, todo_only=False, quiet=False):
+    def upgrade(self, todo_only=False, quiet=False, threads=0):
         """
         Upgrades the whole DRS tree.
+        The destination directories are made in a single pass, then the leaves are
+        upgraded concurrently by groups of same destination directory.
+        Returns the number of leaves that failed to upgrade.
 
         """
+        leaves = list(self.leaves())
+
         # Check permissions and migration availability before upgrade
         if not todo_only:
-            for leaf in self.leaves():
-                leaf.data.has_permissions(self.drs_root)
-                leaf.data.migration_granted(self.drs_root)
+            for leaf in leaves:
+                leaf.has_permissions(self.drs_root)
+                leaf.migration_granted(self.drs_root)
 
         # Header.
         # print(self.paths)
@@ -504,9 +706,39 @@ class DRSTree(Tree):
             print("Unix command-lines".center(self.d_lengths[-1]))
         print("".center(self.d_lengths[-1], "-"))
 
+        # Check destinations before any change.
+        states = pool_map(DRSLeaf.check, leaves, threads)
+
+        # Print command-lines in the DRS tree order.
+        for leaf, (mkdir, unlink) in zip(leaves, states):
+            for line in leaf.commands(mkdir, unlink):
+                print_cmd(line, quiet, todo_only)
+
         # Apply DRSLeaf action/migration.
-        for leaf in self.leaves():
-            leaf.data.upgrade(quiet=quiet, todo_only=todo_only)
+        errors = list()
+        if not todo_only:
+            # Make destination directories once, parents before children.
+            directories = {
+                os.path.dirname(leaf.dst)
+                for leaf, (mkdir, _) in zip(leaves, states)
+                if mkdir
+            }
+            for directory in sorted(directories):
+                try:
+                    os.makedirs(directory, exist_ok=True)
+                except OSError as e:
+                    Print.warning(f"Failed to create directory: {e}")
+
+            # Group leaves by destination directory.
+            groups = dict()
+            for leaf, (_, unlink) in zip(leaves, states):
+                groups.setdefault(leaf.parent, list()).append((leaf, unlink))
+
+            # Upgrade groups of leaves concurrently.
+            for group_errors in pool_map(apply_group, groups.values(), threads):
+                errors.extend(group_errors)
+            for leaf, error in errors:
+                Print.error(f"Failed to upgrade {leaf.dst}: {error}")
 
         # Remove duplicates.
         for duplicate in self.duplicates:
@@ -530,6 +762,65 @@ class DRSTree(Tree):
         # Footer.
         print("".center(self.d_lengths[-1], "="))
 
+        # Return number of errors.
+        return len(errors)
+
+
+def pool_map(func, iterable, threads=0):
+    """
+    Returns the list of results of a function applied to each item.
+    The function is applied by a pool of threads if any.
+
+    """
+    if not threads:
+        return list(map(func, iterable))
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return list(executor.map(func, iterable))
+
+
+def apply_group(group):
+    """
+    Upgrades a group of (DRSLeaf, unlink) of the same destination directory.
+    Returns the list of (DRSLeaf, error) that failed to upgrade.
+
+    """
+    errors = list()
+    for leaf, unlink in group:
+        try:
+            leaf.apply(unlink)
+        except Exception as error:
+            errors.append((leaf, error))
+    return errors
+
+
+def show(display_tree):
+    """
+    Prints a display tree in a visual way, sorting the nodes by tag at each level.
+    The display tree maps each parent identifier to its {identifier: tag} children.
+
+    """
+    lines = list()
+    stack = [
+        (identifier, tag, "", None)
+        for identifier, tag in sorted(
+            display_tree.get(None, dict()).items(), key=itemgetter(1), reverse=True
+        )
+    ]
+    while stack:
+        identifier, tag, leading, is_last = stack.pop()
+        if is_last is None:
+            lines.append(tag)
+            prefix = ""
+        else:
+            lines.append(leading + ("└── " if is_last else "├── ") + tag)
+            prefix = leading + ("    " if is_last else "│   ")
+        children = sorted(
+            display_tree.get(identifier, dict()).items(), key=itemgetter(1)
+        )
+        for idx, (child, child_tag) in reversed(list(enumerate(children))):
+            stack.append((child, child_tag, prefix, idx == len(children) - 1))
+    print("\n".join(lines) + "\n")
+
 
 def print_cmd(line, quiet=False, todo_only=False):
     """
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module:: esgprep._utils.cache.py
+   :platform: Unix
+   :synopsis: Persistent caches of file properties.
+
+.. moduleauthor:: Guillaume Levavasseur <glipsl@ipsl.fr>
+
+"""
+
+import json
+import os
+import sqlite3
+import threading
+
+from esgprep.constants import ATTRS_CACHE_FILE
+
+# Database connections by database path, process ID and thread ID.
+# Connections are kept for the lifetime of each process & thread and reused by any
+# unpickled copy of a cache.
+_CONNECTIONS = dict()
+
+# Hits & misses counted by the current process by database path.
+_COUNTS = dict()
+_COUNTS_LOCK = threading.Lock()
+
+
+def pop_counts():
+    """
+    Returns and resets the cache hits & misses counted by the current process.
+    Returns None if nothing has been counted, so that child processes only return the
+    counts with their results when required.
+
+    """
+    with _COUNTS_LOCK:
+        counts = {path: tuple(count) for path, count in _COUNTS.items() if any(count)}
+        _COUNTS.clear()
+    return counts or None
+
+
+def add_counts(counts):
+    """
+    Adds the cache hits & misses counted by a child process to the current process.
+
+    """
+    if not counts:
+        return
+    with _COUNTS_LOCK:
+        for path, (hits, misses) in counts.items():
+            count = _COUNTS.setdefault(path, [0, 0])
+            count[0] += hits
+            count[1] += misses
+
+
+class FileCache(object):
+    """
+    Base persistent cache of file properties backed by a SQLite database.
+    Entries are keyed by the file stat result so that any file change invalidates them.
+    Each process and thread opens its own connection once, which makes the cache safe
+    to share with the pool workers. Hits & misses are counted by each process.
+
+    """
+
+    # Database filename & table schema.
+    FILENAME = None
+    SCHEMA = None
+
+    def __init__(self, directory):
+        # Set cache database path.
+        self.directory = directory
+        self.path = os.path.join(directory, self.FILENAME)
+
+    @property
+    def db(self):
+        """
+        Returns the database connection of the current process and thread.
+
+        """
+        key = (self.path, os.getpid(), threading.get_ident())
+        db = _CONNECTIONS.get(key)
+        if db is None:
+            os.makedirs(self.directory, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(self.SCHEMA)
+            _CONNECTIONS[key] = db
+        return db
+
+    @property
+    def hits(self):
+        """
+        Returns the number of cache hits counted by the current process.
+
+        """
+        return _COUNTS.get(self.path, (0, 0))[0]
+
+    @property
+    def misses(self):
+        """
+        Returns the number of cache misses counted by the current process.
+
+        """
+        return _COUNTS.get(self.path, (0, 0))[1]
+
+    def count(self, hit):
+        """
+        Counts a cache hit or miss.
+
+        """
+        with _COUNTS_LOCK:
+            count = _COUNTS.setdefault(self.path, [0, 0])
+            count[0 if hit else 1] += 1
+
+
+class AttributesCache(FileCache):
+    """
+    Persistent cache of netCDF global attributes backed by a SQLite database.
+    Entries are keyed by (device, inode, size, mtime_ns) and record the names of all the
+    global attributes with the values read so far, so that unchanged files are never
+    reopened across runs. Values are stored as JSON, numpy values being converted into
+    Python scalars or lists.
+
+    """
+
+    FILENAME = ATTRS_CACHE_FILE
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS attributes ("
+        "device INTEGER, inode INTEGER, size INTEGER, mtime_ns INTEGER, "
+        "names TEXT, attrs TEXT, "
+        "PRIMARY KEY (device, inode, size, mtime_ns))"
+    )
+
+    @staticmethod
+    def key(st):
+        """
+        Returns the cache key of a file stat result.
+
+        """
+        return st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns
+
+    @staticmethod
+    def to_json(value):
+        """
+        Converts a numpy attribute value into a Python scalar or list.
+
+        """
+        if hasattr(value, "tolist"):
+            return value.tolist()
+        if isinstance(value, bytes):
+            return value.decode(errors="replace")
+        raise TypeError(f"Unsupported attribute value: {value!r}")
+
+    def get(self, st):
+        """
+        Returns the cached attribute names and values or (None, None).
+
+        """
+        try:
+            row = self.db.execute(
+                "SELECT names, attrs FROM attributes "
+                "WHERE device=? AND inode=? AND size=? AND mtime_ns=?",
+                self.key(st),
+            ).fetchone()
+            if row is None:
+                return None, None
+            return json.loads(row[0]), json.loads(row[1])
+        except (sqlite3.Error, ValueError) as e:
+            from esgprep._utils.print import Print
+
+            Print.debug(f"Attributes cache lookup failed: {e}")
+            return None, None
+
+    def set(self, st, names, attrs):
+        """
+        Records the attribute names and values of a file.
+
+        """
+        try:
+            self.db.execute(
+                "INSERT OR REPLACE INTO attributes VALUES (?, ?, ?, ?, ?, ?)",
+                self.key(st)
+                + (json.dumps(list(names)), json.dumps(attrs, default=self.to_json)),
+            )
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            from esgprep._utils.print import Print
+
+            Print.debug(f"Attributes cache update failed: {e}")
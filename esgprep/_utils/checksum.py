@@ -11,9 +11,19 @@
 
 import hashlib
 import os
+import queue
 import re
+import sqlite3
+import threading
+from pathlib import Path
 
 from esgprep._exceptions import InvalidChecksumType, ChecksumFail
+from esgprep._utils.cache import FileCache
+from esgprep.constants import (
+    CHECKSUM_CACHE_FILE,
+    CHECKSUM_XATTR_PREFIX,
+    READ_BLOCK_SIZE,
+)
 
 # Multihash support - implement varint encoding directly to avoid dependency
 
@@ -46,6 +56,59 @@ MULTIHASH_ALGOS = {
 }
 
 
+class MultihashHasher(object):
+    """
+    Incremental multihash hasher with a hashlib-like API.
+    Data are fed through update() and the multihash prefix (varint-encoded
+    algorithm code and digest length) is only added when the digest is requested.
+
+    """
+
+    def __init__(self, algo: str):
+        if algo not in MULTIHASH_ALGOS:
+            raise ValueError(f"Unsupported multihash algorithm: {algo}")
+
+        # Set multihash algorithm name.
+        self.name = algo
+
+        # Get multihash code and corresponding hashlib client.
+        self.code, hashlib_name = MULTIHASH_ALGOS[algo]
+        self._hash = hashlib.new(hashlib_name)
+
+    def update(self, data) -> None:
+        """
+        Feeds the underlying hashlib client with a new chunk of data.
+
+        """
+        self._hash.update(data)
+
+    def copy(self) -> "MultihashHasher":
+        """
+        Returns a copy of the hasher state.
+
+        """
+        other = self.__class__.__new__(self.__class__)
+        other.name = self.name
+        other.code = self.code
+        other._hash = self._hash.copy()
+        return other
+
+    def digest(self) -> bytes:
+        """
+        Returns the multihash as bytes (code + length + digest).
+
+        """
+        digest = self._hash.digest()
+        return _varint_encode(self.code) + _varint_encode(len(digest)) + digest
+
+    def hexdigest(self) -> str:
+        """
+        Returns the multihash as a hexadecimal string.
+
+        """
+        return self.digest().hex()
+
+
 def multihash(data: bytes, algo: str) -> bytes:
     """
     Generate a multihash for the given data using the specified algorithm.
@@ -60,17 +123,9 @@ def multihash(data: bytes, algo: str) -> bytes:
     Raises:
         ValueError: If the algorithm is not supported
     """
-    if algo not in MULTIHASH_ALGOS:
-        raise ValueError(f"Unsupported multihash algorithm: {algo}")
-
-    code, hashlib_name = MULTIHASH_ALGOS[algo]
-    h = hashlib.new(hashlib_name)
+    h = MultihashHasher(algo)
     h.update(data)
-    digest = h.digest()
-
-    code_bytes = _varint_encode(code)
-    length_bytes = _varint_encode(len(digest))
-    return code_bytes + length_bytes + digest
+    return h.digest()
 
 
 def multihash_hex(data: bytes, algo: str) -> str:
@@ -154,11 +209,157 @@ def is_multihash_algo(checksum_type: str) -> bool:
     return checksum_type in MULTIHASH_ALGOS
 
 
-def checksum(ffp, checksum_type, include_filename=False, human_readable=True):
+def new_hasher(checksum_type):
+    """
+    Returns an incremental hasher for the checksum type.
+    Multihash algorithms take priority on hashlib algorithms with the same name.
+
+    """
+    if is_multihash_algo(checksum_type):
+        return MultihashHasher(checksum_type)
+    return getattr(hashlib, checksum_type)()
+
+
+def _fadvise(fd, offset, length, advice):
+    """
+    Gives an access pattern advice to the kernel, if supported.
+
+    """
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, offset, length, advice)
+        except OSError:
+            pass
+
+
+# Read buffers of each thread by block size, reused across files.
+_BUFFERS = threading.local()
+
+
+def take_buffers(block_size, n=2):
+    """
+    Returns read buffers of the current thread, allocated on first use only.
+
+    """
+    free = _BUFFERS.__dict__.setdefault(block_size, list())
+    return [free.pop() if free else bytearray(block_size) for _ in range(n)]
+
+
+def release_buffers(block_size, buffers):
+    """
+    Gives back read buffers to the current thread.
+
+    """
+    _BUFFERS.__dict__.setdefault(block_size, list()).extend(buffers)
+
+
+def iter_blocks(ffp, block_size=READ_BLOCK_SIZE):
+    """
+    Yields successive file blocks as memoryviews.
+    Blocks are read with readinto() into two buffers of the current thread by a reader
+    thread, so that reading the next block overlaps the processing of the current one.
+    Small files are read into a buffer of the file size.
+    Each block must be consumed before asking for the next one.
+    Already processed pages are dropped from the page cache.
+
+    """
+    with open(ffp, "rb", buffering=0) as f:
+        fd = f.fileno()
+        _fadvise(fd, 0, 0, getattr(os, "POSIX_FADV_SEQUENTIAL", 0))
+        dontneed = getattr(os, "POSIX_FADV_DONTNEED", None)
+
+        # Small files are read in the current thread.
+        # One more byte detects the end of file in a single read.
+        size = os.fstat(fd).st_size
+        if size <= block_size:
+            buf = bytearray(min(size + 1, block_size))
+            offset = 0
+            while True:
+                n = f.readinto(buf)
+                if not n:
+                    break
+                yield memoryview(buf)[:n]
+                offset += n
+            if dontneed is not None:
+                _fadvise(fd, 0, offset, dontneed)
+            return
+
+        # Free and filled buffers queues.
+        buffers = take_buffers(block_size)
+        free = queue.Queue()
+        filled = queue.Queue()
+        for buf in buffers:
+            free.put(buf)
+
+        def reader():
+            try:
+                while True:
+                    buf = free.get()
+                    # Stop requested.
+                    if buf is None:
+                        return
+                    n = f.readinto(buf)
+                    if not n:
+                        filled.put((None, 0))
+                        return
+                    filled.put((buf, n))
+            except BaseException as e:
+                filled.put((e, 0))
+
+        thread = threading.Thread(target=reader, daemon=True)
+        thread.start()
+        offset = 0
+        try:
+            while True:
+                buf, n = filled.get()
+                if buf is None:
+                    break
+                if isinstance(buf, BaseException):
+                    raise buf
+                yield memoryview(buf)[:n]
+                free.put(buf)
+                if dontneed is not None:
+                    _fadvise(fd, offset, n, dontneed)
+                offset += n
+        finally:
+            free.put(None)
+            thread.join()
+            release_buffers(block_size, buffers)
+
+
+def checksum_types_list(checksum_type):
+    """
+    Returns the checksum type(s) as a list.
+
+    """
+    if isinstance(checksum_type, str):
+        return [checksum_type]
+    return list(checksum_type)
+
+
+def checksum(
+    ffp,
+    checksum_type,
+    include_filename=False,
+    human_readable=True,
+    block_size=READ_BLOCK_SIZE,
+):
     """
     Computes a file checksum. Supports both standard hashlib algorithms and multihash algorithms.
+    The file is streamed block by block so memory usage does not depend on the file size.
+    A list of checksum types returns a dictionary {checksum_type: checksum} computed in one read pass.
 
     """
+    checksum_types = checksum_types_list(checksum_type)
+
+    # Get checksum clients.
+    hash_algos = dict()
+    for checksum_type_ in checksum_types:
+        try:
+            hash_algos[checksum_type_] = new_hasher(checksum_type_)
+        except (AttributeError, ValueError):
+            raise InvalidChecksumType(checksum_type_)
+
     try:
         # Get file size for progress indication
         file_size = os.path.getsize(ffp)
@@ -168,94 +369,41 @@ def checksum(ffp, checksum_type, include_filename=False, human_readable=True):
             from esgprep._utils.print import Print
 
             Print.info(
-                f"Computing {checksum_type} checksum for large file: {os.path.basename(ffp)} ({file_size / (1024 * 1024):.1f} MB)"
+                f"Computing {', '.join(checksum_types)} checksum for large file: {os.path.basename(ffp)} ({file_size / (1024 * 1024):.1f} MB)"
             )
 
-        # Check if this is a multihash algorithm
-        if is_multihash_algo(checksum_type):
-            # Handle multihash algorithms
-            if show_progress:
-                # For large files, read in chunks and show progress
-                hash_data = bytearray()
-                bytes_read = 0
-                chunk_size = 64 * 1024  # 64KB chunks
-
-                with open(ffp, "rb") as f:
-                    while True:
-                        chunk = f.read(chunk_size)
-                        if not chunk:
-                            break
-                        hash_data.extend(chunk)
-                        bytes_read += len(chunk)
-
-                        # Show progress every 1GB
-                        if bytes_read % (1024 * 1024 * 1024) == 0:
-                            progress_pct = int((bytes_read / file_size) * 100)
-                            Print.info(f"  Progress: {progress_pct}%")
-
-                if show_progress:
-                    Print.info("  Converting data to bytes for hash calculation...")
-                data = bytes(hash_data)
-            else:
-                # Read file data normally for smaller files
-                with open(ffp, "rb") as f:
-                    data = f.read()
-
-            # Include filename into the data if requested
-            if include_filename:
-                data += os.path.basename(ffp).encode()
-
-            # Generate multihash
-            if show_progress:
-                Print.info(
-                    f"  Generating {checksum_type} multihash (this may take a while for large files)..."
-                )
-
-            if human_readable:
-                result = multihash_hex(data, checksum_type)
-            else:
-                result = multihash(data, checksum_type)
-
-            if show_progress:
-                Print.info(f"  Checksum completed: {result[:32]}...")
-
-            return result
-
-        else:
-            # Handle standard hashlib algorithms
-            # Get checksum client.
-            hash_algo = getattr(hashlib, checksum_type)()
-
-            # Checksumming file.
-            with open(ffp, "rb") as f:
-                blocksize = os.stat(ffp).st_blksize
-                bytes_read = 0
-
-                for block in iter(lambda: f.read(blocksize), b""):
-                    hash_algo.update(block)
-                    bytes_read += len(block)
-
-                    # Show progress for large files every 1GB
-                    if show_progress and bytes_read % (1024 * 1024 * 1024) == 0:
-                        progress_pct = int((bytes_read / file_size) * 100)
-                        Print.info(f"  Progress: {progress_pct}%")
-
-            # Include filename into the checksum.
-            if include_filename:
+        # Checksumming file.
+        bytes_read = 0
+        next_progress = 1024 * 1024 * 1024
+        for block in iter_blocks(ffp, block_size or READ_BLOCK_SIZE):
+            for hash_algo in hash_algos.values():
+                hash_algo.update(block)
+            bytes_read += len(block)
+
+            # Show progress for large files every 1GB
+            if show_progress and bytes_read >= next_progress:
+                progress_pct = int((bytes_read / file_size) * 100)
+                Print.info(f"  Progress: {progress_pct}%")
+                next_progress += 1024 * 1024 * 1024
+
+        # Include filename into the checksum.
+        if include_filename:
+            for hash_algo in hash_algos.values():
                 hash_algo.update(os.path.basename(ffp).encode())
 
-            if show_progress:
-                Print.info("  Checksum completed")
+        if show_progress:
+            Print.info("  Checksum completed")
 
-            # Return human readable checksum.
-            if human_readable:
-                return hash_algo.hexdigest()
-            else:
-                return hash_algo.digest()
+        # Return human readable checksum.
+        if human_readable:
+            results = {k: h.hexdigest() for k, h in hash_algos.items()}
+        else:
+            results = {k: h.digest() for k, h in hash_algos.items()}
 
-    # Catch checksum type error.
-    except AttributeError:
-        raise InvalidChecksumType(checksum_type)
+        # Single checksum type returns the checksum only.
+        if isinstance(checksum_type, str):
+            return results[checksum_type]
+        return results
 
     # Catch manual stop error.
     except KeyboardInterrupt:
@@ -263,7 +411,7 @@ def checksum(ffp, checksum_type, include_filename=False, human_readable=True):
 
     # Catch any other error.
     except Exception:
-        raise ChecksumFail(ffp, checksum_type)
+        raise ChecksumFail(ffp, ", ".join(checksum_types))
 
 
 def get_checksum_pattern(checksum_type):
@@ -290,21 +438,468 @@ def get_checksum_pattern(checksum_type):
         return re.compile(f"^[0-9a-f]{{{checksum_length}}}$")
 
 
-def get_checksum(ffp, checksum_type="sha256", checksums=None):
+def is_checksum_of_type(value, checksum_type):
+    """
+    Checks a checksum value corresponds to the checksum type.
+    A multihash has to be prefixed by the code of the algorithm and the length of
+    its digest.
+
+    """
+    if not re.match(get_checksum_pattern(checksum_type), value):
+        return False
+
+    # Verify multihash algorithm and digest length.
+    if is_multihash_algo(checksum_type):
+        if detect_multihash_algo(value) != checksum_type:
+            return False
+        hash_bytes = bytes.fromhex(value)
+        _, offset = _varint_decode(hash_bytes, 0)
+        length, offset = _varint_decode(hash_bytes, offset)
+        digest_size = hashlib.new(MULTIHASH_ALGOS[checksum_type][1]).digest_size
+        return length == digest_size == len(hash_bytes) - offset
+
+    return True
+
+
+# Loaded checksum manifests, inherited by forked child processes.
+_MANIFESTS = dict()
+
+# BSD-style checksum line (i.e., "shasum --tag" or "sha256sum --tag").
+_TAGGED_LINE = re.compile(rb"^[\w-]+ \((.*)\) = ([0-9a-fA-F]+)$")
+
+
+def _unescape(name):
+    """
+    Unescapes a filename from a "*sum" line starting with a backslash.
+
+    """
+    result = bytearray()
+    i = 0
+    while i < len(name):
+        char = name[i : i + 1]
+        if char == b"\\" and i + 1 < len(name):
+            i += 1
+            char = {b"n": b"\n", b"r": b"\r"}.get(name[i : i + 1], name[i : i + 1])
+        result += char
+        i += 1
+    return bytes(result)
+
+
+def parse_checksum_line(line):
+    """
+    Parses a line of any checksum client output into (filename, checksum) bytes.
+    Supports "sha256sum" and "shasum" formats, with the "*" binary marker, the
+    BSD-style tagged format and the backslash-escaped filenames.
+    Returns None if the line does not match.
+
+    """
+    line = line.rstrip(b"\r\n")
+
+    # Escaped filename.
+    escaped = line.startswith(b"\\")
+    if escaped:
+        line = line[1:]
+
+    # Tagged format.
+    match = _TAGGED_LINE.match(line)
+    if match:
+        name, value = match.groups()
+
+    # "<checksum>  <filename>" or "<checksum> *<filename>" format.
+    else:
+        value, sep, name = line.partition(b" ")
+        if not sep or not value:
+            return None
+        if name[:1] in (b" ", b"*", b"^"):
+            name = name[1:]
+
+    if not name:
+        return None
+    if escaped:
+        name = _unescape(name)
+    return name, value
+
+
+class ChecksumsManifest(object):
+    """
+    Indexed list of pre-computed checksums, similar to any checksum client output.
+    The manifest is streamed once per process into a sorted array of (path hash, line
+    offset) records and looked up by binary search into the memory-mapped manifest.
+    It is only pickled as the manifest path: forked child processes share the index
+    and the mapped pages loaded by the main process, while child processes started
+    from a forkserver receive the index once at startup and only map the manifest.
+
+    """
+
+    def __init__(self, path):
+        # Set manifest path.
+        self.path = path
+
+        # Index is loaded on first lookup.
+        self._keys = None
+        self._offsets = None
+        self._data = None
+
+    def __reduce__(self):
+        return load_manifest, (self.path,)
+
+    def __eq__(self, other):
+        return isinstance(other, ChecksumsManifest) and other.path == self.path
+
+    def __hash__(self):
+        return hash(self.path)
+
+    @staticmethod
+    def normalize(ffp):
+        """
+        Returns the normalized absolute path used as index key.
+
+        """
+        path = os.fsencode(ffp)
+
+        # Most manifests list already normalized absolute paths.
+        if path.startswith(b"/") and b"/." not in path and b"//" not in path:
+            return path.rstrip(b"/") or path
+        return os.path.abspath(path)
+
+    @staticmethod
+    def hash(key):
+        """
+        Returns the 64-bit hash of a normalized path.
+
+        """
+        return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+    def load(self):
+        """
+        Streams the manifest and builds the sorted index.
+
+        """
+        from array import array
+
+        import numpy as np
+
+        keys, offsets = array("Q"), array("Q")
+        offset = 0
+        with open(self.path, "rb") as checksums_file:
+            for line in checksums_file:
+                entry = parse_checksum_line(line)
+                if entry:
+                    keys.append(self.hash(self.normalize(entry[0])))
+                    offsets.append(offset)
+                offset += len(line)
+
+        # Sort records by path hash, keeping the manifest order of duplicates.
+        keys = np.frombuffer(keys, dtype=np.uint64)
+        offsets = np.frombuffer(offsets, dtype=np.uint64)
+        order = np.argsort(keys, kind="stable")
+        self._keys = keys[order]
+        self._offsets = offsets[order]
+
+        # Map the manifest to read checksums on lookup.
+        self.map()
+
+    def map(self):
+        """
+        Maps the manifest to read checksums on lookup.
+
+        """
+        import mmap
+
+        with open(self.path, "rb") as checksums_file:
+            if os.fstat(checksums_file.fileno()).st_size:
+                self._data = mmap.mmap(
+                    checksums_file.fileno(), 0, access=mmap.ACCESS_READ
+                )
+
+    def lookup(self, ffp):
+        """
+        Returns the checksum of the file or None.
+
+        """
+        import numpy as np
+
+        if self._keys is None:
+            self.load()
+        key = self.normalize(ffp)
+        h = self.hash(key)
+        value = None
+        i = int(self._keys.searchsorted(np.uint64(h)))
+
+        # Check each record of the same hash, the last manifest entry wins.
+        while i < len(self._keys) and int(self._keys[i]) == h:
+            offset = int(self._offsets[i])
+            end = self._data.find(b"\n", offset)
+            entry = parse_checksum_line(self._data[offset : end if end >= 0 else None])
+            if entry and self.normalize(entry[0]) == key:
+                value = entry[1].decode()
+            i += 1
+        return value
+
+    def __len__(self):
+        if self._keys is None:
+            self.load()
+        return len(self._keys)
+
+    def __contains__(self, ffp):
+        return self.lookup(ffp) is not None
+
+    def __getitem__(self, ffp):
+        value = self.lookup(ffp)
+        if value is None:
+            raise KeyError(ffp)
+        return value
+
+    def get(self, ffp, default=None):
+        value = self.lookup(ffp)
+        return default if value is None else value
+
+
+def load_manifest(path):
+    """
+    Returns the checksums manifest of the path, loaded once per process.
+
+    """
+    if path not in _MANIFESTS:
+        _MANIFESTS[path] = ChecksumsManifest(path)
+    return _MANIFESTS[path]
+
+
+def get_manifests_state():
+    """
+    Returns the indexes of the loaded manifests, to restore in child processes not
+    forked from the main process (i.e., the forkserver mode).
+
+    """
+    return {
+        path: (manifest._keys, manifest._offsets)
+        for path, manifest in _MANIFESTS.items()
+        if manifest._keys is not None
+    }
+
+
+def set_manifests_state(state):
+    """
+    Restores the manifest indexes of the main process, so that the manifests are only
+    mapped instead of being streamed again.
+
+    """
+    for path, (keys, offsets) in state.items():
+        manifest = load_manifest(path)
+        manifest._keys, manifest._offsets = keys, offsets
+        manifest.map()
+
+
+class ChecksumJob(object):
+    """
+    Deferred checksum request returned by a child process.
+    The files checksums are computed by the checksum threads of the main process,
+    which then resume the child process work with the saved state.
+
+    """
+
+    def __init__(self, source, files, state=None):
+        # Source processed by the child process.
+        self.source = source
+
+        # Files to checksum.
+        self.files = files
+
+        # Child process state to resume from.
+        self.state = state or dict()
+
+
+class ChecksumCache(FileCache):
+    """
+    Persistent checksum cache backed by a SQLite database.
+    Entries are keyed by (device, inode, size, mtime_ns, checksum type) so that any
+    file change invalidates the cached checksum.
+
+    """
+
+    FILENAME = CHECKSUM_CACHE_FILE
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS checksums ("
+        "device INTEGER, inode INTEGER, size INTEGER, mtime_ns INTEGER, "
+        "checksum_type TEXT, checksum TEXT, "
+        "PRIMARY KEY (device, inode, size, mtime_ns, checksum_type))"
+    )
+
+    @staticmethod
+    def key(st, checksum_type):
+        """
+        Builds the cache key from a stat result.
+
+        """
+        return st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, checksum_type
+
+    def get(self, st, checksum_type):
+        """
+        Returns the cached checksum or None.
+
+        """
+        try:
+            row = self.db.execute(
+                "SELECT checksum FROM checksums WHERE device=? AND inode=? AND size=? "
+                "AND mtime_ns=? AND checksum_type=?",
+                self.key(st, checksum_type),
+            ).fetchone()
+        except sqlite3.Error as e:
+            from esgprep._utils.print import Print
+
+            Print.debug(f"Checksum cache lookup failed: {e}")
+            row = None
+
+        if row:
+            self.count(hit=True)
+            return row[0]
+
+        self.count(hit=False)
+        return None
+
+    def set(self, st, checksum_type, value):
+        """
+        Records a checksum, replacing any outdated entry for the same file.
+
+        """
+        device, inode, size, mtime_ns, _ = self.key(st, checksum_type)
+        try:
+            with self.db:
+                self.db.execute(
+                    "DELETE FROM checksums WHERE device=? AND inode=? AND checksum_type=?",
+                    (device, inode, checksum_type),
+                )
+                self.db.execute(
+                    "INSERT OR REPLACE INTO checksums VALUES (?, ?, ?, ?, ?, ?)",
+                    (device, inode, size, mtime_ns, checksum_type, value),
+                )
+        except sqlite3.Error as e:
+            from esgprep._utils.print import Print
+
+            Print.debug(f"Checksum cache update failed: {e}")
+
+
+class ChecksumXattrs(object):
+    """
+    Checksums stored in the "user.<checksum_type>" extended attributes of the files.
+    Each value records the file size and modification time (in nanoseconds) it has been
+    computed for, as "<checksum> <size> <mtime_ns>", so that any file change invalidates it.
+    Filesystems without extended attributes support silently disable it.
+
+    """
+
+    def __init__(self, prefix=CHECKSUM_XATTR_PREFIX):
+        # Set extended attribute namespace.
+        self.prefix = prefix
+
+    def name(self, checksum_type):
+        """
+        Returns the extended attribute name of the checksum type.
+
+        """
+        return self.prefix + checksum_type
+
+    def get(self, ffp, st, checksum_type):
+        """
+        Returns the checksum recorded for the file or None.
+
+        """
+        try:
+            value = os.getxattr(ffp, self.name(checksum_type)).decode().split()
+        except (OSError, UnicodeDecodeError):
+            return None
+
+        # Verify recorded file size and modification time.
+        if len(value) == 3 and value[1:] == [str(st.st_size), str(st.st_mtime_ns)]:
+            return value[0]
+        return None
+
+    def set(self, ffp, st, checksum_type, value):
+        """
+        Records the checksum into the file extended attributes.
+
+        """
+        value = "{} {} {}".format(value, st.st_size, st.st_mtime_ns)
+        try:
+            os.setxattr(ffp, self.name(checksum_type), value.encode())
+        except OSError as e:
+            from esgprep._utils.print import Print
+
+            Print.debug(f"Checksum extended attribute update failed: {e}")
+
+
+def get_checksum(
+    ffp,
+    checksum_type="sha256",
+    checksums=None,
+    cache=None,
+    block_size=None,
+    xattrs=None,
+):
     """
     Global method to get file checksum:
-    1. By computing the checksum directly.
-    2. Through a list of checksums in a dictionary way {file: checksum}.
+    1. Through a list of checksums in a dictionary way {file: checksum}.
+    2. Through the file extended attributes.
+    3. Through the persistent checksum cache.
+    4. By computing the checksum directly (and recording it into the cache and the
+    extended attributes).
+    A list of checksum types returns a dictionary {checksum_type: checksum}.
+    Missing checksums are computed together in one read pass.
 
     """
+    checksum_types = checksum_types_list(checksum_type)
+    results = dict()
+
     # Verify checksum dictionary.
     if checksums:
         # Verify file in dictionary keys.
-        if ffp in checksums:
-            # Verify checksum pattern.
-            if re.match(get_checksum_pattern(checksum_type), checksums[ffp]):
-                # Return pre-computed checksum.
-                return checksums[ffp]
-
-    # Return computed checksum.
-    return checksum(ffp, checksum_type)
+        value = checksums.get(ffp)
+        if value is not None:
+            for checksum_type_ in checksum_types:
+                # Verify checksum format.
+                # A pre-computed checksum is used for one checksum type only.
+                if is_checksum_of_type(value, checksum_type_):
+                    results[checksum_type_] = value
+                    break
+
+    # Stat file to validate stored checksums.
+    # Collected paths carry the stat result of the directory scan.
+    st = None
+    if cache is not None or xattrs is not None:
+        st = ffp.stat() if isinstance(ffp, Path) else os.stat(ffp)
+
+    # Look up the file extended attributes.
+    if xattrs is not None:
+        for checksum_type_ in checksum_types:
+            if checksum_type_ not in results:
+                value = xattrs.get(ffp, st, checksum_type_)
+                if value is not None:
+                    results[checksum_type_] = value
+
+    # Look up the checksum cache.
+    if cache is not None:
+        for checksum_type_ in checksum_types:
+            if checksum_type_ not in results:
+                value = cache.get(st, checksum_type_)
+                if value is not None:
+                    results[checksum_type_] = value
+
+    # Compute missing checksums in one pass.
+    missing = [t for t in checksum_types if t not in results]
+    if missing:
+        computed = checksum(ffp, missing, block_size=block_size)
+        results.update(computed)
+
+        # Record checksums only if the file has not changed in the meantime.
+        key = ChecksumCache.key
+        if st is not None and key(os.stat(ffp), None) == key(st, None):
+            for checksum_type_, value in computed.items():
+                if cache is not None:
+                    cache.set(st, checksum_type_, value)
+                if xattrs is not None:
+                    xattrs.set(ffp, st, checksum_type_, value)
+
+    # Single checksum type returns the checksum only.
+    if isinstance(checksum_type, str):
+        return results[checksum_type]
+    return {t: results[t] for t in checksum_types}
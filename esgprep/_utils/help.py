@@ -92,6 +92,14 @@ Special case, with '--log -', messages are written to standard output as they wo
 
 """
 
+LOG_FORMAT_HELP = """Logfile format.
+"text" writes the messages as printed without colors.
+"json" writes one JSON object per line with the time, process ID, level and message,
+and the processing time and status of each file.
+Default is "text".
+
+"""
+
 VERBOSE_HELP = """Debug mode. It disables progress bars and print verbose process infos.
 
 """
@@ -315,6 +323,8 @@ This overwrites facet auto-detection.
 
 CHECKSUM_TYPE_HELP = """Specify the checksum algorithm to use.
 Supports standard hashlib algorithms (sha256, sha1, md5, etc.) and multihash algorithms (sha2-256, sha2-512, sha3-256, sha3-512).
+Several comma-separated algorithms (e.g., "sha256,sha2-256") are computed in one read pass.
+The first one fills the "checksum" field, the others are added as "checksum_<TYPE>" fields.
 Default: sha256
 
 """
@@ -384,6 +394,44 @@ Set to "-1" seems all available resources as returned by "multiprocessing.cpu_co
 
 """
 
+FORKSERVER_HELP = """Start the child processes from a forkserver with preloaded modules (esgvoc, netCDF4)
+instead of forking the main process.
+The index of the "--checksums-from" file is sent to each child process at startup
+(16 bytes per listed file), instead of being shared with the main process.
+
+"""
+
+CHUNKSIZE_HELP = """Number of files sent to a child process at once.
+Larger chunks reduce the inter-process communication overhead with many small files.
+Default is "1".
+
+"""
+
+WALK_THREADS_HELP = """Number of threads listing the directories concurrently while walking through the input directories.
+Useful with wide or deep trees on filesystems with high metadata latency (e.g., parallel filesystems).
+Default is "0", i.e., directories are listed one after the other.
+
+"""
+
+SORTED_WALK_HELP = """Walk through the input directories in a deterministic order (i.e., top-down with sorted
+subdirectories), including with "--walk-threads".
+Default is to walk through the directories in the order they are listed.
+
+"""
+
+CHECKSUM_THREADS_HELP = """Number of threads to compute the files checksums, independently of the processes number.
+Checksumming is I/O-bound: many concurrent reads can be run with few processes (e.g., on parallel filesystems).
+Default is "0", i.e., checksums are computed by each process.
+
+"""
+
+UPGRADE_THREADS_HELP = """Number of threads to upgrade the DRS tree concurrently.
+The destination directories are made once, then the files of different directories are migrated concurrently.
+The printed command-lines are unchanged.
+Default is "0", i.e., files are migrated one after the other.
+
+"""
+
 MAPFILE_SUBCOMMANDS = {
     "make": """
 {}
@@ -453,11 +501,38 @@ Default is to build output directory as: "<TABLES_DIR>/<PROJECT>-cmor-table/<GH_
 """
 
 CHECKSUMS_FROM_HELP = """Get the checksums from an submitted file.
-This checksum file must have the same format as the output of the UNIX command-lines "*sum".
+This checksum file must have the same format as the output of the UNIX command-lines "*sum" or "shasum"
+(including binary markers, BSD-style tags and escaped filenames).
 In the case of unfound checksums, it falls back to compute the checksum as normal.
 
 """
 
+CHECKSUM_CACHE_HELP = """Persistent checksum cache.
+Checksums are recorded and reused as long as the file device, inode, size and modification time are unchanged.
+Default cache directory is "$XDG_CACHE_HOME/esgprep" (i.e., "~/.cache/esgprep").
+
+"""
+
+ATTRS_CACHE_HELP = """Persistent cache of the netCDF global attributes.
+Attributes are recorded and reused as long as the file device, inode, size and modification time are unchanged,
+so that unchanged files are not reopened across runs.
+Default cache directory is "$XDG_CACHE_HOME/esgprep" (i.e., "~/.cache/esgprep").
+
+"""
+
+CHECKSUM_XATTRS_HELP = """Read and write checksums in the "user.<CHECKSUM_TYPE>" extended attributes of the files.
+A stored checksum is reused as long as the file size and modification time recorded with it are unchanged.
+Computed checksums are written back if the filesystem allows it.
+
+"""
+
+READ_BLOCK_SIZE_HELP = """Size of the blocks read to compute checksums (e.g., "1M", "8M", "64M").
+Two buffers of this size are allocated per file so that reading and hashing overlap.
+Large blocks are recommended on parallel filesystems.
+Default is 8M.
+
+"""
+
 ALL_VERSIONS_HELP = """Generates mapfile(s) with all versions found in the directory recursively scanned (default is to pick up only the latest one).
 It disables "--no-version".
 
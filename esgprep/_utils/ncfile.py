@@ -9,6 +9,9 @@
 
 """
 
+import os
+from functools import lru_cache
+from pathlib import Path
 from uuid import UUID
 
 from fuzzywuzzy.fuzz import partial_ratio
@@ -17,6 +20,7 @@ from netCDF4 import Dataset
 
 from esgprep._exceptions import NoProjectCodeFound
 from esgprep._exceptions.netcdf import InvalidNetCDFFile, NoNetCDFAttribute
+from esgprep._utils.cache import AttributesCache
 from esgprep.drs.constants import PID_PREFIXES
 
 
@@ -53,19 +57,85 @@ class ncopen(object):
         self.nc.close()
 
 
-def get_ncattrs(path: str) -> dict:
+def wanted_attributes(names, keys=None) -> list:
+    """
+    Returns the attribute names to read among the file attribute names.
+
+    """
+    if keys is None:
+        return list(names)
+    return [name for name in names if name in keys]
+
+
+def to_python(value):
+    """
+    Converts a numpy attribute value into a Python scalar or list, so that attributes
+    read from a file are the same as decoded from the attributes cache.
+
+    """
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if isinstance(value, bytes):
+        return value.decode(errors="replace")
+    return value
+
+
+def get_ncattrs(path: str, keys=None, cache: AttributesCache | None = None) -> dict:
     """
     Loads netCDF global attributes from a pathlib.Path as dictionary.
+    Only reads the wanted keys if submitted, each attribute being read once.
     Ignores attributes with only whitespaces.
 
     """
-    with ncopen(path) as nc:
-        dic = {
-            attr: nc.getncattr(attr)
-            for attr in nc.ncattrs()
-            if (str(nc.getncattr(attr)).split())
-        }
-        return dic
+    # Get attributes from cache.
+    st, names, attrs = None, None, None
+    if cache is not None:
+        st = path.stat() if isinstance(path, Path) else os.stat(path)
+        names, attrs = cache.get(st)
+
+    # Cache hit if all the wanted attributes have already been read.
+    if names is not None and set(wanted_attributes(names, keys)).issubset(attrs):
+        cache.count(hit=True)
+
+    # Read missing attributes from file.
+    else:
+        attrs = attrs or dict()
+        with ncopen(str(path)) as nc:
+            names = nc.ncattrs()
+            for attr in wanted_attributes(names, keys):
+                if attr not in attrs:
+                    attrs[attr] = to_python(nc.getncattr(attr))
+
+        # Record attributes into cache.
+        if cache is not None:
+            cache.count(hit=False)
+            cache.set(st, names, attrs)
+
+    # Ignore attributes with only whitespaces.
+    return {
+        attr: attrs[attr]
+        for attr in wanted_attributes(names, keys)
+        if str(attrs[attr]).split()
+    }
+
+
+@lru_cache(maxsize=1024)
+def resolve_key(key: str, names: frozenset) -> str | None:
+    """
+    Resolves an attribute key among the attribute names of a file.
+    Files from one model share the same attribute names, so that the resolution is
+    memoized. An exact match is returned without fuzzy matching.
+
+    """
+    # Exact match.
+    if key in names:
+        return key
+
+    # Fuzzy match.
+    match = extractOne(key, sorted(names), scorer=partial_ratio)  # type: ignore
+    if match is None or match[1] < 80:
+        return None
+    return match[0]
 
 
 def get_tracking_id(attrs: dict) -> str:
@@ -77,8 +147,8 @@ def get_tracking_id(attrs: dict) -> str:
     project = get_project(attrs)
     assert isinstance(project, str)
     # Set project code from global attributes.
-    key, score = extractOne("tracking_id", attrs.keys(), scorer=partial_ratio)  # type: ignore
-    if score < 80:
+    key = resolve_key("tracking_id", frozenset(attrs))
+    if key is None:
         raise NoNetCDFAttribute("tracking_id", values=attrs.keys())
     identifier = attrs[key].lower()
 
@@ -135,8 +205,8 @@ def get_project(attrs: str | dict) -> str | None:
         attrs = get_ncattrs(attrs)
 
     # Set project code from global attributes.
-    key, score = extractOne("mip_era", attrs.keys(), scorer=partial_ratio)  # type: ignore
-    if score < 80:
+    key = resolve_key("mip_era", frozenset(attrs))
+    if key is None:
         raise NoProjectCodeFound(attrs)
 
     project = attrs[key].lower()
@@ -147,6 +147,36 @@ class DirectoryChecker(argparse.Action):
         return path
 
 
+class DirectoryCreator(argparse.Action):
+    """
+    Action class to normalize a directory that is created if not exists.
+
+    """
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        checked_val = self.directory_creator(values)
+        setattr(namespace, self.dest, checked_val)
+
+    @staticmethod
+    def directory_creator(path):
+        """
+        Verify a directory exists or can be created.
+
+        """
+        # Normalize path.
+        path = os.path.abspath(os.path.normpath(os.path.expanduser(path)))
+
+        # Catch directory creation error.
+        try:
+            os.makedirs(path, exist_ok=True)
+        except OSError as e:
+            msg = f"Unable to create directory: {path} ({e.strerror})"
+            raise argparse.ArgumentTypeError(msg)
+
+        # Return path.
+        return path
+
+
 class ConfigFileLoader(argparse.Action):
     """
     Configuration file action class.
@@ -189,7 +219,7 @@ class ConfigFileLoader(argparse.Action):
 class ChecksumsReader(argparse.Action):
     """
     Action class to read a checksum file similar to any checksum client output.
-    Returns a dictionary where (key: value) pairs respectively are the file path and its checksum.
+    Returns an indexed manifest where (key: value) pairs respectively are the file path and its checksum.
 
     """
 
@@ -203,6 +233,8 @@ class ChecksumsReader(argparse.Action):
         Reads checksum list.
 
         """
+        from esgprep._utils.checksum import load_manifest
+
         # Normalize path.
         path = os.path.abspath(os.path.normpath(path))
 
@@ -211,16 +243,9 @@ class ChecksumsReader(argparse.Action):
             msg = "No such file: {}".format(path)
             raise argparse.ArgumentTypeError(msg)
 
-        # Instantiate checksum dictionary.
-        checksums = dict()
-
-        # Read pre-computed checksums.
-        with open(path) as checksums_file:
-            for checksum, ffp in [
-                entry.split() for entry in checksums_file.read().splitlines()
-            ]:
-                ffp = os.path.abspath(os.path.normpath(ffp))
-                checksums[ffp] = checksum
+        # Read pre-computed checksums once, before child processes are forked.
+        checksums = load_manifest(path)
+        checksums.load()
 
         # Return checksums.
         return checksums
@@ -326,6 +351,103 @@ def regex_validator(string):
         raise argparse.ArgumentTypeError(msg)
 
 
+def checksum_type_validator(string):
+    """
+    Validates a comma-separated list of checksum types.
+
+    """
+    from hashlib import algorithms_available
+
+    from esgprep._utils.checksum import is_multihash_algo
+
+    # Split checksum types.
+    checksum_types = [t.strip() for t in string.split(",") if t.strip()]
+
+    # Catch empty list.
+    if not checksum_types:
+        msg = f"Invalid checksum type: {string}"
+        raise argparse.ArgumentTypeError(msg)
+
+    # Catch unknown checksum types.
+    for checksum_type in checksum_types:
+        if checksum_type not in algorithms_available and not is_multihash_algo(
+            checksum_type
+        ):
+            msg = f"Invalid checksum type: {checksum_type}"
+            raise argparse.ArgumentTypeError(msg)
+
+    # Return checksum types list.
+    return checksum_types
+
+
+def chunksize_validator(value):
+    """
+    Validates the number of sources sent to a child process at once.
+
+    """
+    # Integer conversion.
+    try:
+        cnum = int(value)
+    except ValueError:
+        cnum = 0
+
+    # Catch disallowed chunk sizes.
+    if cnum < 1:
+        msg = "Invalid chunk size. Should be a positive integer."
+        raise argparse.ArgumentTypeError(msg)
+
+    # Return chunk size.
+    return cnum
+
+
+def threads_validator(value):
+    """
+    Validates a number of threads.
+    "0" disables the threads pool.
+
+    """
+    # Integer conversion.
+    try:
+        tnum = int(value)
+    except ValueError:
+        tnum = -1
+
+    # Catch disallowed threads numbers.
+    if tnum < 0:
+        msg = "Invalid threads number. Should be a positive integer or 0."
+        raise argparse.ArgumentTypeError(msg)
+
+    # Return threads number.
+    return tnum
+
+
+def size_validator(value):
+    """
+    Validates a size in bytes with an optional K, M or G binary suffix.
+
+    """
+    # Build pattern.
+    pattern = re.compile(r"^\s*(\d+)\s*([KMG]?)i?B?\s*$", re.IGNORECASE)
+
+    # Catch wrong format error.
+    match = pattern.search(str(value))
+    if not match:
+        msg = f"Invalid size: {value}. Should be an integer with an optional K, M or G suffix."
+        raise argparse.ArgumentTypeError(msg)
+
+    # Convert into bytes.
+    number, unit = match.groups()
+    size = int(number) * 1024 ** " KMG".index(unit.upper() or " ")
+
+    # Catch null size.
+    if size < 1:
+        msg = f"Invalid size: {value}. Should be a positive size."
+        raise argparse.ArgumentTypeError(msg)
+
+    # Return size in bytes.
+    return size
+
+
 def processes_validator(value):
     """
     Validates the maximum number of processes.
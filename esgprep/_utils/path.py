@@ -1,53 +1,180 @@
+import os
 import re
+import stat
+from functools import lru_cache
 from pathlib import Path
 
 import esgvoc.api as ev
 
 from esgprep._utils.print import Print
 
+# DRS generators by project, instantiated once per process.
+_DRS_GENERATORS = dict()
+
+# CV project codes, loaded once per process.
+_PROJECTS = None
+
+# DRS version pattern.
+VERSION_REGEX = re.compile(r"v\d{8}")
+
+# Common CMIP6 DRS attributes in NetCDF files.
+# Note: member_id might be stored as variant_label in some files.
+DRS_ATTRS = (
+    "mip_era",
+    "activity_id",
+    "institution_id",
+    "source_id",
+    "experiment_id",
+    "member_id",
+    "variant_label",
+    "table_id",
+    "variable_id",
+    "grid_label",
+)
+
+
+def get_drs_generator(project: str):
+    """
+    Returns the esgvoc DRS generator of the project, instantiated once per process.
+    """
+    if project not in _DRS_GENERATORS:
+        from esgvoc.apps.drs.generator import DrsGenerator
+
+        _DRS_GENERATORS[project] = DrsGenerator(project)
+    return _DRS_GENERATORS[project]
+
+
+class ScannedPath(type(Path())):
+    """
+    Path carrying the stat result of its directory entry, gathered once by the collector.
+    The stat result is kept through pickling, so that child processes and the main process
+    do not stat the file again. Derived paths (e.g., parent) are stat as usual.
+    """
+
+    _stat = None
+
+    @classmethod
+    def from_entry(cls, entry: os.DirEntry, path: str | None = None) -> "ScannedPath":
+        """
+        Returns the path of a directory entry with its (followed) stat result.
+        """
+        scanned = cls(path or entry.path)
+        scanned._stat = entry.stat()
+        return scanned
+
+    def stat(self, *, follow_symlinks=True):
+        if follow_symlinks and self._stat is not None:
+            return self._stat
+        return super().stat(follow_symlinks=follow_symlinks)
+
+    def is_file(self):
+        if self._stat is not None:
+            return stat.S_ISREG(self._stat.st_mode)
+        return super().is_file()
+
+    def __reduce__(self):
+        return _scanned_path, (str(self), self._stat)
+
+
+def _scanned_path(path: str, st) -> ScannedPath:
+    """
+    Rebuilds an unpickled scanned path.
+    """
+    scanned = ScannedPath(path)
+    scanned._stat = st
+    return scanned
+
 
 def extract_version(path: Path) -> str:
     """
     Extracts the version string (vXXXXXXXX) from the given path.
     Raises a ValueError if no valid version is found.
     """
-    match = re.search(r"v\d{8}", str(path))
+    string = str(path)
+    match = VERSION_REGEX.search(string)
     if match:
         return match.group(0)
-    elif "latest" in str(path):
+    elif "latest" in string:
         return "latest"
-    elif "files" in str(path):
+    elif "files" in string:
         return "files"
     else:
         raise ValueError(f"Invalid version format in path: {path}")
 
 
+class ParsedPath(object):
+    """
+    Path parsed once into its version, the index of the version part and the DRS prefix
+    (i.e., the parts up to the version). Version & index are None if no version is found.
+    """
+
+    __slots__ = ("path", "parts", "version", "version_index", "drs_parts", "error")
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.parts = path.parts
+        self.version = None
+        self.version_index = None
+        self.drs_parts = None
+        self.error = None
+        try:
+            self.version = extract_version(path)
+        except ValueError as e:
+            self.error = str(e)
+            return
+        if self.version in self.parts:
+            self.version_index = self.parts.index(self.version)
+            self.drs_parts = self.parts[: self.version_index]
+        else:
+            self.error = f"No version found in path: {path}"
+
+    def get_version_index(self) -> int:
+        """
+        Returns the index of the version part or raises a ValueError.
+        """
+        if self.version_index is None:
+            raise ValueError(self.error)
+        return self.version_index
+
+    @property
+    def drs(self) -> Path:
+        """
+        Returns the DRS part of the path, or the full path if no version is found.
+        """
+        if self.drs_parts is None:
+            return self.path
+        return Path(*self.drs_parts) if self.drs_parts else Path()
+
+
+@lru_cache(maxsize=4096)
+def parse_path(path: Path) -> ParsedPath:
+    """
+    Returns the parsed path, cached for paths parsed several times (e.g., by successive helpers).
+    """
+    return ParsedPath(path)
+
+
 def get_version_index(path: Path) -> int:
     """
     Returns the index position of the version part (vXXXXXXXX) in the path parts.
     """
-    version = extract_version(path)
-    parts = path.parts
-    for i, part in enumerate(parts):
-        if part == version:
-            return i
-    raise ValueError(f"No version found in path: {path}")
+    return parse_path(path).get_version_index()
 
 
 def get_version_and_subpath(path: Path) -> list[str]:
     """
     Returns a list of path parts from the version part to the end of the path.
     """
-    index = get_version_index(path)
-    return list(path.parts[index:])
+    parsed = parse_path(path)
+    return list(parsed.parts[parsed.get_version_index() :])
 
 
 def get_path_to_version(path: Path) -> list[str]:
     """
     Returns a list of path parts from the start part to the version of the path.
     """
-    index = get_version_index(path)
-    return list(path.parts[:index])
+    parsed = parse_path(path)
+    return list(parsed.parts[: parsed.get_version_index()])
 
 
 def get_ordered_version_paths(base_path: Path) -> list[Path]:
@@ -100,13 +227,8 @@ def get_drs(path: Path) -> Path:
     Returns the DRS (Data Reference Syntax) part of the path.
     This returns the path up to but not including the version.
     """
-    try:
-        # Get the path parts up to the version
-        drs_parts = get_path_to_version(path)
-        return Path(*drs_parts) if drs_parts else Path()
-    except ValueError:
-        # If no version found, return the full path
-        return path
+    # If no version found, return the full path
+    return parse_path(path).drs
 
 
 def is_latest_symlink(path: Path) -> bool:
@@ -130,13 +252,23 @@ def with_latest_target(path: Path) -> Path:
     return path
 
 
+def get_projects() -> frozenset:
+    """
+    Returns the set of CV project codes, loaded once per process.
+    """
+    global _PROJECTS
+    if _PROJECTS is None:
+        _PROJECTS = frozenset(ev.get_all_projects())
+    return _PROJECTS
+
+
 def get_project(path) -> str | None:
     """
     Extract project code from a pathlib.Path object.
 
     """
     # Get all scopes within the loaded authority.
-    scopes = set(ev.get_all_projects())
+    scopes = get_projects()
     # Find intersection between scopes list and path parts.
     project = set(Path(str(path).lower()).parts).intersection(scopes)
 
@@ -145,118 +277,107 @@ def get_project(path) -> str | None:
         return project.pop()
 
     elif len(project) == 0:
-        Print.debug(f"No project code found: {path}")
+        Print.debug("No project code found: {}", path)
         return None
 
     else:
-        Print.debug(f"Unable to match one project code: {path}")
+        Print.debug("Unable to match one project code: {}", path)
         return None
 
 
-def get_terms(path: Path) -> dict:
+def get_terms(path: Path, cache=None) -> dict:
     """
     Extract DRS terms from NetCDF file global attributes.
     Returns a dictionary of DRS terms for the given path.
+    Only the DRS attributes are read, through the attributes cache if any.
     """
-    Print.debug(f"get_terms: Processing path: {path}")
+    Print.debug("get_terms: Processing path: {}", path)
 
     try:
         # Import NetCDF utilities
         from esgprep._utils.ncfile import get_ncattrs
 
         # Get NetCDF global attributes
-        attrs = get_ncattrs(str(path))
-        Print.debug(f"get_terms: NetCDF attributes: {list(attrs.keys())}")
+        attrs = get_ncattrs(path, DRS_ATTRS, cache)
+        Print.debug("get_terms: NetCDF attributes: {}", list(attrs.keys()))
 
         # Return the attributes as terms - they contain the DRS terms
         return attrs
 
     except Exception as e:
-        Print.debug(f"get_terms: Error extracting terms from NetCDF {path}: {e}")
+        Print.debug("get_terms: Error extracting terms from NetCDF {}: {}", path, e)
         return {}
 
 
-def dataset_id(path: Path) -> str | None:
+def dataset_id(path: Path, cache=None) -> str | None:
     """
     Build dataset identifier from NetCDF file using esgvoc DrsGenerator.
     Returns the dataset identifier string for the given path.
     """
-    Print.debug(f"dataset_id: Processing path: {path}")
+    Print.debug("dataset_id: Processing path: {}", path)
 
     # Get project from path
     project = get_project(path)
     if not project:
-        Print.debug(f"dataset_id: No project found for path: {path}")
+        Print.debug("dataset_id: No project found for path: {}", path)
         return None
 
     # Get terms from NetCDF file
-    attrs = get_terms(path)
+    attrs = get_terms(path, cache)
     if not attrs:
-        Print.debug(f"dataset_id: No NetCDF attributes found for path: {path}")
+        Print.debug("dataset_id: No NetCDF attributes found for path: {}", path)
         return None
 
     try:
         # Use esgvoc DrsGenerator to build dataset identifier
-        from esgvoc.apps.drs.generator import DrsGenerator
-
-        generator = DrsGenerator(project)
+        generator = get_drs_generator(project)
 
         # Extract relevant DRS term values from NetCDF attributes
         # For CMIP6, we need specific attributes to build the dataset ID
         drs_terms = []
 
-        # Common CMIP6 DRS attributes in NetCDF files
-        # Note: member_id might be stored as variant_label in some files
-        drs_attrs = [
-            "mip_era",
-            "activity_id",
-            "institution_id",
-            "source_id",
-            "experiment_id",
-            "member_id",
-            "variant_label",
-            "table_id",
-            "variable_id",
-            "grid_label",
-        ]
-
-        for attr in drs_attrs:
+        for attr in DRS_ATTRS:
             if attr in attrs:
                 value = attrs[attr]
                 # Handle space-separated values by taking the first one
                 if isinstance(value, str) and " " in value:
                     value = value.split()[0]
                 drs_terms.append(str(value))
-                Print.debug(f"dataset_id: Found {attr} = {value}")
+                Print.debug("dataset_id: Found {} = {}", attr, value)
 
         if not drs_terms:
             Print.debug("dataset_id: No DRS terms found in NetCDF attributes")
             return None
 
-        Print.debug(f"dataset_id: Using DRS terms: {drs_terms}")
+        Print.debug("dataset_id: Using DRS terms: {}", drs_terms)
 
         # Generate dataset ID from bag of terms
         report = generator.generate_dataset_id_from_bag_of_terms(drs_terms)
 
         Print.debug(
-            f"dataset_id: Report generated_drs_expression: {report.generated_drs_expression}"
+            "dataset_id: Report generated_drs_expression: {}",
+            report.generated_drs_expression,
         )
         Print.debug(
-            f"dataset_id: Report errors: {report.nb_errors}, warnings: {report.nb_warnings}"
+            "dataset_id: Report errors: {}, warnings: {}",
+            report.nb_errors,
+            report.nb_warnings,
         )
 
         if report.nb_errors == 0 and report.generated_drs_expression:
             identifier = report.generated_drs_expression
-            Print.debug(f"dataset_id: Generated identifier: {identifier}")
+            Print.debug("dataset_id: Generated identifier: {}", identifier)
             return identifier
         else:
             Print.debug(
-                f"dataset_id: Generation failed. Errors: {report.nb_errors}, Expression: {report.generated_drs_expression}"
+                "dataset_id: Generation failed. Errors: {}, Expression: {}",
+                report.nb_errors,
+                report.generated_drs_expression,
             )
             if hasattr(report, "errors") and report.errors:
-                Print.debug(f"dataset_id: Error details: {report.errors}")
+                Print.debug("dataset_id: Error details: {}", report.errors)
             return None
 
     except Exception as e:
-        Print.debug(f"dataset_id: Error generating dataset_id for {path}: {e}")
+        Print.debug("dataset_id: Error generating dataset_id for {}: {}", path, e)
         return None
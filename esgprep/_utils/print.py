@@ -9,14 +9,14 @@
 
 """
 
+import json
 import os
-import re
+import queue
 import sys
-from ctypes import c_wchar_p
 from datetime import datetime
-from multiprocessing.sharedctypes import Value
+from multiprocessing.util import Finalize
 
-from esgprep.constants import SHELL_COLORS
+from esgprep.constants import LOG_BUFFER_SIZE, SHELL_COLORS
 
 
 class COLOR:
@@ -185,6 +185,66 @@ class _TAGS:
 TAGS = _TAGS()
 
 
+class LogSink(object):
+    """
+    Long-lived buffered writer of a logfile.
+    Each process buffers its own messages and appends them by whole messages, so
+    that the processes sharing the logfile never interleave partial lines. Child
+    processes write their buffer after each processed source and when terminated.
+
+    """
+
+    def __init__(self, path, size=LOG_BUFFER_SIZE):
+        # Set logfile path & buffer size.
+        self.path = path
+        self.size = size
+
+        # Logfile descriptor & buffer are opened by each process on first write.
+        self.pid = None
+        self.fd = None
+        self.buffer = list()
+        self.length = 0
+
+    def open(self):
+        """
+        Opens the logfile in the current process.
+
+        """
+        # Drop messages buffered by the parent process before forking.
+        self.buffer = list()
+        self.length = 0
+        self.fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self.pid = os.getpid()
+
+        # Flush remaining messages at process exit.
+        Finalize(self, self.flush, exitpriority=100)
+
+    def write(self, msg):
+        """
+        Buffers a message.
+
+        """
+        if self.pid != os.getpid():
+            self.open()
+        self.buffer.append(msg)
+        self.length += len(msg)
+        if self.length >= self.size:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes buffered messages into the logfile.
+
+        """
+        if self.pid != os.getpid() or not self.buffer:
+            return
+        data = "".join(self.buffer).encode()
+        self.buffer = list()
+        self.length = 0
+        while data:
+            data = data[os.write(self.fd, data) :]
+
+
 class Print(object):
     """
     Class to manage and dispatch print statement depending on log and debug mode.
@@ -196,17 +256,21 @@ class Print(object):
     CMD: str | None = None
     LOG_TO_STDOUT: bool = False
     LOGFILE: str | None = None
+    LOG_FORMAT: str = "text"
+    SINK: LogSink | None = None
     CARRIAGE_RETURNED: bool = True
 
-    # Instantiate buffer as a C character data typecode for shared memory.
-    BUFFER = Value(c_wchar_p, "")
+    # Instantiate buffer as a queue of messages drained by the main process.
+    BUFFER = queue.SimpleQueue()
 
     @staticmethod
-    def init(log, debug, cmd):
+    def init(log, debug, cmd, log_format="text"):
         Print.LOG = log
         Print.DEBUG = debug
         Print.CMD = cmd
+        Print.LOG_FORMAT = log_format or "text"
         Print.LOG_TO_STDOUT = log == "-"
+        Print.SINK = None
         if not Print.LOG_TO_STDOUT:
             # Build logfile name.
             logname = f"{Print.CMD}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
@@ -221,10 +285,40 @@ class Print(object):
                 logdir = os.getcwd()
 
             # Built logfile full path.
-            Print.LOGFILE = os.path.join(logdir, logname + ".log")
+            extension = ".jsonl" if Print.LOG_FORMAT == "json" else ".log"
+            Print.LOGFILE = os.path.join(logdir, logname + extension)
+            Print.SINK = LogSink(Print.LOGFILE)
         else:
             Print.LOGFILE = None
 
+    @staticmethod
+    def get_state():
+        """
+        Returns the printing settings to restore in child processes not forked from
+        the main process (i.e., the forkserver mode).
+
+        """
+        return {
+            "LOG": Print.LOG,
+            "DEBUG": Print.DEBUG,
+            "CMD": Print.CMD,
+            "LOG_TO_STDOUT": Print.LOG_TO_STDOUT,
+            "LOGFILE": Print.LOGFILE,
+            "LOG_FORMAT": Print.LOG_FORMAT,
+            "SINK": Print.SINK,
+            "COLORS": COLOR.COLORS,
+        }
+
+    @staticmethod
+    def set_state(state):
+        """
+        Restores the printing settings of the main process.
+
+        """
+        COLOR.COLORS = state.pop("COLORS")
+        for key, value in state.items():
+            setattr(Print, key, value)
+
     @staticmethod
     def check_carriage_return(msg):
         if msg.endswith("\n") or "\r" in msg:
@@ -240,16 +334,67 @@ class Print(object):
             sys.stdout.flush()
 
     @staticmethod
-    def print_to_logfile(msg):
+    def print_to_logfile(msg, level=None):
+        """
+        Writes an uncolored message into the logfile, tagged with its level if any.
+        Colors are only added to the messages printed to the terminal.
+
+        """
+        # Format message as JSON-lines.
+        if Print.LOG_FORMAT == "json":
+            msg = Print.json_record(msg, level=level)
+        elif level:
+            msg = f":: {level.upper():<7} :: {msg}\n"
+
         Print.check_carriage_return(msg)
-        msg = re.sub("\\033\\[([\\d];)?[\\d]*m", "", msg)
         if Print.LOG_TO_STDOUT:
             sys.stdout.write(msg)
             sys.stdout.flush()
         else:
-            assert Print.LOGFILE is not None
-            with open(Print.LOGFILE, "a+") as f:
-                f.write(msg)
+            assert Print.SINK is not None
+            Print.SINK.write(msg)
+
+    @staticmethod
+    def json_record(msg, level=None, **fields):
+        """
+        Returns a message as a JSON line.
+
+        """
+        record = {
+            "time": datetime.now().isoformat(),
+            "pid": os.getpid(),
+        }
+        if level:
+            record["level"] = level.lower()
+        record["msg"] = msg.strip("\n")
+        record.update(fields)
+        return json.dumps(record, default=str) + "\n"
+
+    @staticmethod
+    def timing(source, elapsed, status):
+        """
+        Logs the processing time of a source as a JSON line.
+        Only enabled with JSON-lines logs.
+
+        """
+        if Print.LOG and Print.LOG_FORMAT == "json":
+            msg = Print.json_record(
+                "", source=str(source), elapsed=round(elapsed, 6), status=status
+            )
+            if Print.LOG_TO_STDOUT:
+                sys.stdout.write(msg)
+            else:
+                assert Print.SINK is not None
+                Print.SINK.write(msg)
+
+    @staticmethod
+    def close():
+        """
+        Writes buffered log messages.
+
+        """
+        if Print.SINK:
+            Print.SINK.flush()
 
     @staticmethod
     def progress(msg):
@@ -260,132 +405,158 @@ class Print(object):
         elif not Print.DEBUG:
             Print.print_to_stdout(msg)
 
+    @staticmethod
+    def newline(msg):
+        """
+        Starts a terminal message on a new line if the previous one is not ended.
+
+        """
+        if not Print.CARRIAGE_RETURNED:
+            return "\n" + msg
+        return msg
+
     @staticmethod
     def command(msg=None):
         if not msg:
             msg = " ".join(sys.argv)
-        msg = TAGS.COMMAND + COLOR("magenta")(msg) + "\n"
-        if not Print.CARRIAGE_RETURNED:
-            msg = "\n" + msg
         if Print.LOG:
-            Print.print_to_logfile(msg)
+            Print.print_to_logfile(msg, "COMMAND")
         elif Print.DEBUG:
-            Print.print_to_stdout(msg)
+            msg = TAGS.COMMAND + COLOR("magenta")(msg) + "\n"
+            Print.print_to_stdout(Print.newline(msg))
 
     @staticmethod
     def log(msg=None):
         if not msg:
             msg = Print.LOGFILE
         msg = TAGS.LOG + COLOR("magenta")(msg) + "\n"
-        if not Print.CARRIAGE_RETURNED:
-            msg = "\n" + msg
         if Print.LOG:
-            Print.print_to_stdout(msg)
+            Print.print_to_stdout(Print.newline(msg))
 
     @staticmethod
-    def summary(msg):
-        msg += "\n"
-        if not Print.CARRIAGE_RETURNED:
-            msg = "\n" + msg
+    def summary(msg, color=None):
+        """
+        Prints the final summary, colored with the given preset on the terminal only.
+
+        """
         if Print.LOG:
-            Print.print_to_stdout(msg)
-            Print.print_to_logfile(msg)
-        else:
-            Print.print_to_stdout(msg)
+            Print.print_to_logfile(msg + "\n")
+        if color:
+            msg = color(msg)
+        Print.print_to_stdout(Print.newline(msg + "\n"))
 
     @staticmethod
     def info(msg):
-        msg = TAGS.INFO + COLORS.INFO(msg) + "\n"
-        if not Print.CARRIAGE_RETURNED:
-            msg = "\n" + msg
         if Print.LOG:
-            Print.print_to_logfile(msg)
+            Print.print_to_logfile(msg, "INFO")
         elif Print.DEBUG:
-            Print.print_to_stdout(msg)
+            msg = TAGS.INFO + COLORS.INFO(msg) + "\n"
+            Print.print_to_stdout(Print.newline(msg))
 
     @staticmethod
-    def debug(msg):
-        msg = TAGS.DEBUG + COLORS.DEBUG(msg) + "\n"
-        if not Print.CARRIAGE_RETURNED:
-            msg = "\n" + msg
-        if Print.DEBUG:
-            if Print.LOG:
-                Print.print_to_logfile(msg)
-            else:
-                Print.print_to_stdout(msg)
+    def debug(msg, *args):
+        """
+        Prints a debug message.
+        Positional arguments are formatted into the message with "str.format" only in debug mode,
+        so that messages within loops cost nothing otherwise.
+
+        """
+        if not Print.DEBUG:
+            return
+        if args:
+            msg = msg.format(*args)
+        if Print.LOG:
+            Print.print_to_logfile(msg, "DEBUG")
+        else:
+            msg = TAGS.DEBUG + COLORS.DEBUG(msg) + "\n"
+            Print.print_to_stdout(Print.newline(msg))
 
     @staticmethod
     def warning(msg):
-        msg = TAGS.WARNING + COLOR().bold(msg) + "\n"
-        if not Print.CARRIAGE_RETURNED:
-            msg = "\n" + msg
         if Print.LOG:
-            Print.print_to_logfile(msg)
+            Print.print_to_logfile(msg, "WARNING")
         else:
-            Print.print_to_stdout(msg)
+            msg = TAGS.WARNING + COLOR().bold(msg) + "\n"
+            Print.print_to_stdout(Print.newline(msg))
 
     @staticmethod
     def error(msg, buffer=False):
-        msg = TAGS.ERROR + COLORS.WARNING(msg) + "\n"
-        if not Print.CARRIAGE_RETURNED:
-            msg = "\n" + msg
         if Print.LOG:
-            Print.print_to_logfile(msg)
-        elif buffer:
-            Print.BUFFER.value += msg
-        elif Print.DEBUG:
-            Print.print_to_stdout(msg)
+            Print.print_to_logfile(msg, "ERROR")
+            return
+        msg = Print.newline(TAGS.ERROR + COLORS.WARNING(msg) + "\n")
+        if buffer:
+            Print.BUFFER.put(msg)
         else:
             Print.print_to_stdout(msg)
 
     @staticmethod
     def success(msg, buffer=False):
-        msg = TAGS.SUCCESS + COLORS.SUCCESS(msg) + "\n"
-        if not Print.CARRIAGE_RETURNED:
-            msg = "\n" + msg
         if Print.LOG:
-            Print.print_to_logfile(msg)
-        elif buffer:
-            Print.BUFFER.value += msg
+            Print.print_to_logfile(msg, "SUCCESS")
+            return
+        msg = Print.newline(TAGS.SUCCESS + COLORS.SUCCESS(msg) + "\n")
+        if buffer:
+            Print.BUFFER.put(msg)
         elif Print.DEBUG:
             Print.print_to_stdout(msg)
 
     @staticmethod
     def result(msg, buffer=False):
-        msg = msg + "\n"
-        if not Print.CARRIAGE_RETURNED:
-            msg = "\n" + msg
+        msg = Print.newline(msg + "\n")
         if Print.LOG:
             Print.print_to_logfile(msg)
         elif buffer:
-            Print.BUFFER.value += msg
-        elif Print.DEBUG:
-            Print.print_to_stdout(msg)
+            Print.BUFFER.put(msg)
         else:
             Print.print_to_stdout(msg)
 
+    @staticmethod
+    def skip(source, msg=None, buffer=False):
+        """
+        Prints a skipped source with the reason if any (e.g., an exception traceback).
+
+        """
+        if Print.LOG:
+            text = f"{source}\n{msg}" if msg else str(source)
+            Print.print_to_logfile(text, "SKIPPED")
+            return
+        line = TAGS.SKIP + COLORS.HEADER(str(source)) + "\n"
+        if msg:
+            line += msg + "\n"
+        line = Print.newline(line)
+        if Print.DEBUG or not buffer:
+            Print.print_to_stdout(line)
+        else:
+            Print.BUFFER.put(line)
+
     @staticmethod
     def exception(msg, buffer=False):
-        msg += "\n"
-        if not Print.CARRIAGE_RETURNED:
-            msg = "\n" + msg
+        msg = Print.newline(msg + "\n")
         if Print.LOG:
             Print.print_to_logfile(msg)
-        elif Print.DEBUG:
+        elif Print.DEBUG or not buffer:
             Print.print_to_stdout(msg)
-        elif buffer:
-            Print.BUFFER.value += msg
         else:
-            Print.print_to_stdout(msg)
+            Print.BUFFER.put(msg)
 
     @staticmethod
     def flush():
-        if Print.BUFFER.value:
+        """
+        Drains the buffered messages.
+
+        """
+        msgs = list()
+        while True:
+            try:
+                msgs.append(Print.BUFFER.get_nowait())
+            except queue.Empty:
+                break
+        if msgs:
             if Print.LOG:
-                Print.print_to_logfile(Print.BUFFER.value)
+                Print.print_to_logfile("".join(msgs))
             else:
-                Print.print_to_stdout(Print.BUFFER.value)
-            Print.BUFFER.value = ""
+                Print.print_to_stdout("".join(msgs))
 
     @staticmethod
     def enable_colors():
@@ -9,6 +9,7 @@
 
 """
 
+import os
 from datetime import datetime
 
 # Program version
@@ -38,6 +39,46 @@ VERSION_PATTERN = r"(v\d{8})|(latest)"
 # Spinner frames
 FRAMES = ["[-----<]", "[----<-]", "[---<--]", "[--<---]", "[-<----]", "[<-----]"]
 
+# Minimum time between two progress spinner redraws (in seconds)
+PROGRESS_REFRESH_INTERVAL = 0.1
+
+# Size of the logfile buffer of each process (in bytes)
+LOG_BUFFER_SIZE = 64 * 1024
+
+# Logfile formats
+LOG_FORMATS = ["text", "json"]
+
 # Final spinner frame
 FINAL_FRAME = "[<<<<<<]"
 FINAL_STATUS = "Completed"
+
+# Modules preloaded by the forkserver before starting child processes
+FORKSERVER_PRELOAD = [
+    "esgvoc.api",
+    "esgvoc.apps.drs.generator",
+    "netCDF4",
+    "esgprep._utils.checksum",
+    "esgprep._utils.ncfile",
+    "esgprep._utils.path",
+]
+
+# Maximum number of chunks of sources dispatched per child process and not yet processed
+IN_FLIGHT_CHUNKS = 4
+
+# Checksum cache default directory
+CHECKSUM_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+    "esgprep",
+)
+
+# Checksum cache database filename
+CHECKSUM_CACHE_FILE = "checksums.sqlite"
+
+# netCDF global attributes cache database filename
+ATTRS_CACHE_FILE = "ncattrs.sqlite"
+
+# Checksum extended attributes namespace (i.e., "user.<checksum_type>")
+CHECKSUM_XATTR_PREFIX = "user."
+
+# Checksum read block size (in bytes)
+READ_BLOCK_SIZE = 8 * 1024 * 1024
@@ -11,9 +11,11 @@
 
 import os
 import sys
+from functools import partial
 
 from esgprep import _STDOUT
 from esgprep._contexts.multiprocessing import Runner
+from esgprep._handlers.drs_tree import DRSPlan
 from esgprep._utils import load, store
 from esgprep._utils.print import COLORS, Print
 from esgprep.constants import FINAL_FRAME, FINAL_STATUS
@@ -58,6 +60,18 @@ def do_scanning(ctx):
         return True
 
 
+def merge(tree, result):
+    """
+    Merges a DRS plan returned by a child process into the DRS tree.
+    Returns True instead of the plan, any other result as is.
+
+    """
+    if isinstance(result, DRSPlan):
+        tree.merge(result)
+        return True
+    return result
+
+
 def run(args):
     """
     Main process.
@@ -72,10 +86,18 @@ def run(args):
         # Disable file scan if a previous DRS tree have generated using same context and no "list" action.
         if do_scanning(ctx):
             # Instantiate the runner.
-            r = Runner(ctx.processes)
+            r = Runner(
+                ctx.processes,
+                ctx.checksum_threads,
+                ctx.project,
+                ctx.forkserver,
+                ctx.chunksize,
+            )
 
             # Get runner results.
-            results = r.run(ctx.sources, ctx)
+            results = r.run(
+                ctx.sources, ctx, ordered=True, consume=partial(merge, ctx.tree)
+            )
 
             # Final print.
             msg = f"\r{' ' * ctx.msg_length.value}"
@@ -95,8 +117,16 @@ def run(args):
             # Force rescan by setting ctx.rescan = True
             ctx.rescan = True
             # Perform fresh scan using the same logic as the main scan
-            r = Runner(ctx.processes)
-            results = r.run(ctx.sources, ctx)
+            r = Runner(
+                ctx.processes,
+                ctx.checksum_threads,
+                ctx.project,
+                ctx.forkserver,
+                ctx.chunksize,
+            )
+            results = r.run(
+                ctx.sources, ctx, ordered=True, consume=partial(merge, ctx.tree)
+            )
             msg = f"\r{' ' * ctx.msg_length.value}"
             Print.progress(msg)
             msg = f"\r{COLORS.OKBLUE(SPINNER_DESC)} {FINAL_FRAME} {FINAL_STATUS}\n"
@@ -131,7 +161,13 @@ def run(args):
             ctx.tree.check_uniqueness()
             # Apply tree action
             ctx.tree.get_display_lengths()
-            getattr(ctx.tree, ctx.action)(quiet=quiet)
+            errors = getattr(ctx.tree, ctx.action)(
+                quiet=quiet, threads=ctx.upgrade_threads
+            )
+
+            # Count files that failed to upgrade.
+            if errors:
+                ctx.errors.value += errors
 
             # Remove empty folder # seems to work
             # Skip rmdir for read-only operations to preserve directories
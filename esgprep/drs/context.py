@@ -11,7 +11,7 @@ from esgprep._collectors.dataset_id import DatasetCollector
 from esgprep._collectors.drs_path import DRSPathCollector
 from esgprep._contexts.multiprocessing import MultiprocessingContext
 from esgprep._handlers.drs_tree import DRSTree
-from esgprep._utils.print import COLORS, Print
+from esgprep._utils.print import Print
 import os
 import sys
 
@@ -75,6 +75,9 @@ class ProcessingContext(MultiprocessingContext):
         if self.cmd != "make":
             self.mode = self.cmd
 
+        # Set DRS upgrade threads number.
+        self.upgrade_threads = self.set("upgrade_threads") or 0
+
         # Set output commands file.
         self.commands_file = self.set("commands_file", None)
         self.overwrite_commands_file = self.set("overwrite_commands_file", None)
@@ -87,10 +90,8 @@ class ProcessingContext(MultiprocessingContext):
             Print.warning(msg)
 
         # Instantiate DRS tree.
-        if self.use_pool:
-            self.tree = self.manager.DRSTree(self.root, self.mode, self.commands_file)
-        else:
-            self.tree = DRSTree(self.root, self.mode, self.commands_file)
+        # Child processes return DRS plans merged into the tree by the main process.
+        self.tree = DRSTree(self.root, self.mode, self.commands_file)
 
     def __enter__(self):
         super(ProcessingContext, self).__enter__()
@@ -101,13 +102,21 @@ class ProcessingContext(MultiprocessingContext):
         # Instantiate data collector.
         if self.cmd not in ["remove", "latest"]:
             # The input source is a list directories.
-            self.sources = Collector(sources=self.directory)
+            self.sources = Collector(
+                sources=self.directory,
+                walk_threads=self.walk_threads,
+                sorted_walk=self.sorted_walk,
+            )
 
         else:
             # The input source is a list directories.
             if self.directory:
                 # Instantiate file collector to walk through the tree.
-                self.sources = DRSPathCollector(sources=self.directory)
+                self.sources = DRSPathCollector(
+                    sources=self.directory,
+                    walk_threads=self.walk_threads,
+                    sorted_walk=self.sorted_walk,
+                )
 
                 # Initialize file filters.
                 for regex, inclusive in self.file_filter:
@@ -168,5 +177,5 @@ class ProcessingContext(MultiprocessingContext):
             else:
                 msg = f'Command file "{self.commands_file}" already exists --'
                 msg += ' Please use "--overwrite-commands-file" option.'
-                Print.error(COLORS.FAIL(msg))
+                Print.error(msg)
                 sys.exit(1)
@@ -7,15 +7,14 @@
 """
 
 import re
-import traceback
 from pathlib import Path
 
+from esgprep._contexts.multiprocessing import Failure
 from esgprep._utils.path import extract_version, get_ordered_version_paths
-from esgprep._utils.print import COLORS, TAGS, Print
-from esgprep.constants import FRAMES
+from esgprep._utils.print import Print
 from esgprep._handlers.constants import LINK_SEPARATOR
+from esgprep._handlers.drs_tree import DRSPlan
 from esgprep._handlers.dataset_id import Dataset
-from esgprep.drs.constants import SPINNER_DESC
 
 
 class Process(object):
@@ -29,14 +28,9 @@ class Process(object):
         Shared processing context between child processes.
 
         """
-        self.tree = ctx.tree
         self.root = ctx.root
         self.set_values = ctx.set_values
         self.set_keys = ctx.set_keys
-        self.lock = ctx.lock
-        self.errors = ctx.errors
-        self.msg_length = ctx.msg_length
-        self.progress = ctx.progress
         self.no_checksum = ctx.no_checksum
         self.checksums_from = ctx.checksums_from
         self.checksum_type = ctx.checksum_type
@@ -56,7 +50,8 @@ class Process(object):
             # For dataset objects, skip processing as we can't convert them without pyessv
             if isinstance(source, Dataset):
                 Print.debug(
-                    f"Skipping dataset object {source} - dataset conversion not supported without pyessv"
+                    "Skipping dataset object {} - dataset conversion not supported without pyessv",
+                    source,
                 )
                 return None
 
@@ -65,7 +60,7 @@ class Process(object):
 
             # Basic validation - check if path looks like a DRS structure
             if not current_path.exists():
-                Print.debug(f"Path does not exist: {current_path}")
+                Print.debug("Path does not exist: {}", current_path)
                 return None
 
             # If source is a file, we need to find the dataset directory (parent of version directory)
@@ -90,18 +85,18 @@ class Process(object):
 
                 if not dataset_path:
                     Print.debug(
-                        f"Could not find dataset directory for file: {current_path}"
+                        "Could not find dataset directory for file: {}", current_path
                     )
                     return None
 
                 current_path = dataset_path
-                Print.debug(f"Found dataset directory: {current_path}")
+                Print.debug("Found dataset directory: {}", current_path)
 
             # For latest symlink creation, we need to work at the dataset level
             # Find version directories in the current path
             versions = get_ordered_version_paths(current_path)
             if not versions:
-                Print.debug(f"No version directories found in {current_path}")
+                Print.debug("No version directories found in {}", current_path)
                 return None
 
             # Get latest version directory name
@@ -118,18 +113,22 @@ class Process(object):
                     current_target = latest_symlink_path.readlink()
                     if current_target == Path(latest_version):
                         Print.debug(
-                            f"Latest symlink already correct: {latest_symlink_path} -> {latest_version}"
+                            "Latest symlink already correct: {} -> {}",
+                            latest_symlink_path,
+                            latest_version,
                         )
                         return True
                 else:
                     Print.debug(
-                        f"Latest path exists but is not a symlink: {latest_symlink_path}"
+                        "Latest path exists but is not a symlink: {}",
+                        latest_symlink_path,
                     )
                     return None
 
             # Add the "latest" symlink node to the tree
+            plan = DRSPlan()
             nodes = list(latest_symlink_path.parts)
-            self.tree.create_leaf(
+            plan.create_leaf(
                 nodes=nodes,
                 label=f"latest{LINK_SEPARATOR}{latest_version}",
                 src=latest_version,
@@ -140,44 +139,9 @@ class Process(object):
             msg = f"Latest symlink = {latest_symlink_path} -> {latest_version}"
             Print.success(msg)
 
-            # Return True if success.
-            return True
-
-        except KeyboardInterrupt:
-            # Lock error number.
-            with self.lock:
-                # Increase error counter.
-                self.errors.value += 1
-            raise
+            # Return DRS plan if success.
+            return plan
 
         # Catch known exception with its traceback.
         except Exception:
-            # Lock error number.
-            with self.lock:
-                # Increase error counter.
-                self.errors.value += 1
-
-                # Format & print exception traceback.
-                exc = traceback.format_exc().splitlines()
-                msg = TAGS.SKIP + COLORS.HEADER(str(source)) + "\n"
-                msg += "\n".join(exc)
-                Print.exception(msg, buffer=True)
-
-            return None
-
-        finally:
-            # Lock progress value.
-            with self.lock:
-                # Increase progress counter.
-                self.progress.value += 1
-
-                # Clear previous print.
-                msg = f"\r{' ' * self.msg_length.value}"
-                Print.progress(msg)
-
-                # Print progress bar.
-                msg = f"\r{COLORS.OKBLUE(SPINNER_DESC)} {FRAMES[self.progress.value % len(FRAMES)]} {source}"
-                Print.progress(msg)
-
-                # Set new message length.
-                self.msg_length.value = len(msg)
+            return Failure(source)
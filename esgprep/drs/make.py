@@ -7,24 +7,166 @@
 """
 
 import os
-import traceback
+from functools import lru_cache
 from pathlib import Path
 
-from esgvoc.apps.drs.generator import DrsGenerator
-
+from esgprep._contexts.multiprocessing import Failure, Skipped
 from esgprep._exceptions import DuplicatedFile, OlderUpgrade, UnchangedTrackingID
 from esgprep._handlers.constants import LINK_SEPARATOR
-from esgprep._utils.checksum import get_checksum
-from esgprep._utils.ncfile import get_ncattrs, get_tracking_id
+from esgprep._handlers.drs_tree import DRSPlan
+from esgprep._utils.checksum import ChecksumJob, get_checksum
+from esgprep._utils.ncfile import get_ncattrs, get_project, get_tracking_id
 from esgprep._utils.path import (
+    ScannedPath,
     extract_version,
+    get_drs_generator,
     get_ordered_version_paths,
     get_path_to_version,
     get_version_and_subpath,
 )
-from esgprep._utils.print import COLORS, TAGS, Print
-from esgprep.constants import FRAMES
-from esgprep.drs.constants import SPINNER_DESC
+from esgprep._utils.print import Print
+
+# Generated DRS directories by project and DRS facet values, memoized per process.
+_DRS_DIRECTORIES = dict()
+
+# Global attributes read to identify a file, in addition to the DRS facets.
+FILE_ATTRS = ("mip_era", "variant_label", "tracking_id")
+
+# Global attributes read to identify a "latest" version file.
+LATEST_FILE_ATTRS = ("mip_era", "tracking_id")
+
+
+@lru_cache
+def get_wanted_attributes(project):
+    """
+    Returns the netCDF global attributes to read from the incoming files of a project.
+
+    """
+    generator = get_drs_generator(project)
+    return frozenset(
+        part.source_collection for part in generator.directory_specs.parts
+    ).union(FILE_ATTRS)
+
+
+def generate_directory(project, mapping):
+    """
+    Returns the DRS directory generation report of the facets mapping.
+    All the files of a dataset share the same DRS facet values, so that the terms
+    validation against the CV only runs once per dataset.
+
+    """
+    generator = get_drs_generator(project)
+    key = (project,) + tuple(
+        mapping.get(part.source_collection) for part in generator.directory_specs.parts
+    )
+    if key not in _DRS_DIRECTORIES:
+        _DRS_DIRECTORIES[key] = generator.generate_directory_from_mapping(mapping)
+    return _DRS_DIRECTORIES[key]
+
+
+class LatestFile(object):
+    """
+    Index entry of a "latest" version file: its path, size, tracking ID and checksum.
+    The tracking ID and the checksum are read on first use, then shared by all the
+    incoming files of the dataset.
+
+    """
+
+    __slots__ = ("path", "size", "_tracking_id", "_checksum")
+
+    def __init__(self, path):
+        self.path = path
+        self.size = path.stat().st_size
+        self._tracking_id = None
+        self._checksum = None
+
+    def tracking_id(self, cache=None):
+        """
+        Returns the file tracking ID, read once through the given attributes cache.
+
+        """
+        if self._tracking_id is None:
+            attrs = get_ncattrs(self.path, LATEST_FILE_ATTRS, cache)
+            self._tracking_id = get_tracking_id(attrs)
+        return self._tracking_id
+
+    def checksum(self, compute):
+        """
+        Returns the file checksum, computed once with the given function.
+
+        """
+        if self._checksum is None:
+            self._checksum = compute(self.path)
+        return self._checksum
+
+
+class DatasetSnapshot(object):
+    """
+    Snapshot of an existing dataset directory shared by all its incoming files:
+    the ordered version directories, the index of the "latest" version files and, on
+    demand, the files of the latest version directory to upgrade from.
+    The DRS tree is only changed after processing, so that the snapshot stays valid
+    during the run.
+
+    """
+
+    def __init__(self, dataset_dir):
+        # Get existing versions.
+        self.versions = get_ordered_version_paths(dataset_dir)
+        self.latest_version = "Initial"
+        if self.versions:
+            self.latest_version = extract_version(self.versions[-1])
+
+        # Index the "latest" version files by filename.
+        # Broken symlinks are considered as missing.
+        self.latest_files = dict()
+        try:
+            with os.scandir(dataset_dir / "latest") as entries:
+                for entry in entries:
+                    try:
+                        path = ScannedPath.from_entry(entry)
+                    except OSError:
+                        continue
+                    self.latest_files[entry.name] = LatestFile(path)
+        except OSError:
+            pass
+
+        # Latest version files to upgrade from, listed on demand.
+        self._upgrade_files = None
+        self._links = dict()
+
+    def upgrade_files(self):
+        """
+        Returns the (root, filename) of the latest version directory files.
+
+        """
+        if self._upgrade_files is None:
+            files = list()
+            if self.versions and self.versions[-1].exists():
+                for root, _, filenames in os.walk(self.versions[-1]):
+                    files.extend((root, filename) for filename in filenames)
+            self._upgrade_files = files
+        return self._upgrade_files
+
+    def readlink(self, path):
+        """
+        Returns the target of a latest version file symlink.
+
+        """
+        if path not in self._links:
+            self._links[path] = os.readlink(path)
+        return self._links[path]
+
+
+@lru_cache(maxsize=1024)
+def get_dataset_snapshot(dataset_dir):
+    """
+    Returns the snapshot of a dataset directory, taken once per process.
+    The incoming files of a dataset are walked through together, so that a bounded
+    cache is enough.
+
+    """
+    return DatasetSnapshot(dataset_dir)
 
 
 class Process(object):
@@ -38,24 +180,239 @@ class Process(object):
         Shared processing context between child processes.
 
         """
-        self.tree = ctx.tree
         self.root = ctx.root
         self.set_values = ctx.set_values
         self.set_keys = ctx.set_keys
-        self.lock = ctx.lock
-        self.errors = ctx.errors
         self.version = ctx.version
-        self.msg_length = ctx.msg_length
-        self.progress = ctx.progress
         self.no_checksum = ctx.no_checksum
         self.checksums_from = ctx.checksums_from
         self.checksum_type = ctx.checksum_type
+        self.checksum_cache = ctx.checksum_cache
+        self.attrs_cache = ctx.attrs_cache
+        self.checksum_xattrs = ctx.checksum_xattrs
+        self.read_block_size = ctx.read_block_size
+        self.checksum_threads = ctx.checksum_threads
         self.mode = ctx.mode
         self.upgrade_from_latest = ctx.upgrade_from_latest
         self.ignore_from_latest = ctx.ignore_from_latest
         self.ignore_from_incoming = ctx.ignore_from_incoming
         self.project = ctx.project
 
+        # Dataset snapshots are only valid during a run.
+        get_dataset_snapshot.cache_clear()
+
+    def checksum(self, ffp):
+        """
+        Returns the file checksum.
+
+        """
+        return get_checksum(
+            ffp,
+            self.checksum_type,
+            self.checksums_from,
+            self.checksum_cache,
+            self.read_block_size,
+            self.checksum_xattrs,
+        )
+
+    def is_duplicate(
+        self,
+        current_checksum,
+        latest_checksum,
+        current_path,
+        latest_path,
+        current_tracking_id,
+        latest_tracking_id,
+    ):
+        """
+        Returns True if the incoming file checksum is the same as the latest file version.
+        Different checksums require different tracking IDs if exist.
+
+        """
+        if current_checksum == latest_checksum:
+            # Flags file to duplicate.
+            return True
+
+        # If different checksums, tracking IDs must be different too if exist.
+        elif current_tracking_id and latest_tracking_id:
+            raise UnchangedTrackingID(
+                latest_path,
+                latest_tracking_id,
+                current_path,
+                current_tracking_id,
+            )
+
+        return False
+
+    def build(
+        self,
+        source,
+        current_path,
+        latest_path,
+        all_versions,
+        latest_version,
+        version_for_drs,
+        drs_key,
+        is_duplicate=False,
+    ):
+        """
+        Plans the incoming file leaves and records of the DRS tree.
+        Returns the DRS plan to merge into the DRS tree by the main process.
+
+        """
+        # Print info.
+        Print.debug("Processing {}", source)
+
+        # Instantiate DRS plan.
+        plan = DRSPlan()
+
+        # Start DRS tree generation.
+        if not is_duplicate:
+            # Add the current file to the "vYYYYMMDD" folder.
+            parts_from_version = get_version_and_subpath(current_path)
+            src = [".."] * (len(parts_from_version) - 1)
+            src.append("files")
+            version_nb = parts_from_version[0][1:]
+            src.append("d" + version_nb)
+
+            # src += parts_from_version
+            src.append(
+                current_path.name
+            )  # Lolo Test to add filename at the end of the relative path reconstructed
+            plan.create_leaf(
+                nodes=current_path.parts,
+                label=f"{current_path.name}{LINK_SEPARATOR}{os.path.join(*src)}",
+                src=os.path.join(*src),
+                mode="symlink",
+                force=True,
+            )
+
+            # Add the "latest" symlink node.
+            # nodes = list(dataset_path(current_path).parent.parts)
+            nodes = list(current_path.parts)[
+                : -len(get_version_and_subpath(current_path))
+            ]
+            nodes.append("latest")
+            plan.create_leaf(
+                nodes=nodes,
+                label=f"{'latest'}{LINK_SEPARATOR}{version_for_drs}",
+                src=version_for_drs,
+                mode="symlink",
+            )
+            nodes = list(current_path.parts)[
+                0 : -len(get_version_and_subpath(current_path))
+            ]
+
+            nodes.append("files")
+            version_nb = parts_from_version[0][1:]
+            nodes.append("d" + version_nb)
+            nodes.append(current_path.name)
+            # Add the current file to the "files" folder.
+            plan.create_leaf(
+                nodes=nodes,
+                label=current_path.name,
+                src=source,  # Lolo Change current_path to source
+                mode=self.mode,
+            )
+            # If latest file version exist and --upgrade-from-latest submitted.
+            if all_versions and self.upgrade_from_latest:
+                # Walk through the latest dataset version once per dataset.
+                # Create a symlink for each file with a different filename than the current one
+                snapshot = get_dataset_snapshot(current_path.parent.parent)
+                for root, latest_name in snapshot.upgrade_files():
+                    # Add latest files as tree leaves with version to upgrade instead of latest version
+                    # i.e., copy latest dataset leaves to the current tree.
+                    # Except if file has be ignored from latest version (i.e., with known issue)
+                    # Except if file leaf has already been created to avoid overwriting new version
+                    # Leaf is not created if already exists (i.e., force = False).
+                    if (
+                        latest_name != current_path.name
+                        and latest_name not in self.ignore_from_latest
+                    ):
+                        link = snapshot.readlink(os.path.join(root, latest_name))
+                        node_list = list(current_path.parent.parts)
+                        node_list.append(latest_name)
+                        plan.create_leaf(
+                            nodes=node_list,
+                            label=f"{latest_name}{LINK_SEPARATOR}{link}",
+                            src=link,
+                            mode="symlink",
+                        )
+
+        # In the case of the file is duplicated.
+        # i.e., incoming file already exists in the latest version folder.
+        else:
+            # If upgrade from latest is activated, raise the error, no duplicated files allowed.
+            # Incoming must only contain modifed/corrected files.
+            if self.upgrade_from_latest:
+                raise DuplicatedFile(latest_path, source)
+
+            # If default behavior, the incoming contains all data for a new version
+            # In the case of a duplicated file, just pass to the expected symlink creation
+            # and records duplicated file for further removal only if migration mode is the
+            # default (i.e., moving files). In the case of --copy or --link, keep duplicates
+            # in place into the incoming directory.
+            else:
+                assert latest_path is not None
+                src = os.readlink(latest_path)
+                plan.create_leaf(
+                    nodes=current_path.parts,
+                    label=f"{current_path.name}{LINK_SEPARATOR}{src}",
+                    src=src,
+                    mode="symlink",
+                )
+                if self.mode == "move":
+                    plan.duplicates.append(source)
+
+        # Record entry for list() and uniqueness checkup.
+        record = {"src": source, "dst": current_path, "is_duplicate": is_duplicate}
+        # key = str(get_path_to_version(current_path.parent))
+        plan.add_record(
+            drs_key, record, {"latest": latest_version, "upgrade": self.version}
+        )
+
+        # Print info.
+        msg = f"DRS Path = {get_path_to_version(current_path)}"
+        msg += " <-- " + current_path.name
+        Print.success(msg)
+
+        # Return DRS plan if success.
+        return plan
+
+    def resolve(self, job):
+        """
+        Computes deferred checksums to detect duplicated files and plans the DRS tree.
+        Runs in a checksum thread of the main process.
+
+        """
+        try:
+            state = dict(job.state)
+            current_tracking_id, latest_tracking_id = state.pop("tracking_ids")
+            incoming_path, latest_path = job.files
+            current_checksum = self.checksum(incoming_path)
+
+            # Latest file checksum is computed once per dataset snapshot.
+            snapshot = get_dataset_snapshot(state["current_path"].parent.parent)
+            latest = snapshot.latest_files.get(latest_path.name)
+            if latest:
+                latest_checksum = latest.checksum(self.checksum)
+            else:
+                latest_checksum = self.checksum(latest_path)
+
+            is_duplicate = self.is_duplicate(
+                current_checksum,
+                latest_checksum,
+                state["current_path"],
+                latest_path,
+                current_tracking_id,
+                latest_tracking_id,
+            )
+            return self.build(job.source, is_duplicate=is_duplicate, **state)
+
+        # Catch known exception with its traceback.
+        except Exception:
+            return Failure(job.source)
+
     def __call__(self, source):
         """
         Any error switches to the next child process.
@@ -66,17 +423,15 @@ class Process(object):
         try:
             # Ignore files from incoming
             if source.name in self.ignore_from_incoming:
-                msg = TAGS.SKIP + COLORS.HEADER(str(source))
-                with self.lock:
-                    Print.exception(msg, buffer=True)
-                return None
+                return Skipped(source)
 
             # Print info.
-            msg = f"Scanning {source}"
-            Print.debug(msg)
+            Print.debug("Scanning {}", source)
 
             # Get current netcdf file attributes.
-            current_attrs = get_ncattrs(source)
+            current_attrs = get_ncattrs(
+                source, get_wanted_attributes(self.project), self.attrs_cache
+            )
             # # If attribute value is a separated list, pick up the first item as facet value
             for k, v in current_attrs.items():
                 current_attrs[k] = str(v).split()[0]  # mainly for activity_id
@@ -92,8 +447,6 @@ class Process(object):
 
             # Validate project compatibility before DRS generation
             try:
-                from esgprep._utils.ncfile import get_project
-
                 file_project = get_project(current_attrs)
                 if file_project and file_project.lower() != self.project.lower():
                     raise Exception(
@@ -106,7 +459,7 @@ class Process(object):
                     raise e
                 # If project detection fails for other reasons, continue with DRS generation
                 # to get the original error messages
-                Print.debug(f"Project detection failed: {e}")
+                Print.debug("Project detection failed: {}", e)
 
             # Instantiate file as no duplicate.
             is_duplicate = False
@@ -114,13 +467,13 @@ class Process(object):
             # Build directory structure.
             # DRS terms are validated during this step.
             try:
-                dg = DrsGenerator(self.project)
                 if self.project == "cmip6":
-                    drs_path = dg.generate_directory_from_mapping(
+                    drs_path = generate_directory(
+                        self.project,
                         {
                             **current_attrs,
                             **{"member_id": current_attrs["variant_label"]},
-                        }
+                        },
                     )
 
                 if len(drs_path.errors) != 0:
@@ -137,24 +490,28 @@ class Process(object):
                     / source.name
                 )
                 # example : CMIP6/CMIP/CCCma/CanESM5/historical/r1i1p2f1/Amon/tas/gn/v20190429/cmip6_IPSL-CM6A-LR_tas_50-60.nc
+
+                # Dataset key for list() and uniqueness checkup.
+                drs_key = str(Path(drs_path.generated_drs_expression).parent)
             except TypeError:
                 Print.debug("Directory structure is None")
                 return False
 
-            # Instantiate latest version to "Initial"
-            latest_version = "Initial"
-            # Get latest existing version of the file.
-            all_versions = get_ordered_version_paths(current_path.parent.parent)
-            if len(all_versions) > 0:
-                latest_version = extract_version(all_versions[-1])
+            # Get latest existing version of the file from the dataset snapshot.
+            # Latest version is "Initial" if none.
             dataset_dir = current_path.parent.parent
-            latest_dir = dataset_dir / "latest"
-            latest_path = latest_dir / source.name
+            snapshot = get_dataset_snapshot(dataset_dir)
+            all_versions = snapshot.versions
+            latest_version = snapshot.latest_version
+            latest = snapshot.latest_files.get(source.name)
+            latest_path = (
+                latest.path if latest else dataset_dir / "latest" / source.name
+            )
             # latest_path = with_latest_version(current_path)
             # latest_path = all_versions[-1] if len(all_versions) >= 1 else None
 
             # 1. Check if a latest file version exists (i.e. with the same filename).
-            if latest_path and (latest_path.exists()):
+            if latest:
                 # 2. Check latest version is older than current version.
                 current_version = extract_version(current_path)
                 latest_version = extract_version(latest_path)
@@ -162,38 +519,41 @@ class Process(object):
                 if latest_version > current_version:
                     raise OlderUpgrade(current_version, latest_version)
 
-                # Get latest file version attributes.
-                latest_attrs = get_ncattrs(str(latest_path))
-
                 # 3. Check tracking IDs are different.
+                # Latest file tracking ID is read once per dataset snapshot.
                 current_tracking_id = get_tracking_id(current_attrs)
-                latest_tracking_id = get_tracking_id(latest_attrs)
+                latest_tracking_id = latest.tracking_id(self.attrs_cache)
                 if current_tracking_id == latest_tracking_id:
                     # 4. Check if file sizes are different.
-                    if (
-                        source.stat().st_size == latest_path.stat().st_size
-                        and not self.no_checksum
-                    ):
+                    if source.stat().st_size == latest.size and not self.no_checksum:
                         # 5. Check if file checksums are different.
-                        current_checksum = get_checksum(
-                            source, self.checksum_type, self.checksums_from
-                        )
-                        latest_checksum = get_checksum(
-                            latest_path, self.checksum_type, self.checksums_from
+                        # Defer checksumming to the checksum threads.
+                        if self.checksum_threads:
+                            state = {
+                                "current_path": current_path,
+                                "latest_path": latest_path,
+                                "all_versions": all_versions,
+                                "latest_version": latest_version,
+                                "version_for_drs": version_for_drs,
+                                "drs_key": drs_key,
+                                "tracking_ids": (
+                                    current_tracking_id,
+                                    latest_tracking_id,
+                                ),
+                            }
+                            return ChecksumJob(source, [source, latest_path], state)
+
+                        current_checksum = self.checksum(source)
+                        latest_checksum = latest.checksum(self.checksum)
+                        is_duplicate = self.is_duplicate(
+                            current_checksum,
+                            latest_checksum,
+                            current_path,
+                            latest_path,
+                            current_tracking_id,
+                            latest_tracking_id,
                         )
 
-                        if current_checksum == latest_checksum:
-                            # Flags file to duplicate.
-                            is_duplicate = True
-                        # If different checksums, tracking IDs must be different too if exist.
-                        elif current_tracking_id and latest_tracking_id:
-                            raise UnchangedTrackingID(
-                                latest_path,
-                                latest_tracking_id,
-                                current_path,
-                                current_tracking_id,
-                            )
-
                     # If different sizes, tracking IDs must be different too if exist.
                     elif current_tracking_id and latest_tracking_id:
                         raise UnchangedTrackingID(
@@ -203,169 +563,19 @@ class Process(object):
                             current_tracking_id,
                         )
 
-            # Print info.
-            Print.debug("Processing {source}")
-
-            # Start DRS tree generation.
-            if not is_duplicate:
-                # Add the current file to the "vYYYYMMDD" folder.
-                parts_from_version = get_version_and_subpath(current_path)
-                src = [".."] * (len(parts_from_version) - 1)
-                src.append("files")
-                version_nb = parts_from_version[0][1:]
-                src.append("d" + version_nb)
-
-                # src += parts_from_version
-                src.append(
-                    current_path.name
-                )  # Lolo Test to add filename at the end of the relative path reconstructed
-                self.tree.create_leaf(
-                    nodes=current_path.parts,
-                    label=f"{current_path.name}{LINK_SEPARATOR}{os.path.join(*src)}",
-                    src=os.path.join(*src),
-                    mode="symlink",
-                    force=True,
-                )
-
-                # Add the "latest" symlink node.
-                # nodes = list(dataset_path(current_path).parent.parts)
-                nodes = list(current_path.parts)[
-                    : -len(get_version_and_subpath(current_path))
-                ]
-                nodes.append("latest")
-                self.tree.create_leaf(
-                    nodes=nodes,
-                    label=f"{'latest'}{LINK_SEPARATOR}{version_for_drs}",
-                    src=version_for_drs,
-                    mode="symlink",
-                )
-                nodes = list(current_path.parts)[
-                    0 : -len(get_version_and_subpath(current_path))
-                ]
-
-                nodes.append("files")
-                version_nb = parts_from_version[0][1:]
-                nodes.append("d" + version_nb)
-                nodes.append(current_path.name)
-                # Add the current file to the "files" folder.
-                self.tree.create_leaf(
-                    nodes=nodes,
-                    label=current_path.name,
-                    src=source,  # Lolo Change current_path to source
-                    mode=self.mode,
-                )
-                latest_path = all_versions[-1] if len(all_versions) >= 1 else None
-
-                # If latest file version exist and --upgrade-from-latest submitted.
-                if latest_path and latest_path.exists() and self.upgrade_from_latest:
-                    # Walk through the latest dataset version.
-                    # Create a symlink for each file with a different filename than the current one
-                    for root, _, filenames in os.walk(latest_path):
-                        for latest_name in filenames:
-                            # Add latest files as tree leaves with version to upgrade instead of latest version
-                            # i.e., copy latest dataset leaves to the current tree.
-                            # Except if file has be ignored from latest version (i.e., with known issue)
-                            # Except if file leaf has already been created to avoid overwriting new version
-                            # Leaf is not created if already exists (i.e., force = False).
-                            if (
-                                latest_name != current_path.name
-                                and latest_name not in self.ignore_from_latest
-                            ):
-                                src = os.path.join(root, latest_name)
-                                node_list = list(current_path.parent.parts)
-                                node_list.append(latest_name)
-                                self.tree.create_leaf(
-                                    nodes=node_list,
-                                    label=f"{latest_name}{LINK_SEPARATOR}{os.readlink(src)}",
-                                    src=os.readlink(src),
-                                    mode="symlink",
-                                )
-
-            # In the case of the file is duplicated.
-            # i.e., incoming file already exists in the latest version folder.
-            else:
-                # If upgrade from latest is activated, raise the error, no duplicated files allowed.
-                # Incoming must only contain modifed/corrected files.
-                if self.upgrade_from_latest:
-                    raise DuplicatedFile(latest_path, source)
-
-                # If default behavior, the incoming contains all data for a new version
-                # In the case of a duplicated file, just pass to the expected symlink creation
-                # and records duplicated file for further removal only if migration mode is the
-                # default (i.e., moving files). In the case of --copy or --link, keep duplicates
-                # in place into the incoming directory.
-                else:
-                    assert latest_path is not None
-                    src = os.readlink(latest_path)
-                    self.tree.create_leaf(
-                        nodes=current_path.parts,
-                        label=f"{current_path.name}{LINK_SEPARATOR}{src}",
-                        src=src,
-                        mode="symlink",
-                    )
-                    if self.mode == "move":
-                        self.tree.duplicates.append(source)
-
-            # Record entry for list() and uniqueness checkup.
-            record = {"src": source, "dst": current_path, "is_duplicate": is_duplicate}
-            # print(Path(drs_path.generated_drs_expression).parent)
-            # key = str(get_path_to_version(current_path.parent))
-            key = str(Path(drs_path.generated_drs_expression).parent)
-            if self.tree.has_path(key):
-                # mean we already saw this dataset
-                self.tree.append_path(key, "files", record)
-            else:
-                infos = {
-                    "files": [record],
-                    "latest": latest_version,
-                    "upgrade": self.version,
-                }
-                self.tree.add_path(key, infos)
-
-            # Print info.
-            msg = f"DRS Path = {get_path_to_version(current_path)}"
-            msg += " <-- " + current_path.name
-            Print.success(msg)
-
-            # Return True if success.
-            return True
-
-        except KeyboardInterrupt:
-            # Lock error number.
-            with self.lock:
-                # Increase error counter.
-                self.errors.value += 1
+            # DRS tree generation state.
+            state = {
+                "current_path": current_path,
+                "latest_path": latest_path,
+                "all_versions": all_versions,
+                "latest_version": latest_version,
+                "version_for_drs": version_for_drs,
+                "drs_key": drs_key,
+            }
 
-            raise
+            # Plan DRS tree changes.
+            return self.build(source, is_duplicate=is_duplicate, **state)
 
         # Catch known exception with its traceback.
         except Exception:
-            # Lock error number.
-            with self.lock:
-                # Increase error counter.
-                self.errors.value += 1
-
-                # Format & print exception traceback.
-                exc = traceback.format_exc().splitlines()
-                msg = TAGS.SKIP + COLORS.HEADER(str(source)) + "\n"
-                msg += "\n".join(exc)
-                Print.exception(msg, buffer=True)
-
-            return None
-
-        finally:
-            # Lock progress value.
-            with self.lock:
-                # Increase progress counter.
-                self.progress.value += 1
-
-                # Clear previous print.
-                msg = f"\r{' ' * self.msg_length.value}"
-                Print.progress(msg)
-
-                # Print progress bar.
-                msg = f"\r{COLORS.OKBLUE(SPINNER_DESC)} {FRAMES[self.progress.value % len(FRAMES)]} {source}"
-                Print.progress(msg)
-
-                # Set new message length.
-                self.msg_length.value = len(msg)
+            return Failure(source)
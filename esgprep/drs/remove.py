@@ -7,13 +7,12 @@
 """
 
 import os
-import traceback
 from pathlib import Path
 
+from esgprep._contexts.multiprocessing import Failure
+from esgprep._handlers.drs_tree import DRSPlan
 from esgprep._utils.path import get_ordered_version_paths, get_path_to_version
-from esgprep._utils.print import COLORS, TAGS, Print
-from esgprep.constants import FRAMES
-from esgprep.drs.constants import SPINNER_DESC
+from esgprep._utils.print import Print
 
 
 class Process(object):
@@ -27,14 +26,9 @@ class Process(object):
         Shared processing context between child processes.
 
         """
-        self.tree = ctx.tree
         self.root = ctx.root
         self.set_values = ctx.set_values
         self.set_keys = ctx.set_keys
-        self.lock = ctx.lock
-        self.errors = ctx.errors
-        self.msg_length = ctx.msg_length
-        self.progress = ctx.progress
         self.no_checksum = ctx.no_checksum
         self.checksums_from = ctx.checksums_from
         self.checksum_type = ctx.checksum_type
@@ -74,10 +68,8 @@ class Process(object):
                 (current_idx - 1 if current_idx - 1 >= 0 else 0) : current_idx + 2
             ]
 
-            # Get latest version.
-            latest_version = "Initial"
-            if versions:
-                latest_version = get_ordered_version_paths(versions[-1])
+            # Instantiate DRS plan.
+            plan = DRSPlan()
 
             # Iterate over files in the version directory to remove.
             for root, _, files in os.walk(current_path):
@@ -98,7 +90,7 @@ class Process(object):
                             #                      mode=self.mode)
 
                             # Remove the current file from the "files" folder.
-                            self.tree.create_leaf(
+                            plan.create_leaf(
                                 nodes=file.parts,
                                 label=file.name,
                                 src=None,
@@ -132,73 +124,17 @@ class Process(object):
             }
             #####
             key = str(get_path_to_version(current_path.parent))
-            if key in self.tree.paths:
-                self.tree.append_path(key, "files", record)
-                # self.tree.paths[key]['files'].append(record) # Lolo Change file to record
-                assert latest_version == self.tree.paths[key]["latest"]
-                assert versions[-1] == self.tree.paths[key]["upgrade"]
-            else:
-                infos = {
-                    "files": [record],
-                    "latest": "Initial" if len(versions) == 1 else versions[-1],
-                }
-                self.tree.add_path(key, infos)
-
-                # Lolo Change into add_path method to set instance variable (pb for shared DRSTree between process)
-
-                # self.tree.paths[key] = {}
-                # self.tree.paths[key]['files'] = [record] # Lolo Change file to record
-                # self.tree.paths[key]['latest'] = 'Initial' if len(versions) == 1 else get_version(versions[-1])
-                ##self.tree.paths[key]['upgrade'] = version
+            infos = {"latest": "Initial" if len(versions) == 1 else versions[-1]}
+            plan.add_record(key, record, infos)
 
             # Print info.
             msg = f"DRS Path = {get_path_to_version(current_path)}"
             msg += " <-- " + current_path.name
             Print.success(msg)
 
-            # Return True if success.
-            return True
-
-        except KeyboardInterrupt:
-            # Lock error number.
-            with self.lock:
-                # Increase error counter.
-                self.errors.value += 1
-
-            raise
+            # Return DRS plan if success.
+            return plan
 
         # Catch known exception with its traceback.
         except Exception:
-            # Lock error number.
-            with self.lock:
-                # Increase error counter.
-                self.errors.value += 1
-
-                # Format & print exception traceback.
-                exc = traceback.format_exc().splitlines()
-                msg = TAGS.SKIP + COLORS.HEADER(str(source)) + "\n"
-                msg += "\n".join(exc)
-                Print.exception(msg, buffer=True)
-
-            return None
-
-        finally:
-            # Lock progress value.
-            with self.lock:
-                # Increase progress counter.
-                self.progress.value += 1
-
-                # Clear previous print.
-                msg = "\r{}".format(" " * self.msg_length.value)
-                Print.progress(msg)
-
-                # Print progress bar.
-                msg = "\r{} {} {}".format(
-                    COLORS.OKBLUE(SPINNER_DESC),
-                    FRAMES[self.progress.value % len(FRAMES)],
-                    source,
-                )
-                Print.progress(msg)
-
-                # Set new message length.
-                self.msg_length.value = len(msg)
+            return Failure(source)
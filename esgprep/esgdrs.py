@@ -15,15 +15,21 @@ from typing import Sequence, cast
 
 import esgprep._utils.help as help
 from esgprep import __version__
+from esgprep.constants import CHECKSUM_CACHE_DIR, LOG_FORMATS, READ_BLOCK_SIZE
 from esgprep._utils.parser import (
+    ChecksumsReader,
     CustomArgumentParser,
     DatasetsReader,
     DirectoryChecker,
+    DirectoryCreator,
     MultilineFormatter,
     VersionChecker,
+    chunksize_validator,
     keyval_converter,
     processes_validator,
     regex_validator,
+    size_validator,
+    threads_validator,
 )
 from esgprep.drs import run
 
@@ -65,6 +71,14 @@ def get_args():
         nargs="?",
         help=help.LOG_HELP,
     )
+    parent.add_argument(
+        "--log-format",
+        metavar="FORMAT",
+        choices=LOG_FORMATS,
+        type=str,
+        default="text",
+        help=help.LOG_FORMAT_HELP,
+    )
     parent.add_argument(
         "-d", "--debug", action="store_true", default=False, help=help.VERBOSE_HELP
     )
@@ -117,6 +131,34 @@ def get_args():
         default=4,
         help=help.MAX_PROCESSES_HELP,
     )
+    parent.add_argument(
+        "--forkserver", action="store_true", default=False, help=help.FORKSERVER_HELP
+    )
+    parent.add_argument(
+        "--chunksize",
+        metavar="1",
+        type=chunksize_validator,
+        default=1,
+        help=help.CHUNKSIZE_HELP,
+    )
+    parent.add_argument(
+        "--walk-threads",
+        metavar="0",
+        type=threads_validator,
+        default=0,
+        help=help.WALK_THREADS_HELP,
+    )
+    parent.add_argument(
+        "--sorted-walk", action="store_true", default=False, help=help.SORTED_WALK_HELP
+    )
+    parent.add_argument(
+        "--attrs-cache",
+        metavar="CACHE_DIR",
+        action=DirectoryCreator,
+        nargs="?",
+        const=CHECKSUM_CACHE_DIR,
+        help=help.ATTRS_CACHE_HELP,
+    )
 
     # Add subparser.
     make = subparsers.add_parser(
@@ -208,9 +250,44 @@ def get_args():
     make.add_argument(
         "--checksums-from",
         metavar="CHECKSUM_FILE",
-        type=FileType("r"),
+        action=ChecksumsReader,
         help=help.CHECKSUMS_FROM_HELP,
     )
+    make.add_argument(
+        "--upgrade-threads",
+        metavar="0",
+        type=threads_validator,
+        default=0,
+        help=help.UPGRADE_THREADS_HELP,
+    )
+    make.add_argument(
+        "--checksum-threads",
+        metavar="0",
+        type=threads_validator,
+        default=0,
+        help=help.CHECKSUM_THREADS_HELP,
+    )
+    make.add_argument(
+        "--read-block-size",
+        metavar="8M",
+        type=size_validator,
+        default=READ_BLOCK_SIZE,
+        help=help.READ_BLOCK_SIZE_HELP,
+    )
+    make.add_argument(
+        "--checksum-xattrs",
+        action="store_true",
+        default=False,
+        help=help.CHECKSUM_XATTRS_HELP,
+    )
+    make.add_argument(
+        "--checksum-cache",
+        metavar="CACHE_DIR",
+        action=DirectoryCreator,
+        nargs="?",
+        const=CHECKSUM_CACHE_DIR,
+        help=help.CHECKSUM_CACHE_HELP,
+    )
     make.add_argument(
         "--quiet", action="store_true", default=False, help=help.QUIET_HELP
     )
@@ -12,9 +12,14 @@ import sys
 import os
 from datetime import datetime
 from esgprep import __version__
+from esgprep.constants import CHECKSUM_CACHE_DIR, LOG_FORMATS, READ_BLOCK_SIZE
 from esgprep._utils.help import (
     ALL_VERSIONS_HELP,
+    ATTRS_CACHE_HELP,
     BASENAME_HELP,
+    CHECKSUM_CACHE_HELP,
+    CHECKSUM_XATTRS_HELP,
+    CHECKSUM_THREADS_HELP,
     CHECKSUM_TYPE_HELP,
     CHECKSUMS_FROM_HELP,
     COLOR_HELP,
@@ -22,11 +27,14 @@ from esgprep._utils.help import (
     DATASET_LIST_HELP,
     DIRECTORY_HELP,
     EPILOG,
+    CHUNKSIZE_HELP,
     EXCLUDE_FILE_HELP,
+    FORKSERVER_HELP,
     HELP,
     IGNORE_DIR_HELP,
     INCLUDE_FILE_HELP,
     LATEST_SYMLINK_HELP,
+    LOG_FORMAT_HELP,
     LOG_HELP,
     MAPFILE_HELPS,
     MAPFILE_NAME_HELP,
@@ -39,22 +47,30 @@ from esgprep._utils.help import (
     PROGRAM_DESC,
     PROJECT_HELP,
     QUIET_HELP,
+    READ_BLOCK_SIZE_HELP,
     SET_VERSION_HELP,
+    SORTED_WALK_HELP,
     SUBCOMMANDS,
     TECH_NOTES_TITLE_HELP,
     TECH_NOTES_URL_HELP,
     VERBOSE_HELP,
     VERSION_HELP,
+    WALK_THREADS_HELP,
 )
 from esgprep._utils.parser import (
     ChecksumsReader,
     CustomArgumentParser,
     DatasetsReader,
     DirectoryChecker,
+    DirectoryCreator,
     MultilineFormatter,
     VersionChecker,
+    checksum_type_validator,
+    chunksize_validator,
     processes_validator,
     regex_validator,
+    size_validator,
+    threads_validator,
 )
 from esgprep.mapfile import run
 
@@ -94,6 +110,14 @@ def get_args():
         nargs="?",
         help=LOG_HELP,
     )
+    parent.add_argument(
+        "--log-format",
+        metavar="FORMAT",
+        choices=LOG_FORMATS,
+        type=str,
+        default="text",
+        help=LOG_FORMAT_HELP,
+    )
     parent.add_argument(
         "-d", "--debug", action="store_true", default=False, help=VERBOSE_HELP
     )
@@ -162,6 +186,34 @@ def get_args():
         default=4,
         help=MAX_PROCESSES_HELP,
     )
+    parent.add_argument(
+        "--forkserver", action="store_true", default=False, help=FORKSERVER_HELP
+    )
+    parent.add_argument(
+        "--chunksize",
+        metavar="1",
+        type=chunksize_validator,
+        default=1,
+        help=CHUNKSIZE_HELP,
+    )
+    parent.add_argument(
+        "--walk-threads",
+        metavar="0",
+        type=threads_validator,
+        default=0,
+        help=WALK_THREADS_HELP,
+    )
+    parent.add_argument(
+        "--sorted-walk", action="store_true", default=False, help=SORTED_WALK_HELP
+    )
+    parent.add_argument(
+        "--attrs-cache",
+        metavar="CACHE_DIR",
+        action=DirectoryCreator,
+        nargs="?",
+        const=CHECKSUM_CACHE_DIR,
+        help=ATTRS_CACHE_HELP,
+    )
     group = parent.add_mutually_exclusive_group(required=False)
     group.add_argument("--color", action="store_true", help=COLOR_HELP)
     group.add_argument("--no-color", action="store_true", help=NO_COLOR_HELP)
@@ -192,16 +244,44 @@ def get_args():
     make.add_argument(
         "--checksum-type",
         metavar="TYPE",
-        type=str,
+        type=checksum_type_validator,
         default="sha256",
         help=CHECKSUM_TYPE_HELP,
     )
     make.add_argument(
         "--checksums-from",
         metavar="CHECKSUM_FILE",
-        type=ChecksumsReader,
+        action=ChecksumsReader,
         help=CHECKSUMS_FROM_HELP,
     )
+    make.add_argument(
+        "--checksum-threads",
+        metavar="0",
+        type=threads_validator,
+        default=0,
+        help=CHECKSUM_THREADS_HELP,
+    )
+    make.add_argument(
+        "--read-block-size",
+        metavar="8M",
+        type=size_validator,
+        default=READ_BLOCK_SIZE,
+        help=READ_BLOCK_SIZE_HELP,
+    )
+    make.add_argument(
+        "--checksum-xattrs",
+        action="store_true",
+        default=False,
+        help=CHECKSUM_XATTRS_HELP,
+    )
+    make.add_argument(
+        "--checksum-cache",
+        metavar="CACHE_DIR",
+        action=DirectoryCreator,
+        nargs="?",
+        const=CHECKSUM_CACHE_DIR,
+        help=CHECKSUM_CACHE_HELP,
+    )
     make.add_argument(
         "--tech-notes-url", metavar="URL", type=str, help=TECH_NOTES_URL_HELP
     )
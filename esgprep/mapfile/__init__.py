@@ -68,6 +68,26 @@ def build_mapfile_entry(dataset_name, dataset_version, ffp, size, optional_attrs
     return " | ".join(line) + "\n"
 
 
+def checksum_fields(checksums):
+    """
+    Returns the mapfile checksum field(s).
+    The first checksum type fills the "checksum" field, the others are
+    added as "checksum_<type>" fields.
+
+    """
+    # Single checksum type.
+    if isinstance(checksums, str):
+        return {"checksum": checksums}
+
+    fields = dict()
+    for i, (checksum_type, value) in enumerate(checksums.items()):
+        if i == 0:
+            fields["checksum"] = value
+        else:
+            fields[f"checksum_{checksum_type}"] = value
+    return fields
+
+
 def write(outpath, line):
     """
     Append line to a mapfile.
@@ -97,10 +117,20 @@ def run(args):
     # Instantiate processing context
     with ProcessingContext(args) as ctx:
         # Instantiate the runner.
-        r = Runner(ctx.processes)
+        r = Runner(
+            ctx.processes,
+            ctx.checksum_threads,
+            ctx.project,
+            ctx.forkserver,
+            ctx.chunksize,
+        )
 
         # Get results.
-        results = r.run(ctx.sources, ctx)
+        # Equal mapfile paths are kept as one object.
+        mapfiles = dict()
+        results = r.run(
+            ctx.sources, ctx, consume=lambda result: mapfiles.setdefault(result, result)
+        )
 
         # Final print.
         msg = "\r{}".format(" " * ctx.msg_length.value)
@@ -63,7 +63,11 @@ class ProcessingContext(MultiprocessingContext):
         # The input source is a list directories.
         if self.directory:
             # Instantiate file collector to walk through the tree.
-            self.sources = DRSPathCollector(sources=self.directory)
+            self.sources = DRSPathCollector(
+                sources=self.directory,
+                walk_threads=self.walk_threads,
+                sorted_walk=self.sorted_walk,
+            )
 
             # Initialize file filters.
             for regex, inclusive in self.file_filter:
@@ -107,18 +111,18 @@ class ProcessingContext(MultiprocessingContext):
 
         # All files have been successfully scanned without errors.
         if self.nbsources == self.success:
-            msg = COLORS.SUCCESS(msg)
+            color = COLORS.SUCCESS
 
         # All files have been skipped with errors.
         elif self.nbsources == self.errors.value:
-            msg = COLORS.FAIL(msg)
+            color = COLORS.FAIL
 
         # Some files have been scanned with at least one error.
         else:
-            msg = COLORS.WARNING(msg)
+            color = COLORS.WARNING
 
         # Print summary
-        Print.summary(msg)
+        Print.summary(msg, color)
 
         super(ProcessingContext, self).__exit__(exc_type, exc_val, traceback)
 
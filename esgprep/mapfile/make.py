@@ -6,16 +6,19 @@
 
 """
 
-import traceback
 import re
 import os
 from pathlib import Path
 
-from esgprep._utils.checksum import get_checksum
-from esgprep.constants import FRAMES
-from esgprep.mapfile import build_mapfile_name, build_mapfile_entry, write
-from esgprep.mapfile.constants import SPINNER_DESC
-from esgprep._utils.print import Print, COLORS, TAGS
+from esgprep._contexts.multiprocessing import Failure
+from esgprep._utils.checksum import ChecksumJob, get_checksum
+from esgprep.mapfile import (
+    build_mapfile_entry,
+    build_mapfile_name,
+    checksum_fields,
+    write,
+)
+from esgprep._utils.print import Print
 
 
 class Process(object):
@@ -33,15 +36,70 @@ class Process(object):
         self.outdir = ctx.outdir
         #        self.cfg = ctx.cfg
         self.basename = ctx.basename
+        self.attrs_cache = ctx.attrs_cache
         self.no_checksum = ctx.no_checksum
         self.checksums_from = ctx.checksums_from
         self.checksum_type = ctx.checksum_type
+        self.checksum_cache = ctx.checksum_cache
+        self.checksum_xattrs = ctx.checksum_xattrs
+        self.read_block_size = ctx.read_block_size
+        self.checksum_threads = ctx.checksum_threads
         self.notes_url = ctx.notes_url
         self.notes_title = ctx.notes_title
-        self.progress = ctx.progress
-        self.msg_length = ctx.msg_length
-        self.lock = ctx.lock
-        self.errors = ctx.errors
+
+    def write_entry(self, source, checksums, outpath, outfile, dataset, version):
+        """
+        Writes the mapfile entry of the source and returns the mapfile path.
+
+        """
+        # Gathers optional mapfile info into a dictionary.
+        st = source.stat()
+        optional_attrs = dict()
+        optional_attrs["mod_time"] = st.st_mtime
+        if checksums:
+            optional_attrs.update(checksum_fields(checksums))
+        optional_attrs["dataset_tech_notes"] = self.notes_url
+        optional_attrs["dataset_tech_notes_title"] = self.notes_title
+
+        # Generate the corresponding mapfile entry/line.
+        line = build_mapfile_entry(
+            dataset_name=dataset,
+            dataset_version=version,
+            ffp=str(source),
+            size=st.st_size,
+            optional_attrs=optional_attrs,
+        )
+
+        # Write line into mapfile.
+        write(outpath, line)
+
+        # Print success.
+        msg = "{} <-- {}".format(outfile.with_suffix(""), source)
+        Print.success(msg)
+
+        # Return mapfile path.
+        return outpath
+
+    def resolve(self, job):
+        """
+        Computes deferred checksums and writes the mapfile entry.
+        Runs in a checksum thread of the main process.
+
+        """
+        try:
+            checksums = get_checksum(
+                job.files[0],
+                self.checksum_type,
+                self.checksums_from,
+                self.checksum_cache,
+                self.read_block_size,
+                self.checksum_xattrs,
+            )
+            return self.write_entry(job.source, checksums, **job.state)
+
+        # Catch known exception with its traceback.
+        except Exception:
+            return Failure(job.source)
 
     def __call__(self, source):
         """
@@ -50,7 +108,7 @@ class Process(object):
 
         """
         Print.debug(
-            f"Process.__call__: Processing source: {source} (type: {type(source)})"
+            "Process.__call__: Processing source: {} (type: {})", source, type(source)
         )
         # Escape in case of error.
         try:
@@ -59,25 +117,26 @@ class Process(object):
                 from esgprep._utils.path import dataset_id
 
                 Print.debug(
-                    f"Process.__call__: Using path utilities for source: {source}"
+                    "Process.__call__: Using path utilities for source: {}", source
                 )
             else:
                 from esgprep._utils.dataset import dataset_id
 
                 Print.debug(
-                    f"Process.__call__: Using dataset utilities for source: {source}"
+                    "Process.__call__: Using dataset utilities for source: {}", source
                 )
 
             # Build dataset identifier.
             # DRS terms are validated during this step.
-            Print.debug(f"Process.__call__: Building dataset identifier for: {source}")
-            identifier = dataset_id(source)
-            Print.debug(f"Process.__call__: Dataset identifier: {identifier}")
+            Print.debug("Process.__call__: Building dataset identifier for: {}", source)
+            identifier = dataset_id(source, self.attrs_cache)
+            Print.debug("Process.__call__: Dataset identifier: {}", identifier)
 
             # Check dataset identifier is not None.
             if not identifier:
                 Print.debug(
-                    f"Process.__call__: Dataset identifier is None for source: {source}"
+                    "Process.__call__: Dataset identifier is None for source: {}",
+                    source,
                 )
                 return False
 
@@ -124,76 +183,33 @@ class Process(object):
             except OSError as e:
                 Print.warning(f"Failed to create mapfile directory {outdir}: {e}")
 
-            # Gathers optional mapfile info into a dictionary.
-            optional_attrs = dict()
-            optional_attrs["mod_time"] = source.stat().st_mtime
-            if not self.no_checksum:
-                optional_attrs["checksum"] = get_checksum(
-                    str(source), self.checksum_type, self.checksums_from
-                )
-            optional_attrs["dataset_tech_notes"] = self.notes_url
-            optional_attrs["dataset_tech_notes_title"] = self.notes_title
-
-            # Generate the corresponding mapfile entry/line.
-            line = build_mapfile_entry(
-                dataset_name=dataset,
-                dataset_version=version,
-                ffp=str(source),
-                size=source.stat().st_size,
-                optional_attrs=optional_attrs,
-            )
-
-            # Write line into mapfile.
-            write(outpath, line)
+            # Mapfile entry state.
+            state = {
+                "outpath": outpath,
+                "outfile": outfile,
+                "dataset": dataset,
+                "version": version,
+            }
 
-            # Print success.
-            msg = "{} <-- {}".format(outfile.with_suffix(""), source)
-            with self.lock:
-                Print.success(msg)
+            # Defer checksumming to the checksum threads.
+            if not self.no_checksum and self.checksum_threads:
+                return ChecksumJob(source, [source], state)
 
-            # Return mapfile path.
-            return outpath
-
-        except KeyboardInterrupt:
-            # Lock error number.
-            with self.lock:
-                # Increase error counter.
-                self.errors.value += 1
+            # Get file checksum(s).
+            checksums = None
+            if not self.no_checksum:
+                checksums = get_checksum(
+                    source,
+                    self.checksum_type,
+                    self.checksums_from,
+                    self.checksum_cache,
+                    self.read_block_size,
+                    self.checksum_xattrs,
+                )
 
-            raise
+            # Write mapfile entry & return mapfile path.
+            return self.write_entry(source, checksums, **state)
 
         # Catch known exception with its traceback.
         except Exception:
-            # Lock error number.
-            with self.lock:
-                # Increase error counter.
-                self.errors.value += 1
-
-                # Format & print exception traceback.
-                exc = traceback.format_exc().splitlines()
-                msg = TAGS.SKIP + COLORS.HEADER(str(source)) + "\n"
-                msg += "\n".join(exc)
-                Print.exception(msg, buffer=True)
-
-            return None
-
-        finally:
-            # Lock progress value.
-            with self.lock:
-                # Increase progress counter.
-                self.progress.value += 1
-
-                # Clear previous print.
-                msg = "\r{}".format(" " * self.msg_length.value)
-                Print.progress(msg)
-
-                # Print progress bar.
-                msg = "\r{} {} {}".format(
-                    COLORS.OKBLUE(SPINNER_DESC),
-                    FRAMES[self.progress.value % len(FRAMES)],
-                    source,
-                )
-                Print.progress(msg)
-
-                # Set new message length.
-                self.msg_length.value = len(msg)
+            return Failure(source)
@@ -7,13 +7,11 @@
 """
 
 import re
-import traceback
 from pathlib import Path
 
-from esgprep.constants import FRAMES
+from esgprep._contexts.multiprocessing import Failure
 from esgprep.mapfile import build_mapfile_name
-from esgprep.mapfile.constants import SPINNER_DESC
-from esgprep._utils.print import Print, COLORS, TAGS
+from esgprep._utils.print import Print
 
 
 class Process(object):
@@ -31,10 +29,7 @@ class Process(object):
         self.outdir = ctx.outdir
         # self.cfg = ctx.cfg
         self.basename = ctx.basename
-        self.progress = ctx.progress
-        self.msg_length = ctx.msg_length
-        self.lock = ctx.lock
-        self.errors = ctx.errors
+        self.attrs_cache = ctx.attrs_cache
 
     def __call__(self, source):
         """
@@ -52,7 +47,7 @@ class Process(object):
                 from esgprep._utils.dataset import dataset_id
             # Build dataset identifier.
             # DRS terms are validated during this step.
-            identifier = dataset_id(source)
+            identifier = dataset_id(source, self.attrs_cache)
 
             # Check dataset identifier is not None.
             if not identifier:
@@ -86,8 +81,7 @@ class Process(object):
 
             # Print success.
             msg = "{} <-- {}".format(outfile.with_suffix(""), source)
-            with self.lock:
-                Print.success(msg)
+            Print.success(msg)
 
             # Returns mapfile name or path only.
             if self.basename:
@@ -95,46 +89,6 @@ class Process(object):
             else:
                 return outpath
 
-        except KeyboardInterrupt:
-            # Lock error number.
-            with self.lock:
-                # Increase error counter.
-                self.errors.value += 1
-
-            raise
-
         # Catch known exception with its traceback.
         except Exception:
-            # Lock error number.
-            with self.lock:
-                # Increase error counter.
-                self.errors.value += 1
-
-                # Format & print exception traceback.
-                exc = traceback.format_exc().splitlines()
-                msg = TAGS.SKIP + COLORS.HEADER(str(source)) + "\n"
-                msg += "\n".join(exc)
-                Print.exception(msg, buffer=True)
-
-            return None
-
-        finally:
-            # Lock progress value.
-            with self.lock:
-                # Increase progress counter.
-                self.progress.value += 1
-
-                # Clear previous print.
-                msg = "\r{}".format(" " * self.msg_length.value)
-                Print.progress(msg)
-
-                # Print progress bar.
-                msg = "\r{} {} {}".format(
-                    COLORS.OKBLUE(SPINNER_DESC),
-                    FRAMES[self.progress.value % len(FRAMES)],
-                    source,
-                )
-                Print.progress(msg)
-
-                # Set new message length.
-                self.msg_length.value = len(msg)
+            return Failure(source)
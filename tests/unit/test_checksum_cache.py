@@ -0,0 +1,100 @@
+"""
+Unit tests for the persistent checksum cache.
+
+Tests that checksums are reused through the SQLite cache
+and invalidated when the file changes.
+"""
+
+import os
+
+from esgprep._utils.cache import add_counts, pop_counts
+from esgprep._utils.checksum import ChecksumCache, checksum, get_checksum
+
+
+class TestChecksumCache:
+    """Test class for checksum cache functionality."""
+
+    def test_cache_hit_after_first_computation(self, tmp_path):
+        """Test that the second lookup is served from the cache."""
+        ffp = tmp_path / "file.nc"
+        ffp.write_bytes(b"cached content")
+        cache = ChecksumCache(str(tmp_path / "cache"))
+
+        first = get_checksum(str(ffp), "sha256", cache=cache)
+        second = get_checksum(str(ffp), "sha256", cache=cache)
+
+        assert first == second == checksum(str(ffp), "sha256")
+        assert cache.hits == 1
+        assert cache.misses == 1
+
+    def test_cache_keyed_by_checksum_type(self, tmp_path):
+        """Test that different checksum types are cached separately."""
+        ffp = tmp_path / "file.nc"
+        ffp.write_bytes(b"cached content")
+        cache = ChecksumCache(str(tmp_path / "cache"))
+
+        assert get_checksum(str(ffp), "sha256", cache=cache) == checksum(
+            str(ffp), "sha256"
+        )
+        assert get_checksum(str(ffp), "sha2-256", cache=cache) == checksum(
+            str(ffp), "sha2-256"
+        )
+
+    def test_cache_invalidated_on_change(self, tmp_path):
+        """Test that a modified file is checksummed again."""
+        ffp = tmp_path / "file.nc"
+        ffp.write_bytes(b"original content")
+        cache = ChecksumCache(str(tmp_path / "cache"))
+        original = get_checksum(str(ffp), "sha256", cache=cache)
+
+        ffp.write_bytes(b"modified content!")
+        st = os.stat(ffp)
+        os.utime(ffp, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+        modified = get_checksum(str(ffp), "sha256", cache=cache)
+        assert modified != original
+        assert modified == checksum(str(ffp), "sha256")
+
+    def test_cache_is_picklable(self, tmp_path):
+        """Test that the cache can be sent to pool workers."""
+        import pickle
+
+        ffp = tmp_path / "file.nc"
+        ffp.write_bytes(b"content")
+        cache = ChecksumCache(str(tmp_path / "cache"))
+        get_checksum(str(ffp), "sha256", cache=cache)
+
+        clone = pickle.loads(pickle.dumps(cache))
+        assert clone.db is cache.db
+        assert clone.get(os.stat(ffp), "sha256") == checksum(str(ffp), "sha256")
+
+    def test_counts_added_up(self, tmp_path):
+        """Test that the counts returned by a child process are added up."""
+        ffp = tmp_path / "file.nc"
+        ffp.write_bytes(b"content")
+        cache = ChecksumCache(str(tmp_path / "cache"))
+        get_checksum(str(ffp), "sha256", cache=cache)
+        get_checksum(str(ffp), "sha256", cache=cache)
+
+        counts = pop_counts()
+        assert counts[cache.path] == (1, 1)
+        assert cache.hits == cache.misses == 0
+        assert pop_counts() is None
+
+        add_counts(counts)
+        add_counts(counts)
+        assert (cache.hits, cache.misses) == (2, 2)
+
+    def test_cache_several_checksum_types(self, tmp_path):
+        """Test that only missing checksum types are computed and all are cached."""
+        ffp = tmp_path / "file.nc"
+        ffp.write_bytes(b"cached content")
+        cache = ChecksumCache(str(tmp_path / "cache"))
+
+        get_checksum(str(ffp), "sha256", cache=cache)
+        results = get_checksum(str(ffp), ["sha256", "sha2-256"], cache=cache)
+
+        assert results == checksum(str(ffp), ["sha256", "sha2-256"])
+        assert cache.hits == 1
+        assert get_checksum(str(ffp), "sha2-256", cache=cache) == results["sha2-256"]
+        assert cache.hits == 2
@@ -0,0 +1,127 @@
+"""
+Unit tests for the deferred checksums of esgdrs and esgmapfile make.
+
+Tests that, with checksum threads, the child processes return checksum
+jobs and the checksum threads resume them with the files checksums.
+"""
+
+import hashlib
+from multiprocessing.sharedctypes import Value
+from types import SimpleNamespace
+
+import esgprep._utils.path as path_utils
+import esgprep.drs.make as drs_make
+import esgprep.mapfile.make as mapfile_make
+from esgprep._contexts.multiprocessing import Runner
+from esgprep._handlers.drs_tree import DRSPlan
+from esgprep._utils.checksum import ChecksumJob
+from tests.unit.test_dataset_snapshot import make_dataset
+
+
+def make_ctx(**kwargs):
+    """Runner context with checksum threads."""
+    return SimpleNamespace(
+        no_checksum=False,
+        checksums_from=None,
+        checksum_type="sha256",
+        checksum_cache=None,
+        attrs_cache=None,
+        checksum_xattrs=None,
+        read_block_size=None,
+        checksum_threads=2,
+        errors=Value("i", 0),
+        progress=Value("i", 0),
+        msg_length=Value("i", 0),
+        **kwargs,
+    )
+
+
+class TestChecksumJobs:
+    """Test class for the deferred checksums."""
+
+    def test_drs_make(self, tmp_path, monkeypatch):
+        """Test that duplicated files are detected from the deferred checksums."""
+        dataset = make_dataset(tmp_path / "root")
+        incoming = tmp_path / "incoming"
+        incoming.mkdir()
+        (incoming / "a.nc").write_bytes(b"x" * 10)
+        (incoming / "b.nc").write_bytes(b"y" * 10)
+
+        # Same tracking ID for all files.
+        def get_ncattrs(path, keys=None, cache=None):
+            return {"variant_label": "r1i1p1f1", "tracking_id": "hdl:21.14100/id"}
+
+        drs_path = SimpleNamespace(
+            errors=[], generated_drs_expression="CMIP6/model/tas/v20220101"
+        )
+        monkeypatch.setattr(drs_make, "get_wanted_attributes", lambda p: frozenset())
+        monkeypatch.setattr(drs_make, "get_ncattrs", get_ncattrs)
+        monkeypatch.setattr(drs_make, "get_project", lambda attrs: None)
+        monkeypatch.setattr(drs_make, "get_tracking_id", lambda a: a["tracking_id"])
+        monkeypatch.setattr(drs_make, "generate_directory", lambda p, m: drs_path)
+
+        ctx = make_ctx(
+            prog="esgdrs",
+            cmd="make",
+            root=str(tmp_path / "root"),
+            set_values=None,
+            set_keys=None,
+            version="v20220101",
+            mode="copy",
+            upgrade_from_latest=False,
+            ignore_from_latest=[],
+            ignore_from_incoming=[],
+            project="cmip6",
+        )
+        sources = [incoming / "a.nc", incoming / "b.nc"]
+
+        # Checksums are deferred with the incoming & latest files.
+        job = drs_make.Process(ctx)(sources[0])
+        assert isinstance(job, ChecksumJob)
+        assert job.files == [sources[0], dataset / "latest" / "a.nc"]
+
+        results = Runner(1, ctx.checksum_threads).run(sources, ctx, ordered=True)
+
+        # Same checksum: the duplicated file points to the latest file.
+        assert isinstance(results[0], DRSPlan)
+        [(nodes, label, src, mode, force)] = results[0].leaves
+        assert src == "../files/d20210101/a.nc"
+        assert results[0].records[0][1]["is_duplicate"]
+
+        # Different checksums with the same tracking ID fail.
+        assert results[1] is None
+        assert ctx.errors.value == 1
+        assert ctx.progress.value == 2
+
+    def test_mapfile_make(self, tmp_path, monkeypatch):
+        """Test that mapfile entries are written with the deferred checksums."""
+        dataset = make_dataset(tmp_path)
+        monkeypatch.setattr(
+            path_utils, "dataset_id", lambda source, cache=None: "cmip6.model.tas"
+        )
+
+        ctx = make_ctx(
+            prog="esgmapfile",
+            cmd="make",
+            mapfile_name="{dataset_id}.v{version}.map",
+            outdir=str(tmp_path / "mapfiles"),
+            basename=False,
+            notes_url=None,
+            notes_title=None,
+        )
+        sources = [dataset / "v20210101" / "a.nc", dataset / "v20210101" / "b.nc"]
+
+        # Checksums are deferred with the source file.
+        job = mapfile_make.Process(ctx)(sources[0])
+        assert isinstance(job, ChecksumJob)
+        assert job.files == [sources[0]]
+
+        results = Runner(1, ctx.checksum_threads).run(sources, ctx, ordered=True)
+        assert results[0] == results[1]
+        assert ctx.errors.value == 0
+
+        checksum = hashlib.sha256(b"x" * 10).hexdigest()
+        with open(results[0]) as mapfile:
+            lines = mapfile.readlines()
+        assert len(lines) == 2
+        assert all("checksum={}".format(checksum) in line for line in lines)
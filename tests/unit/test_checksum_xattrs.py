@@ -0,0 +1,56 @@
+"""
+Unit tests for checksums stored in extended attributes.
+
+Tests that checksums are written back to and read from the
+"user.<checksum_type>" extended attributes of the files.
+"""
+
+import os
+
+import pytest
+
+from esgprep._utils.checksum import ChecksumXattrs, checksum, get_checksum
+
+
+@pytest.fixture
+def ffp(tmp_path):
+    """File on a filesystem supporting user extended attributes."""
+    ffp = tmp_path / "file.nc"
+    ffp.write_bytes(b"xattr content")
+    try:
+        os.setxattr(ffp, "user.test", b"")
+    except (AttributeError, OSError):
+        pytest.skip("User extended attributes not supported")
+    return ffp
+
+
+class TestChecksumXattrs:
+    """Test class for extended attributes checksum functionality."""
+
+    def test_computed_checksum_is_written_back(self, ffp):
+        """Test that a computed checksum is recorded with size and mtime."""
+        value = get_checksum(str(ffp), "sha256", xattrs=ChecksumXattrs())
+        st = os.stat(ffp)
+
+        assert value == checksum(str(ffp), "sha256")
+        assert os.getxattr(ffp, "user.sha256").decode() == "{} {} {}".format(
+            value, st.st_size, st.st_mtime_ns
+        )
+
+    def test_stored_checksum_is_used(self, ffp):
+        """Test that a valid stored checksum skips hashing."""
+        st = os.stat(ffp)
+        ChecksumXattrs().set(str(ffp), st, "sha256", "f" * 64)
+
+        assert get_checksum(str(ffp), "sha256", xattrs=ChecksumXattrs()) == "f" * 64
+
+    def test_stale_checksum_is_ignored(self, ffp):
+        """Test that a checksum recorded for another file state is recomputed."""
+        st = os.stat(ffp)
+        ChecksumXattrs().set(str(ffp), st, "sha256", "f" * 64)
+        ffp.write_bytes(b"modified xattr content")
+        os.utime(ffp, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+        assert get_checksum(str(ffp), "sha256", xattrs=ChecksumXattrs()) == checksum(
+            str(ffp), "sha256"
+        )
@@ -0,0 +1,137 @@
+"""
+Unit tests for pre-computed checksums manifests.
+
+Tests that manifests are indexed by normalized path,
+only pickled as their path and restored from their index.
+"""
+
+import pickle
+from pathlib import Path
+
+from esgprep._utils import checksum as checksum_module
+from esgprep._utils.checksum import (
+    ChecksumsManifest,
+    checksum,
+    get_checksum,
+    get_manifests_state,
+    load_manifest,
+    set_manifests_state,
+)
+from esgprep._utils.parser import ChecksumsReader
+
+
+class TestChecksumsManifest:
+    """Test class for checksums manifest functionality."""
+
+    def test_lookup_by_normalized_path(self, tmp_path):
+        """Test that str and Path lookups hit the same entry."""
+        ffp = tmp_path / "file.nc"
+        ffp.write_bytes(b"manifest content")
+        manifest = tmp_path / "checksums.txt"
+        manifest.write_text("{}  {}\n".format("a" * 64, ffp))
+
+        checksums = ChecksumsReader.read(str(manifest))
+
+        assert len(checksums) == 1
+        assert checksums[ffp] == "a" * 64
+        assert checksums.get(str(tmp_path / "." / "file.nc")) == "a" * 64
+        assert checksums.get(tmp_path / "missing.nc") is None
+
+    def test_precomputed_checksum_is_used(self, tmp_path):
+        """Test that get_checksum reads the manifest before computing."""
+        ffp = tmp_path / "file.nc"
+        ffp.write_bytes(b"manifest content")
+        other = tmp_path / "other.nc"
+        other.write_bytes(b"other content")
+        manifest = tmp_path / "checksums.txt"
+        manifest.write_text("{}  {}\n".format("b" * 64, ffp))
+
+        checksums = ChecksumsReader.read(str(manifest))
+
+        assert get_checksum(Path(ffp), "sha256", checksums) == "b" * 64
+        assert get_checksum(str(other), "sha256", checksums) == checksum(
+            str(other), "sha256"
+        )
+
+    def test_precomputed_checksum_of_one_type(self, tmp_path):
+        """Test that a sha256 checksum is not used as a sha2-256 multihash."""
+        ffp = tmp_path / "file.nc"
+        ffp.write_bytes(b"manifest content")
+        manifest = tmp_path / "checksums.txt"
+        manifest.write_text("{}  {}\n".format("b" * 64, ffp))
+
+        checksums = ChecksumsReader.read(str(manifest))
+        results = get_checksum(Path(ffp), ["sha256", "sha2-256"], checksums)
+
+        assert results["sha256"] == "b" * 64
+        assert results["sha2-256"] == checksum(str(ffp), "sha2-256")
+        assert results["sha2-256"].startswith("1220")
+
+    def test_precomputed_multihash(self, tmp_path):
+        """Test that a multihash is only used for its own algorithm."""
+        ffp = tmp_path / "file.nc"
+        ffp.write_bytes(b"manifest content")
+        manifest = tmp_path / "checksums.txt"
+        manifest.write_text("{}  {}\n".format("1220" + "b" * 64, ffp))
+
+        checksums = ChecksumsReader.read(str(manifest))
+
+        assert get_checksum(Path(ffp), "sha2-256", checksums) == "1220" + "b" * 64
+        assert get_checksum(Path(ffp), "sha3-256", checksums) == checksum(
+            str(ffp), "sha3-256"
+        )
+
+    def test_pickled_as_path(self, tmp_path):
+        """Test that unpickling returns the manifest loaded by the process."""
+        manifest = tmp_path / "checksums.txt"
+        manifest.write_text("{}  {}\n".format("c" * 64, tmp_path / "file.nc"))
+
+        checksums = ChecksumsReader.read(str(manifest))
+        data = pickle.dumps(checksums)
+
+        assert str(tmp_path / "file.nc").encode() not in data
+        assert pickle.loads(data) is checksums
+        assert load_manifest(checksums.path) is checksums
+
+    def test_checksum_client_formats(self, tmp_path):
+        """Test sha256sum, shasum, binary, tagged and escaped lines."""
+        names = ["text.nc", "binary.nc", "tagged.nc", "back\\slash.nc", "new\nline.nc"]
+        lines = [
+            "{}  {}".format("1" * 64, tmp_path / names[0]),
+            "{} *{}".format("2" * 64, tmp_path / names[1]),
+            "SHA256 ({}) = {}".format(tmp_path / names[2], "3" * 64),
+            "\\{}  {}".format("4" * 64, str(tmp_path / names[3]).replace("\\", "\\\\")),
+            "\\{}  {}".format("5" * 64, str(tmp_path / names[4]).replace("\n", "\\n")),
+            "not a checksum line",
+        ]
+        manifest = tmp_path / "checksums.txt"
+        manifest.write_text("\n".join(lines) + "\n")
+
+        checksums = ChecksumsReader.read(str(manifest))
+
+        for i, name in enumerate(names):
+            assert checksums[tmp_path / name] == str(i + 1) * 64
+
+    def test_last_duplicate_entry_wins(self, tmp_path):
+        """Test that a file listed twice gets its last checksum."""
+        ffp = tmp_path / "file.nc"
+        manifest = tmp_path / "checksums.txt"
+        manifest.write_text(
+            "{}  {}\n{}  {}\n".format("d" * 64, ffp, "e" * 64, ffp)
+        )
+
+        assert ChecksumsReader.read(str(manifest))[ffp] == "e" * 64
+
+    def test_index_restored_without_streaming(self, tmp_path, monkeypatch):
+        """Test that a restored index only maps the manifest."""
+        ffp = tmp_path / "file.nc"
+        manifest = tmp_path / "checksums.txt"
+        manifest.write_text("{}  {}\n".format("f" * 64, ffp))
+        path = ChecksumsReader.read(str(manifest)).path
+        state = pickle.loads(pickle.dumps({path: get_manifests_state()[path]}))
+
+        monkeypatch.setattr(checksum_module, "_MANIFESTS", dict())
+        monkeypatch.setattr(ChecksumsManifest, "load", None)
+        set_manifests_state(state)
+
+        assert load_manifest(path)[ffp] == "f" * 64
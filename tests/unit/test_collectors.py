@@ -0,0 +1,160 @@
+"""
+Unit tests for the collectors.
+
+Tests that the filters compiled into a single matcher evaluate
+as each regular expression separately, and that collected files
+carry the stat result of the directory scan, whatever the walk threads.
+"""
+
+import os
+import pickle
+import re
+
+import pytest
+
+from esgprep._collectors import Collector, FilterCollection, walk
+from esgprep._collectors.drs_path import DRSPathCollector
+from esgprep._utils.path import ScannedPath
+from esgprep._utils import match
+
+FILTERS = [
+    (r"^.*/(files|latest|\.[\w]*).*$", False),
+    (r".*\.nc$", True),
+    (r"^\..*$", False),
+    (r"/v20200101", True),
+    (r"^(\w+)_\1$", True),
+    (re.compile(r"tas", re.IGNORECASE), False),
+]
+
+STRINGS = [
+    "/path/to/files/tas.nc",
+    "/path/to/v20200101/tas.nc",
+    "/path/to/v20200101/TAS.nc",
+    "/path/to/v20200101/pr.nc",
+    "/path/to/.hidden/pr.nc",
+    ".pr.nc",
+    "pr_pr",
+    "pr_tas",
+]
+
+
+class TestFilterCollection:
+    """Test class for the filter collection."""
+
+    @pytest.mark.parametrize("size", range(len(FILTERS) + 1))
+    def test_compiled_filters(self, size):
+        """Test that compiled filters match as separate regular expressions."""
+        filters = FilterCollection()
+        for regex, inclusive in FILTERS[:size]:
+            filters.add(regex=regex, inclusive=inclusive)
+
+        for string in STRINGS:
+            expected = all(
+                match(regex, string, inclusive=inclusive)
+                for regex, inclusive in FILTERS[:size]
+            )
+            assert filters(string) == expected
+
+    def test_filter_replacement(self):
+        """Test that a named filter replaces the compiled matcher."""
+        filters = FilterCollection()
+        filters.add(name="version_filter", regex="/v1")
+        assert filters("/path/v1/file.nc")
+
+        filters.add(name="version_filter", regex="/v2")
+        assert not filters("/path/v1/file.nc")
+        assert filters("/path/v2/file.nc")
+
+
+class TestCollector:
+    """Test class for the scandir-based collector."""
+
+    def test_collected_paths_carry_stat(self, tmp_path, monkeypatch):
+        """Test that collected files are not stat again."""
+        (tmp_path / "a" / "b").mkdir(parents=True)
+        (tmp_path / "a" / "b" / "tas.nc").write_bytes(b"x" * 10)
+        (tmp_path / "a" / "pr.nc").write_bytes(b"x" * 20)
+        (tmp_path / "a" / "README").write_bytes(b"")
+        (tmp_path / "link").symlink_to(tmp_path / "a" / "b")
+
+        collector = Collector([tmp_path])
+        collector.FileFilter.add(regex=r".*\.nc$")
+        paths = list(collector)
+        assert sorted(path.name for path in paths) == ["pr.nc", "tas.nc", "tas.nc"]
+
+        def fail(*args, **kwargs):
+            raise AssertionError("file stat again")
+
+        monkeypatch.setattr(os, "stat", fail)
+        for path in paths:
+            assert isinstance(path, ScannedPath)
+            assert path.is_file()
+            assert path.stat().st_size == {"tas.nc": 10, "pr.nc": 20}[path.name]
+
+            # Stat result is kept through pickling.
+            path = pickle.loads(pickle.dumps(path))
+            assert path.stat().st_size == {"tas.nc": 10, "pr.nc": 20}[path.name]
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """Directory tree to walk through."""
+    for path in ["b/y/files", "b/x", "a/z/files/d1", "c"]:
+        (tmp_path / path).mkdir(parents=True)
+        (tmp_path / path / "file.nc").write_bytes(b"")
+    return tmp_path
+
+
+class TestWalk:
+    """Test class for the directory walker."""
+
+    def walk(self, top, **kwargs):
+        """Walks the tree pruning the "files" directories."""
+        roots = list()
+        for root, dirs, entries in walk(str(top), **kwargs):
+            dirs[:] = [d for d in dirs if d != "files"]
+            roots.append(os.path.relpath(root, top))
+        return roots
+
+    @pytest.mark.parametrize("threads", [0, 1, 8])
+    def test_walk_prunes(self, tree, threads):
+        """Test that pruned directories are not walked through."""
+        roots = self.walk(tree, threads=threads)
+        assert sorted(roots) == [".", "a", "a/z", "b", "b/x", "b/y", "c"]
+
+    @pytest.mark.parametrize("threads", [0, 1, 8])
+    def test_sorted_walk(self, tree, threads):
+        """Test that sorted walks are deterministic and top-down."""
+        roots = self.walk(tree, threads=threads, ordered=True)
+        assert roots == [".", "a", "a/z", "b", "b/x", "b/y", "c"]
+
+    def test_walk_threads(self, tree):
+        """Test that the collector yields the same files with walk threads."""
+        expected = sorted(Collector([tree]))
+        assert len(expected) == 4
+        for sorted_walk in (False, True):
+            collector = Collector([tree], walk_threads=4, sorted_walk=sorted_walk)
+            assert sorted(collector) == expected
+
+
+class TestDRSPathCollector:
+    """Test class for the DRS path collector."""
+
+    @pytest.mark.parametrize("walk_threads", [0, 4])
+    def test_version_per_dataset(self, tmp_path, walk_threads):
+        """Test that each dataset keeps its own latest version, whatever the walk."""
+        expected = list()
+        for i in range(8):
+            versions = ["v2020010{}".format(v) for v in range(1, i % 3 + 2)]
+            for member in ("r1", "r2"):
+                for version in versions:
+                    path = tmp_path / "d{}".format(i) / member / version
+                    path.mkdir(parents=True)
+                    (path / "tas.nc").write_bytes(b"")
+                    if version == versions[-1]:
+                        expected.append(str(path / "tas.nc"))
+
+        collector = DRSPathCollector([tmp_path], walk_threads=walk_threads)
+        collector.FileFilter.add(regex=r".*\.nc$")
+        collector.default = True
+        assert sorted(str(path) for path in collector) == sorted(expected)
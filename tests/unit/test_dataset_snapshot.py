@@ -0,0 +1,74 @@
+"""
+Unit tests for the dataset snapshots of esgdrs make.
+
+Tests that the existing versions and the index of the latest files
+of a dataset are built once and shared by all its incoming files.
+"""
+
+import os
+
+import esgprep.drs.make as drs_make
+from esgprep.drs.make import DatasetSnapshot, get_dataset_snapshot
+
+
+def make_dataset(root):
+    """Builds a dataset with two versions and a "latest" symlink."""
+    dataset = root / "CMIP6" / "model" / "tas"
+    for version, names in [("v20200101", ["a.nc"]), ("v20210101", ["a.nc", "b.nc"])]:
+        (dataset / version).mkdir(parents=True)
+        (dataset / "files" / f"d{version[1:]}").mkdir(parents=True)
+        for name in names:
+            target = dataset / "files" / f"d{version[1:]}" / name
+            target.write_bytes(b"x" * 10)
+            os.symlink(f"../files/d{version[1:]}/{name}", dataset / version / name)
+    os.symlink("v20210101", dataset / "latest")
+    return dataset
+
+
+class TestDatasetSnapshot:
+    """Test class for the dataset snapshots."""
+
+    def test_snapshot(self, tmp_path):
+        """Test the versions, latest files and upgrade files of a dataset."""
+        snapshot = DatasetSnapshot(make_dataset(tmp_path))
+        assert [v.name for v in snapshot.versions] == ["v20200101", "v20210101"]
+        assert snapshot.latest_version == "v20210101"
+        assert sorted(snapshot.latest_files) == ["a.nc", "b.nc"]
+        assert snapshot.latest_files["b.nc"].size == 10
+
+        files = sorted(name for _, name in snapshot.upgrade_files())
+        assert files == ["a.nc", "b.nc"]
+        root, name = snapshot.upgrade_files()[0]
+        assert snapshot.readlink(os.path.join(root, name)).startswith("../files/")
+
+    def test_new_dataset(self, tmp_path):
+        """Test the snapshot of a dataset without existing versions."""
+        snapshot = DatasetSnapshot(tmp_path / "CMIP6" / "model" / "tas")
+        assert snapshot.versions == []
+        assert snapshot.latest_version == "Initial"
+        assert snapshot.latest_files == {}
+        assert snapshot.upgrade_files() == []
+
+    def test_snapshot_is_cached(self, tmp_path):
+        """Test that the snapshot is taken once per dataset directory."""
+        dataset = make_dataset(tmp_path)
+        assert get_dataset_snapshot(dataset) is get_dataset_snapshot(dataset)
+
+    def test_latest_index(self, tmp_path, monkeypatch):
+        """Test that latest tracking IDs and checksums are read once."""
+        opened = list()
+
+        def get_ncattrs(path, keys=None, cache=None):
+            opened.append(path)
+            return {"tracking_id": "hdl:21.14100/" + os.path.basename(path)}
+
+        monkeypatch.setattr(drs_make, "get_ncattrs", get_ncattrs)
+        monkeypatch.setattr(drs_make, "get_tracking_id", lambda a: a["tracking_id"])
+        latest = DatasetSnapshot(make_dataset(tmp_path)).latest_files["a.nc"]
+
+        assert latest.tracking_id() == "hdl:21.14100/a.nc"
+        assert latest.tracking_id() == "hdl:21.14100/a.nc"
+        assert len(opened) == 1
+
+        assert latest.checksum(lambda path: path.name) == "a.nc"
+        assert latest.checksum(lambda path: None) == "a.nc"
@@ -0,0 +1,63 @@
+"""
+Unit tests for DRS plans merged into the DRS tree.
+
+Tests that plans returned by child processes build the same
+tree as direct calls onto the DRS tree.
+"""
+
+from pathlib import Path
+
+from esgprep._handlers.drs_tree import DRSPlan, DRSTree
+
+
+def plan_file(tree, name, duplicate=False):
+    """Plan or apply the changes of one incoming file."""
+    nodes = ("/root", "CMIP6", "v20200101", name)
+    tree.create_leaf(nodes=nodes, label=name, src=f"/incoming/{name}", mode="move")
+    tree.create_leaf(
+        nodes=("/root", "CMIP6", "latest"),
+        label="latest",
+        src="v20200101",
+        mode="symlink",
+    )
+    if duplicate:
+        tree.duplicates.append(Path(f"/incoming/{name}"))
+
+
+class TestDRSPlan:
+    """Test class for DRS plan merging."""
+
+    def test_merge_builds_same_tree(self):
+        """Test that merged plans equal direct tree updates."""
+        expected = DRSTree("/root", "move")
+        merged = DRSTree("/root", "move")
+        for name, duplicate in [("a.nc", False), ("b.nc", True)]:
+            plan_file(expected, name, duplicate)
+            plan = DRSPlan()
+            plan_file(plan, name, duplicate)
+            merged.merge(plan)
+
+        assert [path for path, _ in merged.walk()] == [
+            path for path, _ in expected.walk()
+        ]
+        assert merged.duplicates == expected.duplicates
+        leaf = merged.get_node(("/root", "CMIP6", "v20200101", "a.nc"))
+        assert leaf.src == "/incoming/a.nc"
+
+    def test_merge_records(self):
+        """Test that dataset records are created once then appended."""
+        tree = DRSTree("/root", "move")
+        for name in ["a.nc", "b.nc"]:
+            plan = DRSPlan()
+            plan.add_record(
+                "CMIP6/dataset", {"src": name}, {"latest": "Initial", "upgrade": "v1"}
+            )
+            tree.merge(plan)
+
+        assert tree.paths == {
+            "CMIP6/dataset": {
+                "files": [{"src": "a.nc"}, {"src": "b.nc"}],
+                "latest": "Initial",
+                "upgrade": "v1",
+            }
+        }
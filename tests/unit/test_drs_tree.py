@@ -0,0 +1,128 @@
+"""
+Unit tests for the DRS tree.
+
+Tests the creation of DRS leaves, their command-lines, their
+concurrent upgrade and the serialization of the DRS tree.
+"""
+
+import pickle
+
+from esgprep._handlers.drs_tree import DRSTree
+
+DATASET = ("/", "root", "CMIP6", "dataset")
+
+
+def make_tree():
+    """Build a DRS tree of a dataset version with two files."""
+    tree = DRSTree("/root", "move")
+    for name in ["b.nc", "a.nc"]:
+        tree.create_leaf(
+            nodes=DATASET + ("v2", name),
+            label=f"{name} --> ../files/d2/{name}",
+            src=f"../files/d2/{name}",
+            mode="symlink",
+        )
+        tree.create_leaf(
+            nodes=DATASET + ("files", "d2", name),
+            label=name,
+            src=f"/incoming/{name}",
+            mode="move",
+        )
+    tree.get_display_lengths()
+    return tree
+
+
+class TestDRSTree:
+    """Test class for DRS tree functionality."""
+
+    def test_leaves_in_creation_order(self):
+        """Test that leaves are yielded in creation order."""
+        tree = make_tree()
+        assert [leaf.dst for leaf in tree.leaves()] == [
+            "/root/CMIP6/dataset/v2/b.nc",
+            "/root/CMIP6/dataset/files/d2/b.nc",
+            "/root/CMIP6/dataset/v2/a.nc",
+            "/root/CMIP6/dataset/files/d2/a.nc",
+        ]
+
+    def test_path_components_are_shared(self):
+        """Test that path components are stored once."""
+        tree = make_tree()
+        a, b = (tree.get_node(DATASET + ("v2", name)) for name in ["a.nc", "b.nc"])
+        assert a.parent is b.parent
+        assert tree.size() == 11
+
+    def test_duplicated_leaf(self):
+        """Test that an existing leaf is only replaced if forced."""
+        tree = make_tree()
+        nodes = DATASET + ("v2", "b.nc")
+        tree.create_leaf(nodes=nodes, label="b.nc", src="first", mode="symlink")
+        assert tree.get_node(nodes).src == "../files/d2/b.nc"
+
+        tree.create_leaf(
+            nodes=nodes, label="b.nc", src="forced", mode="symlink", force=True
+        )
+        assert tree.get_node(nodes).src == "forced"
+        assert list(tree.leaves())[-1].dst == "/root/CMIP6/dataset/v2/b.nc"
+
+    def test_todo(self, capsys):
+        """Test the command-lines to do."""
+        make_tree().todo()
+        lines = capsys.readouterr().out.splitlines()
+        assert "mkdir -p /root/CMIP6/dataset/v2" in lines
+        assert "ln -s ../files/d2/a.nc /root/CMIP6/dataset/v2/a.nc" in lines
+        assert "mv /incoming/a.nc /root/CMIP6/dataset/files/d2/a.nc" in lines
+
+    def test_serialization(self, capsys):
+        """Test that a restored DRS tree prints the same command-lines."""
+        tree = make_tree()
+        restored = DRSTree()
+        restored.restore_from_data(
+            pickle.loads(pickle.dumps(tree.get_serializable_data()))
+        )
+        tree.todo()
+        expected = capsys.readouterr().out
+        restored.todo()
+        assert capsys.readouterr().out == expected
+
+    def test_upgrade(self, tmp_path, capsys):
+        """Test that a concurrent upgrade applies the command-lines to do."""
+        tree = DRSTree(str(tmp_path), "move")
+        dataset = (str(tmp_path), "CMIP6", "dataset")
+        for name in ["a.nc", "b.nc"]:
+            (tmp_path / name).write_text(name)
+            tree.create_leaf(
+                nodes=dataset + ("files", "d2", name),
+                label=name,
+                src=str(tmp_path / name),
+                mode="move",
+            )
+            tree.create_leaf(
+                nodes=dataset + ("v2", name),
+                label=name,
+                src=f"../files/d2/{name}",
+                mode="symlink",
+            )
+        tree.get_display_lengths()
+        tree.todo(threads=4)
+        todo = capsys.readouterr().out.splitlines()[3:-1]
+
+        assert tree.upgrade(threads=4) == 0
+        assert capsys.readouterr().out.splitlines()[3:-1] == todo
+        assert (tmp_path / "CMIP6/dataset/v2/a.nc").read_text() == "a.nc"
+
+    def test_upgrade_errors(self, tmp_path):
+        """Test that failed leaves are counted without stopping the upgrade."""
+        tree = DRSTree(str(tmp_path), "symlink")
+        for name in ["a.nc", "b.nc"]:
+            tree.create_leaf(
+                nodes=(str(tmp_path), "v2", name),
+                label=name,
+                src=name,
+                mode="symlink",
+            )
+        (tmp_path / "v2" / "a.nc").mkdir(parents=True)
+        tree.get_display_lengths()
+
+        assert tree.upgrade(threads=2) == 1
+        assert (tmp_path / "v2" / "b.nc").is_symlink()
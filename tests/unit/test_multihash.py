@@ -10,10 +10,14 @@ import os
 import pytest
 
 from esgprep._utils.checksum import (
+    MultihashHasher,
+    multihash,
     multihash_hex,
     checksum,
     is_multihash_algo,
     MULTIHASH_ALGOS,
+    iter_blocks,
+    take_buffers,
 )
 
 
@@ -141,3 +145,89 @@ class TestMultihash:
         result = multihash_hex(large_data, "sha2-256")
         assert isinstance(result, str)
         assert len(result) > 0
+
+    def test_incremental_hasher_matches_multihash(self):
+        """Test that feeding chunks gives the same result as one-shot multihash."""
+        test_data = b"0123456789" * 10000
+
+        for algo in MULTIHASH_ALGOS.keys():
+            hasher = MultihashHasher(algo)
+            for i in range(0, len(test_data), 4096):
+                hasher.update(test_data[i : i + 4096])
+            assert hasher.digest() == multihash(test_data, algo)
+            assert hasher.hexdigest() == multihash_hex(test_data, algo)
+
+    def test_incremental_hasher_unsupported_algorithm(self):
+        """Test that the incremental hasher rejects unsupported algorithms."""
+        with pytest.raises(ValueError):
+            MultihashHasher("unsupported-algo")
+
+    def test_file_checksum_multihash_streaming(self):
+        """Test that file multihash matches in-memory multihash over several blocks."""
+        test_data = os.urandom(3 * 1024 * 1024 + 17)
+
+        with tempfile.NamedTemporaryFile(mode="wb", delete=False) as f:
+            f.write(test_data)
+            temp_file_path = f.name
+
+        try:
+            assert checksum(temp_file_path, "sha2-256") == multihash_hex(
+                test_data, "sha2-256"
+            )
+            assert checksum(
+                temp_file_path, "sha3-512", human_readable=False
+            ) == multihash(test_data, "sha3-512")
+
+        finally:
+            os.unlink(temp_file_path)
+
+    def test_file_checksum_several_algorithms(self):
+        """Test that several algorithms are computed in one pass."""
+        test_data = b"Several algorithms test content"
+
+        with tempfile.NamedTemporaryFile(mode="wb", delete=False) as f:
+            f.write(test_data)
+            temp_file_path = f.name
+
+        try:
+            results = checksum(temp_file_path, ["sha256", "sha2-256"])
+            assert list(results.keys()) == ["sha256", "sha2-256"]
+            assert results["sha256"] == checksum(temp_file_path, "sha256")
+            assert results["sha2-256"] == checksum(temp_file_path, "sha2-256")
+
+        finally:
+            os.unlink(temp_file_path)
+
+    def test_file_checksum_block_sizes(self):
+        """Test that the checksum does not depend on the read block size."""
+        test_data = os.urandom(1024 * 1024 + 3)
+
+        with tempfile.NamedTemporaryFile(mode="wb", delete=False) as f:
+            f.write(test_data)
+            temp_file_path = f.name
+
+        try:
+            expected = multihash_hex(test_data, "sha2-256")
+            for block_size in [1000, 4096, 65536, 1024 * 1024 + 3, 8 * 1024 * 1024]:
+                assert (
+                    checksum(temp_file_path, "sha2-256", block_size=block_size)
+                    == expected
+                )
+
+        finally:
+            os.unlink(temp_file_path)
+
+    def test_read_buffers_reused(self, tmp_path):
+        """Test that large file buffers are reused and small files get small buffers."""
+        large = tmp_path / "large.nc"
+        large.write_bytes(os.urandom(10000))
+        small = tmp_path / "small.nc"
+        small.write_bytes(b"small")
+
+        first = {id(block.obj) for block in iter_blocks(large, block_size=4096)}
+        blocks = [bytes(block) for block in iter_blocks(large, block_size=4096)]
+        assert b"".join(blocks) == large.read_bytes()
+        assert {id(buf) for buf in take_buffers(4096)} == first
+
+        block = next(iter_blocks(small, block_size=4096))
+        assert len(block.obj) == len(b"small") + 1
@@ -0,0 +1,125 @@
+"""
+Unit tests for the netCDF global attributes reader.
+
+Tests that only the wanted attributes are read, that unchanged
+files are served from the persistent attributes cache and that
+attribute keys are resolved without fuzzy matching when possible.
+"""
+
+import os
+
+import numpy as np
+from netCDF4 import Dataset
+
+from esgprep._utils import ncfile
+from esgprep._utils.cache import AttributesCache
+from esgprep._utils.ncfile import get_ncattrs
+
+
+def make_file(path, **attrs):
+    """Write a netCDF file with the given global attributes."""
+    with Dataset(str(path), "w") as nc:
+        nc.setncatts(attrs)
+    return path
+
+
+class TestNcattrs:
+    """Test class for netCDF global attributes reader."""
+
+    def test_all_attributes(self, tmp_path):
+        """Test that all non-blank attributes are read by default."""
+        ffp = make_file(tmp_path / "file.nc", mip_era="CMIP6", source_id="X", blank=" ")
+        assert get_ncattrs(ffp) == {"mip_era": "CMIP6", "source_id": "X"}
+
+    def test_wanted_attributes(self, tmp_path):
+        """Test that only the wanted attributes are read."""
+        ffp = make_file(tmp_path / "file.nc", mip_era="CMIP6", source_id="X")
+        assert get_ncattrs(ffp, ("mip_era", "tracking_id")) == {"mip_era": "CMIP6"}
+
+    def test_cache_hit_does_not_reopen(self, tmp_path, monkeypatch):
+        """Test that cached attributes are served without opening the file."""
+        ffp = make_file(tmp_path / "file.nc", mip_era="CMIP6", source_id="X")
+        cache = AttributesCache(str(tmp_path / "cache"))
+        assert get_ncattrs(ffp, ("mip_era",), cache) == {"mip_era": "CMIP6"}
+
+        # Missing wanted attributes are read from the file and merged.
+        assert get_ncattrs(ffp, ("source_id",), cache) == {"source_id": "X"}
+        assert cache.misses == 2
+
+        def ncopen(path):
+            raise AssertionError("File reopened")
+
+        monkeypatch.setattr(ncfile, "ncopen", ncopen)
+        assert get_ncattrs(ffp, ("mip_era", "source_id"), cache) == {
+            "mip_era": "CMIP6",
+            "source_id": "X",
+        }
+        assert cache.hits == 1
+
+    def test_cache_invalidated_on_change(self, tmp_path):
+        """Test that a modified file is read again."""
+        ffp = make_file(tmp_path / "file.nc", mip_era="CMIP6")
+        cache = AttributesCache(str(tmp_path / "cache"))
+        assert get_ncattrs(ffp, cache=cache) == {"mip_era": "CMIP6"}
+
+        make_file(ffp, mip_era="CMIP7", source_id="X")
+        st = os.stat(ffp)
+        os.utime(ffp, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+        assert get_ncattrs(ffp, cache=cache) == {"mip_era": "CMIP7", "source_id": "X"}
+
+    def test_cache_numeric_attributes(self, tmp_path):
+        """Test that numpy attribute values are cached as JSON."""
+        ffp = make_file(tmp_path / "file.nc", mip_era="CMIP6", levels=[1, 2], dt=0.5)
+        cache = AttributesCache(str(tmp_path / "cache"))
+        get_ncattrs(ffp, cache=cache)
+        assert get_ncattrs(ffp, cache=cache) == {
+            "mip_era": "CMIP6",
+            "levels": [1, 2],
+            "dt": 0.5,
+        }
+        assert cache.hits == 1
+
+    def test_cache_miss_equals_hit(self, tmp_path):
+        """Test that numeric attribute values are the same on cache miss & hit."""
+        ffp = make_file(
+            tmp_path / "file.nc", levels=[1, 2], dt=0.5, n=np.int32(3), flag=np.int8(1)
+        )
+        cache = AttributesCache(str(tmp_path / "cache"))
+        miss = get_ncattrs(ffp, cache=cache)
+        hit = get_ncattrs(ffp, cache=cache)
+        assert cache.misses == 1 and cache.hits == 1
+        assert miss == hit == get_ncattrs(ffp)
+        for attr in miss:
+            assert type(miss[attr]) is type(hit[attr])
+            assert str(miss[attr]) == str(hit[attr])
+
+    def test_broken_cache_reads_file(self, tmp_path):
+        """Test that attributes are read from the file if the cache is unusable."""
+        ffp = make_file(tmp_path / "file.nc", mip_era="CMIP6")
+        (tmp_path / "cache").mkdir()
+        (tmp_path / "cache" / AttributesCache.FILENAME).write_bytes(b"not a database")
+        cache = AttributesCache(str(tmp_path / "cache"))
+        assert get_ncattrs(ffp, cache=cache) == {"mip_era": "CMIP6"}
+
+
+class TestResolveKey:
+    """Test class for attribute keys resolution."""
+
+    def test_exact_match_skips_fuzzy_matching(self, monkeypatch):
+        """Test that exact keys are resolved without fuzzy matching."""
+        monkeypatch.setattr(ncfile, "extractOne", None)
+        names = frozenset({"mip_era", "tracking_id"})
+        assert ncfile.resolve_key("tracking_id", names) == "tracking_id"
+
+    def test_fuzzy_match(self):
+        """Test that inexact keys fall back to fuzzy matching."""
+        names = frozenset({"CMIP6_mip_era", "source_id"})
+        assert ncfile.resolve_key("mip_era", names) == "CMIP6_mip_era"
+        assert ncfile.resolve_key("tracking_id", names) is None
+
+    def test_get_project(self):
+        """Test project code and tracking ID extraction."""
+        uid = "hdl:21.14100/2e1d4e33-2e6b-4b1a-a3a4-3b5c0c8a1c4e"
+        attrs = {"mip_era": "CMIP6", "tracking_id": uid}
+        assert ncfile.get_project(attrs) == "cmip6"
+        assert ncfile.get_tracking_id(attrs) == uid
@@ -0,0 +1,111 @@
+"""
+Unit tests for the path utilities.
+
+Tests that paths are parsed once into their version and DRS parts,
+that the CV project codes are loaded once per process and that the
+DRS directories are generated once per DRS facet values.
+"""
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+import esgprep._utils.path as path_utils
+import esgprep.drs.make as drs_make
+from esgprep._utils.path import (
+    ParsedPath,
+    get_drs,
+    get_path_to_version,
+    get_project,
+    get_version_and_subpath,
+    get_version_index,
+)
+
+
+class TestParsedPath:
+    """Test class for the parsed paths."""
+
+    def test_versioned_path(self):
+        """Test the version & DRS parts of a versioned path."""
+        path = Path("/root/CMIP6/model/v20200101/tas/file.nc")
+        parsed = ParsedPath(path)
+        assert parsed.version == "v20200101"
+        assert parsed.version_index == 4
+        assert parsed.drs == Path("/root/CMIP6/model")
+        assert get_version_index(path) == 4
+        assert get_drs(path) == Path("/root/CMIP6/model")
+        assert get_path_to_version(path) == ["/", "root", "CMIP6", "model"]
+        assert get_version_and_subpath(path) == ["v20200101", "tas", "file.nc"]
+
+    @pytest.mark.parametrize(
+        "path, error",
+        [
+            ("/root/CMIP6/model", "Invalid version format"),
+            ("/root/CMIP6/model_v20200101", "No version found"),
+        ],
+    )
+    def test_unversioned_path(self, path, error):
+        """Test that unversioned paths keep the full path as DRS."""
+        path = Path(path)
+        assert ParsedPath(path).version_index is None
+        assert get_drs(path) == path
+        with pytest.raises(ValueError, match=error):
+            get_version_index(path)
+
+
+class TestProjects:
+    """Test class for the CV project codes."""
+
+    def test_projects_loaded_once(self, monkeypatch):
+        """Test that the CV is queried once for several paths."""
+        calls = list()
+
+        def get_all_projects():
+            calls.append(1)
+            return ["cmip6", "cordex"]
+
+        monkeypatch.setattr(path_utils, "_PROJECTS", None)
+        monkeypatch.setattr(path_utils.ev, "get_all_projects", get_all_projects)
+        assert get_project(Path("/root/CMIP6/model/v20200101")) == "cmip6"
+        assert get_project(Path("/root/CORDEX/model/v20200101")) == "cordex"
+        assert get_project(Path("/root/other/model/v20200101")) is None
+        assert len(calls) == 1
+
+
+class StubGenerator(object):
+    """Stub DRS generator recording the generated mappings."""
+
+    def __init__(self, collections):
+        parts = [SimpleNamespace(source_collection=c) for c in collections]
+        self.directory_specs = SimpleNamespace(parts=parts)
+        self.mappings = list()
+
+    def generate_directory_from_mapping(self, mapping):
+        self.mappings.append(mapping)
+        return SimpleNamespace(errors=[], mapping=mapping)
+
+
+class TestDRSDirectories:
+    """Test class for the generated DRS directories."""
+
+    def test_directories_generated_once(self, monkeypatch):
+        """Test that identical DRS facet values reuse the generated directory."""
+        generator = StubGenerator(["source_id", "variable_id"])
+        monkeypatch.setitem(path_utils._DRS_GENERATORS, "stub", generator)
+        monkeypatch.setattr(drs_make, "_DRS_DIRECTORIES", dict())
+
+        tas = {"source_id": "model", "variable_id": "tas", "filename": "a.nc"}
+        first = drs_make.generate_directory("stub", tas)
+        assert first.mapping is tas
+
+        # Non-DRS attributes do not change the generated directory.
+        second = drs_make.generate_directory("stub", {**tas, "filename": "b.nc"})
+        assert second is first
+        assert len(generator.mappings) == 1
+
+        # Different DRS facet values are generated again.
+        pr = drs_make.generate_directory("stub", {**tas, "variable_id": "pr"})
+        assert pr is not first
+        assert pr.mapping["variable_id"] == "pr"
+        assert len(generator.mappings) == 2
@@ -0,0 +1,164 @@
+"""
+Unit tests for the printing management.
+
+Tests that buffered messages are queued and drained in order,
+and that log messages are written by the logfile writer.
+"""
+
+import json
+import time
+from multiprocessing import get_context
+from pathlib import Path
+
+import pytest
+
+from esgprep._contexts.multiprocessing import IndexedWorker, initializer
+from esgprep._utils.print import COLOR, COLORS, Print
+
+
+def log_source(source):
+    """Log a processed source."""
+    Print.info(f"source {source}")
+    return source
+
+
+def log_and_wait(started):
+    """Log a message, then wait to be terminated."""
+    Print.info("waiting")
+    Path(started).touch()
+    time.sleep(60)
+
+
+class TestPrintBuffer:
+    """Test class for the print buffer functionality."""
+
+    def test_flush_drains_buffer(self, capsys):
+        """Test that flush prints buffered messages once, in order."""
+        Print.disable_colors()
+        Print.result("first", buffer=True)
+        Print.result("second", buffer=True)
+        assert capsys.readouterr().out == ""
+
+        Print.flush()
+        assert capsys.readouterr().out.split() == ["first", "second"]
+
+        Print.flush()
+        assert capsys.readouterr().out == ""
+
+
+class TestLogSink:
+    """Test class for the logfile writer."""
+
+    @pytest.fixture(autouse=True)
+    def restore_print(self):
+        """Restore printing settings after each test."""
+        state = Print.get_state()
+        yield
+        Print.set_state(state)
+
+    def test_text_log_is_buffered_and_uncolored(self, tmp_path):
+        """Test that log messages are written on close without color codes."""
+        Print.init(log=str(tmp_path), debug=False, cmd="esgtest")
+        Print.enable_colors()
+        Print.info("first")
+        Print.error("second")
+        assert Path(Print.LOGFILE).read_text() == ""
+
+        Print.close()
+        lines = Path(Print.LOGFILE).read_text().splitlines()
+        assert lines == [":: INFO    :: first", ":: ERROR   :: second"]
+
+    def test_log_keeps_terminal_colors(self, tmp_path):
+        """Test that logging does not disable the terminal colors."""
+        Print.enable_colors()
+        Print.init(log=str(tmp_path), debug=False, cmd="esgtest", log_format="json")
+        assert "\033" in COLORS.SUCCESS("terminal")
+
+        Print.success("message")
+        Print.close()
+        record = json.loads(Path(Print.LOGFILE).read_text())
+        assert record["msg"] == "message"
+
+    def test_log_messages_are_never_colored(self, tmp_path, monkeypatch):
+        """Test that no color codes are generated for log messages."""
+        Print.init(log=str(tmp_path), debug=True, cmd="esgtest")
+        Print.enable_colors()
+
+        def colored(self, msg):
+            raise AssertionError("colored log message")
+
+        monkeypatch.setattr(COLOR, "__call__", colored)
+        Print.info("info")
+        Print.debug("debug")
+        Print.warning("warning")
+        Print.error("error", buffer=True)
+        Print.success("success")
+        Print.skip("/path/to/file.nc", "Traceback")
+        Print.close()
+
+        lines = Path(Print.LOGFILE).read_text().splitlines()
+        assert lines[-3:] == [
+            ":: SUCCESS :: success",
+            ":: SKIPPED :: /path/to/file.nc",
+            "Traceback",
+        ]
+
+    def test_terminated_worker_loses_nothing(self, tmp_path):
+        """Test that the log messages of a terminated child process are written."""
+        Print.init(log=str(tmp_path / "logs"), debug=False, cmd="esgtest")
+        started = tmp_path / "started"
+        pool = get_context("fork").Pool(2, initializer=initializer)
+        try:
+            results = pool.map(IndexedWorker(log_source), enumerate(range(10)))
+            assert sorted(result for _, result, _ in results) == list(range(10))
+
+            pool.apply_async(log_and_wait, (str(started),))
+            deadline = time.monotonic() + 60
+            while not started.exists() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert started.exists()
+        finally:
+            pool.terminate()
+            pool.join()
+
+        lines = Path(Print.LOGFILE).read_text().splitlines()
+        expected = [f":: INFO    :: source {i}" for i in range(10)]
+        assert sorted(line for line in lines if "source" in line) == expected
+        assert ":: INFO    :: waiting" in lines
+
+    def test_json_log_records(self, tmp_path):
+        """Test that JSON-lines logs carry the level and per-file timings."""
+        Print.init(log=str(tmp_path), debug=False, cmd="esgtest", log_format="json")
+        Print.warning("message")
+        Print.timing(Path("/path/to/file.nc"), 0.5, "success")
+        Print.close()
+
+        assert Print.LOGFILE.endswith(".jsonl")
+        records = [json.loads(line) for line in Path(Print.LOGFILE).open()]
+        assert records[0]["level"] == "warning"
+        assert records[0]["msg"] == "message"
+        assert records[1]["source"] == "/path/to/file.nc"
+        assert records[1]["elapsed"] == 0.5
+        assert records[1]["status"] == "success"
+
+
+class TestPrintDebug:
+    """Test class for the debug messages."""
+
+    def test_debug_formats_lazily(self, capsys):
+        """Test that debug arguments are only formatted in debug mode."""
+
+        class Unformattable:
+            def __str__(self):
+                raise AssertionError("formatted out of debug mode")
+
+        state = Print.get_state()
+        try:
+            Print.init(log="-", debug=False, cmd="esgtest")
+            Print.debug("value: {}", Unformattable())
+
+            Print.DEBUG = True
+            Print.debug("values: {} {}", 1, "{}")
+        finally:
+            Print.set_state(state)
+        assert capsys.readouterr().out == ":: DEBUG   :: values: 1 {}\n"
@@ -0,0 +1,128 @@
+"""
+Unit tests for the multiprocessing runner.
+
+Tests that results are consumed as soon as returned, in the
+sources order if required, that deferred checksums keep
+their source in the in-flight window, and that failures and
+skipped sources are accounted for.
+"""
+
+import sys
+import threading
+import time
+import types
+from multiprocessing.sharedctypes import Value
+
+import pytest
+
+from esgprep._contexts.multiprocessing import Failure, Runner, Skipped
+from esgprep._utils.checksum import ChecksumJob
+
+
+class Process(object):
+    """Stub child process returning, deferring, failing or skipping its source."""
+
+    # Deferred checksums submitted & completed.
+    deferred = 0
+    resolved = 0
+    max_pending = 0
+    lock = threading.Lock()
+
+    def __init__(self, ctx):
+        self.defer = ctx.defer
+        self.outcomes = ctx.outcomes
+
+    def __call__(self, source):
+        # Sources are processed out of order by the child processes.
+        time.sleep(0.001 * (source % 3))
+        if self.outcomes:
+            try:
+                if source % 3 == 1:
+                    raise ValueError(source)
+            except ValueError:
+                return Failure(source)
+            if source % 3 == 2:
+                return Skipped(source)
+        if self.defer and source % 2:
+            with Process.lock:
+                Process.deferred += 1
+                pending = Process.deferred - Process.resolved
+                Process.max_pending = max(Process.max_pending, pending)
+            return ChecksumJob(source, [source])
+        return source
+
+    def resolve(self, job):
+        time.sleep(0.02)
+        with Process.lock:
+            Process.resolved += 1
+        return job.source
+
+
+@pytest.fixture
+def ctx(monkeypatch):
+    """Runner context with the stub child process."""
+    module = types.ModuleType("esgprep.test.stub")
+    module.Process = Process
+    constants = types.ModuleType("esgprep.test.constants")
+    constants.SPINNER_DESC = "Testing"
+    monkeypatch.setitem(sys.modules, "esgprep.test", types.ModuleType("esgprep.test"))
+    monkeypatch.setitem(sys.modules, "esgprep.test.stub", module)
+    monkeypatch.setitem(sys.modules, "esgprep.test.constants", constants)
+    for counter in ("deferred", "resolved", "max_pending"):
+        monkeypatch.setattr(Process, counter, 0)
+    return types.SimpleNamespace(
+        prog="esgtest",
+        cmd="stub",
+        defer=False,
+        outcomes=False,
+        errors=Value("i", 0),
+        progress=Value("i", 0),
+        msg_length=Value("i", 0),
+    )
+
+
+class TestRunner:
+    """Test class for the multiprocessing runner."""
+
+    @pytest.mark.parametrize("processes", [1, 2])
+    def test_results_consumed_while_walking(self, ctx, processes):
+        """Test that results are consumed in order before all sources are walked."""
+        walked = list()
+        consumed = list()
+
+        def sources():
+            for source in range(50):
+                walked.append(source)
+                yield source
+
+        def consume(result):
+            consumed.append((result, len(walked)))
+            return True
+
+        runner = Runner(processes, chunksize=1)
+        results = runner.run(sources(), ctx, ordered=True, consume=consume)
+
+        assert results == [True] * 50
+        assert [result for result, _ in consumed] == list(range(50))
+        assert consumed[0][1] < 50
+
+    def test_deferred_checksums_hold_window(self, ctx):
+        """Test that sources waiting for their checksums stay in the window."""
+        ctx.defer = True
+        runner = Runner(1, checksum_threads=2)
+        results = runner.run(range(100), ctx, ordered=True)
+
+        assert results == list(range(100))
+        assert Process.resolved == 50
+        assert Process.max_pending <= runner.window
+        assert ctx.progress.value == 100
+
+    @pytest.mark.parametrize("processes", [1, 2])
+    def test_results_accounting(self, ctx, processes):
+        """Test that failures are counted as errors, skipped sources are not."""
+        ctx.outcomes = True
+        results = Runner(processes).run(range(30), ctx, ordered=True)
+
+        assert results == [None if source % 3 else source for source in range(30)]
+        assert ctx.errors.value == 10
+        assert ctx.progress.value == 30